@@ -0,0 +1,82 @@
+"""
+Startup-time benchmark for the hydroturtle CLI.
+
+Each case runs in a fresh interpreter (best of --repeat runs, wall time minus
+the bare "python -c pass" start). It also checks that a CSV conversion never
+loads the geo stack or netCDF4; those modules are imported only by the
+shp / nc commands.
+
+    python benchmarks/startup.py                 # report
+    python benchmarks/startup.py --budget-ms 150 # also fail above this overhead
+
+Exits non-zero when a heavy module is loaded on the CSV path or a case is
+over budget, so it can run as a CI regression guard.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+MAPPING = ROOT / "examples" / "lamah_ce" / "mapping_lamah_ce_timeseries.json"
+
+# must not be imported by "hydroturtle csv"
+HEAVY = ("fiona", "shapely", "pyproj", "pyogrio", "netCDF4", "numpy", "hydroturtle.core.engine_shp")
+
+SAMPLE_CSV = "YYYY;MM;DD;2m_temp_max;prec\n1981;01;01;1.5;0.2\n1981;01;02;NA;3\n"
+
+
+def _csv_case(csv_path: str, out_path: str) -> str:
+    return (f"import sys; from hydroturtle.cli import main; "
+            f"sys.argv = ['hydroturtle', 'csv', {csv_path!r}, {str(MAPPING)!r}, {out_path!r}]; main()")
+
+
+def _time(code: str, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
+        runs.append(time.perf_counter() - t0)
+    return min(runs) * 1000
+
+
+def _loaded_heavy(code: str) -> list:
+    probe = code + f"; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", "import sys; " + probe], check=True, cwd=ROOT,
+                         capture_output=True, text=True).stdout.strip().splitlines()
+    return [m for m in (out[-1] if out else "").split(",") if m]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="HydroTurtle CLI startup benchmark")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--budget-ms", type=float, default=None,
+                    help="Fail if a case takes longer than this over a bare interpreter start")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = str(Path(tmp) / "ID_1.csv")
+        Path(csv_path).write_text(SAMPLE_CSV, encoding="utf-8")
+        cases = {
+            "import hydroturtle.cli": "import hydroturtle.cli",
+            "import hydroturtle.core.engine": "import hydroturtle.core.engine",
+            "hydroturtle csv (3 rows)": _csv_case(csv_path, str(Path(tmp) / "out.ttl")),
+        }
+
+        base = _time("pass", args.repeat)
+        print(f"{'python -c pass':34s} {base:8.1f} ms")
+        failed = False
+        for name, code in cases.items():
+            overhead = _time(code, args.repeat) - base
+            heavy = _loaded_heavy(code)
+            over = args.budget_ms is not None and overhead > args.budget_ms
+            flags = (f"  loads {', '.join(heavy)}" if heavy else "") + ("  over budget" if over else "")
+            print(f"{name:34s} {overhead:+8.1f} ms{flags}")
+            failed = failed or bool(heavy) or over
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from hydroturtle.api import Block, as_mapping, convert_file, iter_subjects, iter_triples, prefixes_for
+from hydroturtle.io.ttl_writer import format_prefixes, format_subject, open_out
+
+
+# asyncio entry points. The conversion work runs off the event loop:
+#
+#   aiter_subjects / aiter_triples   async iterators over hydroturtle.api's
+#                                    streaming iterators, run in a thread and
+#                                    handed over in chunks through a bounded
+#                                    queue (backpressure: the producer waits
+#                                    while the consumer is behind)
+#   convert_async                    one file; streamed in a thread (progress,
+#                                    cancellation between chunks) or, given a
+#                                    ProcessPoolExecutor, the CLI conversion in
+#                                    a worker process (true parallelism)
+#   convert_batch_async              many files with bounded concurrency, yields
+#                                    (source, out_path) as each one finishes
+#
+# Cancelling the awaiting task stops a streamed conversion at the next chunk
+# (a write already running in the writer thread is waited for, then the
+# partial output file is removed). A conversion already running in a
+# process pool cannot be interrupted; it is only dropped if not yet started.
+#
+# The thread path shares the GIL with the event loop: the loop stays
+# responsive, but for CPU-heavy batches pass a ProcessPoolExecutor.
+
+_CHUNK = 256     # blocks per hand-over to the event loop
+_QUEUE = 8       # chunks buffered ahead of the consumer
+_DONE = object()
+
+Progress = Callable[[int], Any]
+
+
+async def _aiter_thread(factory: Callable[[], Iterable[Any]], chunk: int = _CHUNK) -> AsyncIterator[Any]:
+    """Run the iterator from factory() in a thread and yield its items on the event loop."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE)
+    stop = threading.Event()
+
+    def _put(item) -> None:
+        # blocks the producer thread until the queue has room (or the consumer is gone)
+        fut = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while not stop.is_set():
+            try:
+                return fut.result(timeout=0.1)
+            except FutureTimeout:
+                continue
+        fut.cancel()
+
+    def _produce() -> None:
+        try:
+            buf = []
+            for item in factory():
+                if stop.is_set():
+                    return
+                buf.append(item)
+                if len(buf) >= chunk:
+                    _put(buf)
+                    buf = []
+            if buf:
+                _put(buf)
+            _put(_DONE)
+        except BaseException as e:  # re-raised in the consumer
+            _put(e)
+
+    producer = loop.run_in_executor(None, _produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            for x in item:
+                yield x
+    finally:
+        stop.set()
+        await asyncio.shield(producer)
+
+
+def aiter_subjects(source: str, mapping: Union[str, Path, Dict[str, Any]], kind: Optional[str] = None,
+                   **options: Any) -> AsyncIterator[Block]:
+    """Async iterator over api.iter_subjects (same arguments)."""
+    return _aiter_thread(lambda: iter_subjects(source, mapping, kind=kind, **options))
+
+
+def aiter_triples(source: str, mapping: Union[str, Path, Dict[str, Any]], kind: Optional[str] = None,
+                  expand: bool = False, **options: Any) -> AsyncIterator[Tuple[str, str, str]]:
+    """Async iterator over api.iter_triples (same arguments)."""
+    return _aiter_thread(lambda: iter_triples(source, mapping, kind=kind, expand=expand, **options))
+
+
+async def _settle(fut: Optional[Future]) -> None:
+    """Wait until a thread's future has finished, also if the task is cancelled again meanwhile."""
+    while fut is not None and not fut.done():
+        try:
+            await asyncio.wait([asyncio.wrap_future(fut)])
+        except asyncio.CancelledError:
+            continue
+
+
+async def _stream_to_file(source: str, mapping: Union[str, Path], out_path: Any, kind: Optional[str],
+                          progress: Optional[Progress], options: Dict[str, Any]) -> Any:
+    loop = asyncio.get_running_loop()
+    mapping = await loop.run_in_executor(None, as_mapping, mapping)
+    out = await loop.run_in_executor(None, open_out, out_path)
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hydroturtle-write")
+    pending: Optional[Future] = None  # the last write handed to the writer thread
+    written = 0
+
+    async def _write(text: str) -> None:
+        nonlocal pending
+        pending = writer.submit(out.write, text)
+        await asyncio.wrap_future(pending)
+
+    try:
+        out.write(format_prefixes(prefixes_for(mapping, **options)))
+        chunk = []
+        async for s, pos in aiter_subjects(source, mapping, kind=kind, **options):
+            chunk.append(format_subject(s, pos))
+            if len(chunk) >= _CHUNK:
+                await _write("".join(chunk))
+                written += len(chunk)
+                chunk = []
+                if progress:
+                    progress(written)
+        if chunk:
+            await _write("".join(chunk))
+            written += len(chunk)
+        if progress:
+            progress(written)
+    except BaseException:
+        # a cancelled await does not stop a write already running in the thread:
+        # let it finish before the output is closed and removed under it
+        await _settle(pending)
+        out.close()
+        if isinstance(out_path, str) and out_path != "-":
+            Path(out_path).unlink(missing_ok=True)  # no partial output after an error / cancellation
+        raise
+    finally:
+        writer.shutdown(wait=False)
+    out.close()
+    return out_path
+
+
+async def convert_async(
+    source: str,
+    mapping: Union[str, Path],
+    out_path: Any,
+    kind: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    progress: Optional[Progress] = None,
+    **options: Any
+) -> Any:
+    """
+    Convert source to out_path (Turtle, compressed if it ends with .gz / .bz2
+    / .xz; or any io.sinks target) without blocking the event loop; returns
+    out_path.
+
+    Without executor the conversion is streamed in a thread: progress(n) is
+    called on the loop with the number of subject blocks written so far, and
+    cancellation stops it between chunks. With an executor (e.g. a shared
+    ProcessPoolExecutor) the CLI conversion (api.convert_file) runs there;
+    progress is then only called once, at the end, with -1.
+    """
+    source = str(source)
+    if isinstance(out_path, Path):
+        out_path = str(out_path)
+    if executor is None:
+        return await _stream_to_file(source, mapping, out_path, kind, progress, options)
+    if not isinstance(out_path, str) or out_path == "-":
+        raise ValueError("With an executor, out_path must be a file path")
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(executor, partial(convert_file, source, str(mapping), out_path,
+                                                          kind=kind, **options))
+    if progress:
+        progress(-1)
+    return result
+
+
+async def convert_batch_async(
+    sources: Iterable[str],
+    mapping: Union[str, Path],
+    out_dir: Union[str, Path],
+    kind: Optional[str] = None,
+    concurrency: int = 4,
+    executor: Optional[Executor] = None,
+    **options: Any
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Convert every source to out_dir/<stem>.ttl, at most `concurrency` at a
+    time, yielding (source, out_path) in completion order. With executor=None
+    a ProcessPoolExecutor of `concurrency` workers is used for the batch.
+    Leaving the iteration early (break / cancellation) cancels the rest.
+    """
+    outd = Path(out_dir)
+    outd.mkdir(parents=True, exist_ok=True)
+    own = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=concurrency)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one(src: str) -> Tuple[str, str]:
+        async with sem:
+            out = str(outd / (Path(src).stem + ".ttl"))
+            return src, await convert_async(src, mapping, out, kind=kind, executor=executor, **options)
+
+    tasks = [asyncio.ensure_future(_one(str(src))) for src in sources]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own:
+            executor.shutdown(wait=False, cancel_futures=True)
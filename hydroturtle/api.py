@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import re
+from itertools import count, islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# In-process streaming API: triples without writing and re-parsing Turtle.
+#
+#   iter_subjects(source, mapping)   (subject, [(p, o), ...]) blocks
+#   iter_triples(source, mapping)    (s, p, o), inline blank nodes "[ ... ]"
+#                                    expanded to _:bN subjects
+#   iter_ntriples(source, mapping)   N-Triples lines (full IRIs), e.g. for
+#                                    rdflib's Graph.parse(data=..., format="nt")
+#                                    or a bulk loader
+#   convert_file(source, mapping, out)  the file conversion of the CLI commands
+#
+# Terms are the Turtle terms HydroTurtle writes (CURIEs such as
+# "hyobs:sensor_12", literals such as '"1.5"^^xsd:decimal'); expand=True
+# turns them into N-Triples terms ("<https://...>", '"1.5"^^<http://...>').
+#
+# Everything is lazy: rows are evaluated batch by batch (CSV / Parquet /
+# Arrow / NetCDF) or feature by feature (vector layers), so memory stays flat.
+# Observations come out once; a shared subject (sensor, catchment, ...) comes
+# out where it first appears, and again later only with triples not seen
+# before.
+
+SHP_SUFFIXES = {".shp", ".gpkg", ".geojson", ".fgb"}
+NC_SUFFIXES = {".nc", ".nc4", ".netcdf"}
+
+Block = Tuple[str, List[Tuple[str, str]]]
+
+
+def as_mapping(mapping: Union[str, Path, Dict[str, Any]], json_encoding: str = "utf-8") -> Dict[str, Any]:
+    """A loaded mapping: dicts pass through, paths go through load_mapping."""
+    if isinstance(mapping, dict):
+        return mapping
+    from hydroturtle.mapping.loader import load_mapping
+    return load_mapping(str(mapping), json_encoding=json_encoding)
+
+
+def _kind(source: str, kind: Optional[str]) -> str:
+    """csv (also Parquet/Arrow), nc or shp; from the suffix unless given (GeoParquet needs kind="shp")."""
+    if kind:
+        if kind not in ("csv", "nc", "shp"):
+            raise ValueError(f"Unknown kind {kind!r} (expected csv, nc or shp)")
+        return kind
+    suffix = Path(source).suffix.lower()
+    if suffix in SHP_SUFFIXES:
+        return "shp"
+    if suffix in NC_SUFFIXES:
+        return "nc"
+    return "csv"
+
+
+def _row_blocks(indexed_rows, mapping: Dict[str, Any], source: str, batch_rows: int) -> Iterator[Block]:
+    from hydroturtle.core.pipeline import drop_emitted, evaluate_batch
+
+    emitted: Dict[str, set] = {}
+    it = iter(indexed_rows)
+    while True:
+        batch = list(islice(it, batch_rows))
+        if not batch:
+            return
+        yield from drop_emitted(evaluate_batch(mapping, source, batch), emitted)
+
+
+def iter_subjects(
+    source: str,
+    mapping: Union[str, Path, Dict[str, Any]],
+    kind: Optional[str] = None,
+    json_encoding: str = "utf-8",
+    batch_rows: int = 5000,
+    **options: Any
+) -> Iterator[Block]:
+    """
+    Yield (subject, [(predicate, object), ...]) blocks for source converted
+    with mapping (a path or an already loaded mapping dict).
+
+    options are the keyword arguments of the matching converter:
+      csv  csv_encoding, csv_delimiter, csv_reader       (evaluator.convert)
+      nc   time_dim, time_chunk, space_chunk              (engine_nc.convert_nc)
+      shp  id_field, src_crs_override, reader, bbox, mask, ids, hierarchy,
+           summary_geometries, layer                      (engine_shp.convert_shp)
+    """
+    mapping = as_mapping(mapping, json_encoding)
+    source = str(source)
+    kind = _kind(source, kind)
+
+    if kind == "shp":
+        from hydroturtle.core.engine_shp import iter_shp_subjects
+        yield from iter_shp_subjects(source, mapping, **options)
+        return
+
+    if kind == "nc":
+        from hydroturtle.core.engine_nc import iter_nc_source_rows, nc_mapping
+        mapping = nc_mapping(source, mapping, options.get("time_dim"))
+        rows = iter_nc_source_rows(source, mapping, **options)
+    else:
+        from hydroturtle.core.evaluator import iter_source_rows
+        rows = enumerate(iter_source_rows(source, mapping, **options))
+    yield from _row_blocks(rows, mapping, source, batch_rows)
+
+
+def convert_file(source: str, mapping_path: Union[str, Path], out_path: Any,
+                 kind: Optional[str] = None, **options: Any) -> Any:
+    """
+    Convert one input to Turtle with the engine for its kind, as the
+    csv / nc / shp commands do; options are that run_convert* function's
+    keyword arguments. out_path is a path, "-" (stdout), a binary stream or
+    a callback (see io.sinks). Returns out_path.
+    """
+    source, mapping_path = str(source), str(mapping_path)
+    if isinstance(out_path, Path):
+        out_path = str(out_path)
+    kind = _kind(source, kind)
+    if kind == "csv":
+        from hydroturtle.core.engine import run_convert
+        return run_convert(source, mapping_path, out_path, **options)
+    if kind == "nc":
+        from hydroturtle.core.engine_nc import run_convert_nc
+        return run_convert_nc(source, mapping_path, out_path, **options)
+    from hydroturtle.core.engine_shp import run_convert_shp
+    return run_convert_shp(source, mapping_path, out_path, **options)
+
+
+def prefixes_for(mapping: Union[str, Path, Dict[str, Any]], json_encoding: str = "utf-8",
+                 **options: Any) -> Dict[str, str]:
+    """The prefix map of the output (needed to expand CURIEs); options as for iter_subjects."""
+    mapping = as_mapping(mapping, json_encoding)
+    if options.get("hierarchy") or options.get("summary_geometries"):
+        from hydroturtle.core.engine_shp import shp_prefixes
+        return shp_prefixes(mapping, options.get("hierarchy"), bool(options.get("summary_geometries")))
+    return dict(mapping["prefixes"])
+
+
+# --- blank nodes ---------------------------------------------------------------
+def _split_top(text: str, sep: str) -> List[str]:
+    """Split on sep outside quoted literals, <IRIs> and nested [ ] brackets."""
+    parts, depth, start, i, n = [], 0, 0, 0, len(text)
+    while i < n:
+        c = text[i]
+        if c == '"':
+            i += 1
+            while i < n and text[i] != '"':
+                i += 2 if text[i] == "\\" else 1
+        elif c == "<":
+            i = text.find(">", i)
+            if i < 0:
+                break
+        elif c == "[":
+            depth += 1
+        elif c == "]":
+            depth -= 1
+        elif depth == 0 and text.startswith(sep, i):
+            parts.append(text[start:i])
+            start = i + len(sep)
+            i = start
+            continue
+        i += 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _is_bnode(o: str) -> bool:
+    o = o.strip()
+    return o.startswith("[") and o.endswith("]")
+
+
+def _expand_bnode(o: str, ids) -> Tuple[str, List[Tuple[str, str, str]]]:
+    """'[ p o ; ... ]' -> ('_:bN', its triples, nested blank nodes included)."""
+    node = f"_:b{next(ids)}"
+    triples: List[Tuple[str, str, str]] = []
+    for part in _split_top(o.strip()[1:-1], ";"):
+        pieces = _split_top(part, " ")
+        if not pieces:
+            continue
+        p, obj = pieces[0], part[len(pieces[0]):].strip()
+        if _is_bnode(obj):
+            obj, nested = _expand_bnode(obj, ids)
+            triples.append((node, p, obj))
+            triples.extend(nested)
+        else:
+            triples.append((node, p, obj))
+    return node, triples
+
+
+# --- N-Triples terms -----------------------------------------------------------
+_NUMBER = re.compile(r"[+-]?(\d+)(\.\d*)?([eE][+-]?\d+)?$")
+_XSD = "http://www.w3.org/2001/XMLSchema#"
+
+
+def nt_term(term: str, prefixes: Dict[str, str]) -> str:
+    """A Turtle term as written by HydroTurtle -> the same term in N-Triples syntax."""
+    t = term.strip()
+    if t == "a":
+        return "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+    if t.startswith(("<", "_:")):
+        return t
+    if t.startswith('"'):
+        end = t.rfind('"')
+        tail = t[end + 1:]
+        if tail.startswith("^^"):
+            return t[:end + 1] + "^^" + nt_term(tail[2:], prefixes)
+        return t
+    m = _NUMBER.match(t)
+    if m:
+        dt = "double" if m.group(3) else "decimal" if m.group(2) else "integer"
+        return f'"{t}"^^<{_XSD}{dt}>'
+    if t in ("true", "false"):
+        return f'"{t}"^^<{_XSD}boolean>'
+    prefix, sep, local = t.partition(":")
+    if sep and prefix in prefixes:
+        return f"<{prefixes[prefix]}{local}>"
+    raise ValueError(f"Cannot expand {term!r}: unknown prefix {prefix!r}")
+
+
+def iter_triples(
+    source: str,
+    mapping: Union[str, Path, Dict[str, Any]],
+    kind: Optional[str] = None,
+    expand: bool = False,
+    json_encoding: str = "utf-8",
+    **options: Any
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield (s, p, o) triples of the conversion (see iter_subjects for the
+    options). Inline blank nodes are expanded into their own _:bN triples;
+    expand=True gives N-Triples terms (full IRIs, rdf:type for "a").
+    """
+    mapping = as_mapping(mapping, json_encoding)
+    prefixes = prefixes_for(mapping, **options) if expand else None
+    ids = count()
+    for s, pos in iter_subjects(source, mapping, kind=kind, **options):
+        for p, o in pos:
+            if _is_bnode(o):
+                o, nested = _expand_bnode(o, ids)
+                triples = [(s, p, o)] + nested
+            else:
+                triples = [(s, p, o)]
+            for t in triples:
+                yield tuple(nt_term(x, prefixes) for x in t) if expand else t
+
+
+def iter_ntriples(
+    source: str,
+    mapping: Union[str, Path, Dict[str, Any]],
+    kind: Optional[str] = None,
+    json_encoding: str = "utf-8",
+    **options: Any
+) -> Iterator[str]:
+    """N-Triples lines ("<s> <p> <o> .\\n") of the conversion."""
+    for s, p, o in iter_triples(source, mapping, kind=kind, expand=True, json_encoding=json_encoding, **options):
+        yield f"{s} {p} {o} .\n"
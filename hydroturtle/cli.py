@@ -1,64 +1,348 @@
 import argparse
-from hydroturtle.core.engine import run_convert, run_convert_batch  
-from hydroturtle.core.engine_shp import run_convert_shp
+import os
+import sys
+from hydroturtle.io.csv_reader import CSV_READERS
+
+# Engines are imported in the branch that runs them: the geo stack (fiona,
+# shapely, pyproj) and netCDF4 are only loaded for the commands that need
+# them, so short "csv" jobs start fast (see benchmarks/startup.py).
+
+def _positive_int(text):
+    try:
+        n = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer, got {text!r}") from None
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+def _add_filter_args(sp):
+    sp.add_argument("--bbox", default=None,
+                    help="Keep features intersecting min_lon,min_lat,max_lon,max_lat (CRS84)")
+    sp.add_argument("--mask", default=None,
+                    help="Keep features intersecting the geometries of this GeoJSON file (CRS84)")
+    sp.add_argument("--ids", default=None,
+                    help="Comma-separated ID values to keep")
+    sp.add_argument("--ids-file", default=None,
+                    help="Text file with one ID value per line to keep")
+
+def _filter_kwargs(args):
+    bbox = tuple(float(v) for v in args.bbox.split(",")) if args.bbox else None
+    if bbox is not None and len(bbox) != 4:
+        raise SystemExit("--bbox expects min_lon,min_lat,max_lon,max_lat")
+    mask = None
+    if args.mask:
+        from hydroturtle.geo.shp_reader import load_mask
+        mask = load_mask(args.mask)
+    ids = None
+    if args.ids or args.ids_file:
+        ids = [v.strip() for v in (args.ids or "").split(",") if v.strip()]
+        if args.ids_file:
+            with open(args.ids_file, encoding="utf-8") as f:
+                ids += [line.strip() for line in f if line.strip()]
+    return {"bbox": bbox, "mask": mask, "ids": ids}
 
 def main():
+    try:
+        _main()
+    except BrokenPipeError:
+        # "-" output piped into head & co. that stopped reading: quit quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+def _main():
     ap = argparse.ArgumentParser(description="HydroTurtle converter")
     sub = ap.add_subparsers(dest="cmd", required=True)
 
     # CSV mode
-    sp_csv = sub.add_parser("csv", help="Convert CSV → RDF/Turtle")
+    sp_csv = sub.add_parser("csv", help="Convert CSV (or Parquet/Arrow table) → RDF/Turtle")
     sp_csv.add_argument("csv")
     sp_csv.add_argument("mapping")
-    sp_csv.add_argument("out")
+    sp_csv.add_argument("out", help="Output .ttl (.gz / .bz2 / .xz to compress), or - for stdout")
     sp_csv.add_argument("--csv-encoding", default=None,
                         help="e.g., utf-8, utf-8-sig, cp1252, latin-1 (auto if omitted)")
     sp_csv.add_argument("--csv-delimiter", default=None,
                         help="Delimiter override, e.g., ';' (auto if omitted)")
     sp_csv.add_argument("--json-encoding", default="utf-8",
                         help="mapping JSON encoding (default utf-8)")
+    sp_csv.add_argument("--csv-reader", choices=list(CSV_READERS), default="dict",
+                        help="CSV backend: dict (csv.DictReader), tuple (csv.reader, mapped columns only) "
+                             "or arrow (pyarrow streaming parser)")
+    sp_csv.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; >1 splits the CSV into row ranges")
+    sp_csv.add_argument("--index-cache", action="store_true",
+                        help="Keep the row-offset index next to the CSV (<csv>.idx) for later runs")
+    sp_csv.add_argument("--pipeline", action="store_true",
+                        help="Overlap reading, rule evaluation and writing (bounded queues); "
+                             "with --workers, batches are evaluated in worker processes")
+    sp_csv.add_argument("--batch-rows", type=int, default=5000,
+                        help="Rows per batch with --pipeline (default 5000)")
+    sp_csv.add_argument("--max-triples", type=int, default=None,
+                        help="Keep at most this many triples in memory; subject groups beyond it are spilled "
+                             "to sorted temporary files and merged while writing")
+    sp_csv.add_argument("--spill-dir", default=None,
+                        help="Directory for the --max-triples temporary files (default: system temp)")
+    sp_csv.add_argument("--extra-mapping", action="append", default=[],
+                        help="Also apply this mapping in the same pass over the rows (repeatable); "
+                             "its triples go to out unless --extra-out is given")
+    sp_csv.add_argument("--extra-out", action="append", default=[],
+                        help="Output for the matching --extra-mapping (repeatable, same order)")
 
     # CSV batch mode 
-    sp_csvb = sub.add_parser("csv-batch", help="Batch-convert CSVs → RDF/Turtle (glob path)")
+    sp_csvb = sub.add_parser("csv-batch", help="Batch-convert CSVs (or Parquet/Arrow tables) → RDF/Turtle (glob path)")
     sp_csvb.add_argument("glob", help=r'Glob, e.g. "D:\camels\*.csv"')
     sp_csvb.add_argument("mapping")
     sp_csvb.add_argument("out_dir")
     sp_csvb.add_argument("--csv-encoding", default=None)
     sp_csvb.add_argument("--csv-delimiter", default=None)
     sp_csvb.add_argument("--json-encoding", default="utf-8")
+    sp_csvb.add_argument("--csv-reader", choices=list(CSV_READERS), default="dict")
+    sp_csvb.add_argument("--archive", default=None,
+                         help="Read the files from a zip/tar archive; glob then matches member names, e.g. \"*.csv\"")
+    sp_csvb.add_argument("--workers", type=int, default=1,
+                         help="Worker processes (one file per worker)")
+    sp_csvb.add_argument("--merge", default=None, metavar="NAME",
+                         help="Write one merged graph out_dir/NAME (e.g. all.ttl.gz) instead of a file per input")
+    sp_csvb.add_argument("--dedup", choices=["exact", "bloom", "none"], default="exact",
+                         help="With --merge: drop triples already written for an earlier file, using an "
+                              "on-disk hash set (exact) or a Bloom filter (bounded memory)")
+    sp_csvb.add_argument("--bloom-capacity", type=int, default=10_000_000,
+                         help="Expected number of distinct triples for --dedup bloom (default 10M)")
+    sp_csvb.add_argument("--bloom-error", type=float, default=1e-6,
+                         help="False positive rate for --dedup bloom (default 1e-6)")
+    sp_csvb.add_argument("--shard-triples", type=int, default=None,
+                         help="With --merge: start a new shard (NAME.0001.ttl, ...) after this many triples")
+
+    # NetCDF mode
+    sp_nc = sub.add_parser("nc", help="Convert NetCDF time series / gridded fields → RDF/Turtle")
+    sp_nc.add_argument("netcdf")
+    sp_nc.add_argument("mapping", help="Observation mapping (as for CSV; rule keys name variables)")
+    sp_nc.add_argument("out", help="Output .ttl (.gz / .bz2 / .xz to compress), or - for stdout")
+    sp_nc.add_argument("--time-dim", default=None,
+                       help="Time dimension (default: detected from CF time units)")
+    sp_nc.add_argument("--time-chunk", type=int, default=None,
+                       help="Time steps read per block (default 8760)")
+    sp_nc.add_argument("--space-chunk", type=int, default=None,
+                       help="Stations / grid cells read per block (default 64)")
+    sp_nc.add_argument("--max-triples", type=int, default=None,
+                       help="Keep at most this many triples in memory; subject groups beyond it are spilled "
+                            "to sorted temporary files and merged while writing")
+    sp_nc.add_argument("--spill-dir", default=None,
+                       help="Directory for the --max-triples temporary files (default: system temp)")
+    sp_nc.add_argument("--json-encoding", default="utf-8")
 
     # SHP mode
-    sp_shp = sub.add_parser("shp", help="Convert ESRI Shapefile → RDF/Turtle")
+    sp_shp = sub.add_parser("shp", help="Convert vector layer (Shapefile, GeoPackage, GeoJSON, FlatGeobuf, GeoParquet) → RDF/Turtle")
     sp_shp.add_argument("shapefile")
     sp_shp.add_argument("mapping")
-    sp_shp.add_argument("out")
+    sp_shp.add_argument("out", help="Output .ttl (.gz / .bz2 / .xz to compress), or - for stdout")
     sp_shp.add_argument("--id-field", default=None,
                         help="ID field in SHP table (if omitted, uses mapping configuration)")
     sp_shp.add_argument("--src-crs", default=None,
                         help="Override source CRS (if omitted, uses mapping configuration)")
+    sp_shp.add_argument("--layer", default=None,
+                        help="Layer of a multi-layer source, e.g. a GeoPackage table (default: first layer)")
     sp_shp.add_argument("--json-encoding", default="utf-8")
+    sp_shp.add_argument("--reader", choices=["fiona", "arrow"], default="fiona",
+                        help="Feature reader: fiona (per feature) or arrow (pyogrio record batches)")
+    sp_shp.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; >1 splits the layer into feature ranges")
+    sp_shp.add_argument("--chunk-size", type=_positive_int, default=None,
+                        help="Features per range with --workers (default: one range per worker)")
+    _add_filter_args(sp_shp)
+    sp_shp.add_argument("--hierarchy", action="store_true",
+                        help="Also emit containment triples between nested polygons (geo:sfWithin/geo:sfContains)")
+    sp_shp.add_argument("--summary-geometries", action="store_true",
+                        help="Also emit a bounding box and a centroid per feature")
+
+    # SHP batch mode
+    sp_shpb = sub.add_parser("shp-batch", help="Batch-convert vector layers → RDF/Turtle (glob path)")
+    sp_shpb.add_argument("glob", help=r'Glob, e.g. "D:\lamah\*.shp"')
+    sp_shpb.add_argument("mapping")
+    sp_shpb.add_argument("out_dir")
+    sp_shpb.add_argument("--id-field", default=None)
+    sp_shpb.add_argument("--src-crs", default=None)
+    sp_shpb.add_argument("--layer", default=None)
+    sp_shpb.add_argument("--json-encoding", default="utf-8")
+    sp_shpb.add_argument("--reader", choices=["fiona", "arrow"], default="fiona")
+    sp_shpb.add_argument("--workers", type=int, default=1,
+                         help="Worker processes (one file per worker)")
+    _add_filter_args(sp_shpb)
+
+    # SHP linking mode
+    sp_link = sub.add_parser("shp-link", help="Link point features to containing polygons → RDF/Turtle")
+    sp_link.add_argument("points", help="Point layer, e.g. gauges")
+    sp_link.add_argument("polygons", help="Polygon layer, e.g. catchments")
+    sp_link.add_argument("points_mapping")
+    sp_link.add_argument("polygons_mapping")
+    sp_link.add_argument("out", help="Output .ttl (.gz / .bz2 / .xz to compress), or - for stdout")
+    sp_link.add_argument("--predicate", default="sosa:hasFeatureOfInterest",
+                         help="Link predicate (default sosa:hasFeatureOfInterest)")
+    sp_link.add_argument("--all-matches", action="store_true",
+                         help="Link to every containing polygon, not just the smallest")
+    sp_link.add_argument("--max-distance", type=float, default=None,
+                         help="Link points outside all polygons to the nearest one within this distance (degrees)")
+    sp_link.add_argument("--reader", choices=["fiona", "arrow"], default="fiona")
+    sp_link.add_argument("--json-encoding", default="utf-8")
+
+    # Store modes
+    sp_load = sub.add_parser("load", help="Convert inputs straight into an embedded triple store (Oxigraph / rdflib)")
+    sp_load.add_argument("glob", help=r'Input file or glob, e.g. "D:\lamah\ID_*.csv"')
+    sp_load.add_argument("mapping")
+    sp_load.add_argument("store", help="Store directory (rdflib: the store plugin's path / URL)")
+    sp_load.add_argument("--backend", choices=["oxigraph", "rdflib"], default="oxigraph")
+    sp_load.add_argument("--rdflib-store", default="BerkeleyDB",
+                         help="rdflib store plugin for --backend rdflib (default BerkeleyDB)")
+    sp_load.add_argument("--kind", choices=["csv", "nc", "shp"], default=None,
+                         help="Input kind (default: from the file suffix)")
+    sp_load.add_argument("--workers", type=int, default=1,
+                         help="Worker processes converting files while the main process loads")
+    sp_load.add_argument("--batch-triples", type=int, default=200000,
+                         help="Triples per store transaction (default 200000)")
+    sp_load.add_argument("--csv-reader", choices=list(CSV_READERS), default=None)
+    sp_load.add_argument("--id-field", default=None)
+    sp_load.add_argument("--layer", default=None)
+    sp_load.add_argument("--json-encoding", default="utf-8")
+
+    sp_query = sub.add_parser("query", help="Run a SPARQL query on a store built with `load`")
+    sp_query.add_argument("store")
+    sp_query.add_argument("sparql", help="Query text, or @file.rq")
+    sp_query.add_argument("--backend", choices=["oxigraph", "rdflib"], default="oxigraph")
+    sp_query.add_argument("--rdflib-store", default="BerkeleyDB")
+
+    # Daemon mode
+    sp_srv = sub.add_parser("serve", help="Run a conversion daemon (HTTP / Unix socket job API, warm workers)")
+    sp_srv.add_argument("--host", default="127.0.0.1")
+    sp_srv.add_argument("--port", type=int, default=8765)
+    sp_srv.add_argument("--socket", default=None,
+                        help="Listen on this Unix socket path instead of host:port")
+    sp_srv.add_argument("--workers", type=int, default=1,
+                        help="Worker processes kept alive between jobs")
+    sp_srv.add_argument("--spool-dir", default=None,
+                        help="Where results without an explicit output path are kept (default: a temp dir)")
+    sp_srv.add_argument("--quiet", action="store_true", help="Do not log requests")
 
     args = ap.parse_args()
 
     if args.cmd == "csv":
-        run_convert(args.csv, args.mapping, args.out,
+        from hydroturtle.core.engine import run_convert
+        mapping, out = args.mapping, args.out
+        if args.extra_mapping:
+            if args.extra_out and len(args.extra_out) != len(args.extra_mapping):
+                raise SystemExit("Give one --extra-out per --extra-mapping, or none for a combined output")
+            mapping = [args.mapping] + args.extra_mapping
+            out = [args.out] + args.extra_out if args.extra_out else args.out
+        elif args.extra_out:
+            raise SystemExit("--extra-out needs --extra-mapping")
+        run_convert(args.csv, mapping, out,
                     csv_encoding=args.csv_encoding,
                     csv_delimiter=args.csv_delimiter,
-                    json_encoding=args.json_encoding)
+                    json_encoding=args.json_encoding,
+                    csv_reader=args.csv_reader,
+                    workers=args.workers,
+                    index_cache=args.index_cache,
+                    pipeline=args.pipeline,
+                    batch_rows=args.batch_rows,
+                    max_triples=args.max_triples,
+                    spill_dir=args.spill_dir)
         return
 
     if args.cmd == "csv-batch":
+        from hydroturtle.core.engine import run_convert_batch
         run_convert_batch(args.glob, args.mapping, args.out_dir,
                           csv_encoding=args.csv_encoding,
                           csv_delimiter=args.csv_delimiter,
-                          json_encoding=args.json_encoding)
+                          json_encoding=args.json_encoding,
+                          archive=args.archive,
+                          workers=args.workers,
+                          csv_reader=args.csv_reader,
+                          merge=args.merge,
+                          dedup=args.dedup,
+                          shard_triples=args.shard_triples,
+                          bloom_capacity=args.bloom_capacity,
+                          bloom_error=args.bloom_error)
+        return
+
+    if args.cmd == "nc":
+        from hydroturtle.core.engine_nc import run_convert_nc
+        run_convert_nc(args.netcdf, args.mapping, args.out,
+                       json_encoding=args.json_encoding,
+                       time_dim=args.time_dim,
+                       time_chunk=args.time_chunk,
+                       space_chunk=args.space_chunk,
+                       max_triples=args.max_triples,
+                       spill_dir=args.spill_dir)
         return
 
     if args.cmd == "shp":
+        from hydroturtle.core.engine_shp import run_convert_shp
         run_convert_shp(args.shapefile, args.mapping, args.out,
                         id_field=args.id_field,
                         src_crs_override=args.src_crs,
-                        json_encoding=args.json_encoding)
+                        json_encoding=args.json_encoding,
+                        reader=args.reader,
+                        workers=args.workers,
+                        chunk_size=args.chunk_size,
+                        hierarchy=args.hierarchy or None,
+                        summary_geometries=args.summary_geometries,
+                        layer=args.layer,
+                        **_filter_kwargs(args))
+        return
+
+    if args.cmd == "shp-batch":
+        from hydroturtle.core.engine_shp import run_convert_shp_batch
+        run_convert_shp_batch(args.glob, args.mapping, args.out_dir,
+                              id_field=args.id_field,
+                              src_crs_override=args.src_crs,
+                              json_encoding=args.json_encoding,
+                              reader=args.reader,
+                              workers=args.workers,
+                              layer=args.layer,
+                              **_filter_kwargs(args))
+        return
+
+    if args.cmd == "shp-link":
+        from hydroturtle.core.engine_shp import run_link_shp
+        run_link_shp(args.points, args.polygons, args.points_mapping, args.polygons_mapping, args.out,
+                     predicate=args.predicate,
+                     all_matches=args.all_matches,
+                     max_distance=args.max_distance,
+                     reader=args.reader,
+                     json_encoding=args.json_encoding)
+        return
+
+    if args.cmd == "load":
+        from glob import glob
+        from hydroturtle.store import load_store
+        sources = sorted(glob(args.glob)) or [args.glob]
+        options = {k: v for k, v in (("csv_reader", args.csv_reader), ("id_field", args.id_field),
+                                     ("layer", args.layer)) if v is not None}
+        n = load_store(sources, args.mapping, args.store,
+                       backend=args.backend,
+                       kind=args.kind,
+                       workers=args.workers,
+                       batch_triples=args.batch_triples,
+                       rdflib_store=args.rdflib_store,
+                       json_encoding=args.json_encoding,
+                       **options)
+        sys.stderr.write(f"Loaded {n} triples from {len(sources)} file(s) into {args.store}\n")
+        return
+
+    if args.cmd == "query":
+        from hydroturtle.store import query_store
+        sparql = args.sparql
+        if sparql.startswith("@"):
+            with open(sparql[1:], encoding="utf-8") as f:
+                sparql = f.read()
+        for line in query_store(args.store, sparql, backend=args.backend, rdflib_store=args.rdflib_store):
+            sys.stdout.write(line)
+        return
+
+    if args.cmd == "serve":
+        from hydroturtle.server import serve
+        serve(host=args.host, port=args.port, socket_path=args.socket,
+              workers=args.workers, spool_dir=args.spool_dir, quiet=args.quiet)
         return
 
 if __name__ == "__main__":
@@ -1,21 +1,250 @@
+from collections import deque
 from pathlib import Path
 from glob import glob
-from hydroturtle.core.evaluator import load_mapping, convert
-from hydroturtle.io.ttl_writer import write_turtle
+from hydroturtle.core.evaluator import load_mapping, convert, convert_multi, eval_rows, iter_source_rows
+from hydroturtle.io.archive import iter_archive_members
+from hydroturtle.io.csv_index import check_encoding, csv_index
+from hydroturtle.io.csv_reader import _sniff_delimiter, resolve_encoding
+from hydroturtle.io.merge import MergedWriter, make_seen_set
+from hydroturtle.core.pipeline import convert_pipelined
+from hydroturtle.io.parquet_reader import is_columnar
+from hydroturtle.io.spill import SubjectSpiller
+from hydroturtle.io.ttl_writer import write_blocks, write_turtle
 
 def run_convert(csv_path, mapping_path, out_path,
-                csv_encoding=None, csv_delimiter=None, json_encoding="utf-8"):
+                csv_encoding=None, csv_delimiter=None, json_encoding="utf-8", csv_reader="dict",
+                workers=1, index_cache=False, pipeline=False, batch_rows=5000,
+                max_triples=None, spill_dir=None):
+    if isinstance(mapping_path, (list, tuple)):
+        if max_triples:
+            raise ValueError("max_triples takes a single mapping")
+        return run_convert_multi(csv_path, mapping_path, out_path, csv_encoding=csv_encoding,
+                                 csv_delimiter=csv_delimiter, json_encoding=json_encoding,
+                                 csv_reader=csv_reader, workers=workers, pipeline=pipeline)
     mapping = load_mapping(mapping_path, json_encoding=json_encoding)
-    triples_by_subject, prefixes = convert(csv_path, mapping, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter)
+    if max_triples:
+        if workers > 1 or pipeline:
+            raise ValueError("max_triples bounds the sequential conversion; it cannot be combined with "
+                             "workers or pipeline")
+        return convert_spilled(csv_path, mapping, out_path, max_triples, spill_dir=spill_dir,
+                               csv_encoding=csv_encoding, csv_delimiter=csv_delimiter, csv_reader=csv_reader)
+    if pipeline:
+        # overlapped read / evaluate / write; workers > 1 evaluates batches in processes
+        return convert_pipelined(csv_path, mapping, out_path, csv_encoding=csv_encoding,
+                                 csv_delimiter=csv_delimiter, csv_reader=csv_reader,
+                                 batch_rows=batch_rows, eval_workers=workers)
+    if workers > 1 and not is_columnar(csv_path):
+        triples_by_subject, prefixes = convert_parallel(csv_path, mapping, workers, csv_encoding=csv_encoding,
+                                                        csv_delimiter=csv_delimiter, csv_reader=csv_reader,
+                                                        index_cache=index_cache)
+    else:
+        triples_by_subject, prefixes = convert(csv_path, mapping, csv_encoding=csv_encoding,
+                                               csv_delimiter=csv_delimiter, csv_reader=csv_reader)
     write_turtle(triples_by_subject, prefixes, out_path)
     return out_path
 
+def convert_spilled(csv_path, mapping, out_path, max_triples, spill_dir=None,
+                    csv_encoding=None, csv_delimiter=None, csv_reader="dict"):
+    """
+    convert + write_turtle holding at most max_triples triples in memory:
+    subject groups beyond that are spilled to sorted runs in spill_dir (a
+    temp dir by default) and merged while writing (see io.spill). The same
+    triples and one block per subject as convert; subjects are sorted when
+    anything was spilled.
+    """
+    rows = iter_source_rows(csv_path, mapping, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter,
+                            csv_reader=csv_reader)
+    return write_rows_spilled(enumerate(rows), mapping, csv_path, out_path, max_triples, spill_dir=spill_dir)
+
+def write_rows_spilled(indexed_rows, mapping, source_path, out_path, max_triples, spill_dir=None):
+    """Evaluate (rowIndex, row) pairs and write them through a SubjectSpiller (see convert_spilled)."""
+    with SubjectSpiller(max_triples, spill_dir=spill_dir) as groups:
+        add = groups.add
+        eval_rows(indexed_rows, mapping, source_path, lambda s, p, o, shared: add(s, p, o))
+        write_blocks(groups.blocks(), mapping["prefixes"], out_path)
+    return out_path
+
+def combine_results(results):
+    """
+    Merge (triples_by_subject, prefixes) results of several mappings into
+    one: subjects in first-seen order, each triple once; a prefix bound to
+    different IRIs by two mappings is an error.
+    """
+    combined, prefixes = {}, {}
+    for triples_by_subject, prefs in results:
+        for k, v in prefs.items():
+            if prefixes.setdefault(k, v) != v:
+                raise ValueError(f"Prefix {k!r} is bound to both <{prefixes[k]}> and <{v}> by the mappings")
+        for s, pos in triples_by_subject.items():
+            known = combined.setdefault(s, [])
+            if known:
+                seen = set(known)
+                known.extend(po for po in pos if po not in seen)
+            else:
+                known.extend(pos)
+    return combined, prefixes
+
+def run_convert_multi(csv_path, mapping_paths, out_paths,
+                      csv_encoding=None, csv_delimiter=None, json_encoding="utf-8", csv_reader="dict",
+                      workers=1, pipeline=False):
+    """
+    Apply several mappings (e.g. observations + quality flags) to csv_path
+    in one read. out_paths is one output per mapping, or a single output
+    for all of them combined. Returns out_paths.
+    """
+    if workers > 1 or pipeline:
+        raise ValueError("Several mappings are evaluated in one sequential pass; "
+                         "--workers / --pipeline take a single mapping")
+    mappings = [load_mapping(m, json_encoding=json_encoding) for m in mapping_paths]
+    separate = isinstance(out_paths, (list, tuple))
+    if separate and len(out_paths) != len(mappings):
+        raise ValueError(f"{len(mappings)} mappings but {len(out_paths)} outputs; give one output per "
+                         f"mapping or a single combined output")
+    results = convert_multi(csv_path, mappings, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter,
+                            csv_reader=csv_reader)
+    if not separate:
+        write_turtle(*combine_results(results), out_paths)
+        return out_paths
+    for (triples_by_subject, prefixes), out in zip(results, out_paths):
+        write_turtle(triples_by_subject, prefixes, out)
+    return out_paths
+
+def _convert_span(csv_path, mapping, header_end, start, end, row_start, csv_encoding, csv_delimiter, csv_reader):
+    with open(csv_path, "rb") as f:
+        head = f.read(header_end)
+        f.seek(start)
+        data = head + f.read(end - start)
+    return convert(csv_path, mapping, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter,
+                   data=data, csv_reader=csv_reader, row_start=row_start)[0]
+
+def convert_parallel(csv_path, mapping, workers, csv_encoding=None, csv_delimiter=None,
+                     csv_reader="dict", index_cache=False):
+    """
+    Convert one large CSV in worker processes. The file is split into row
+    ranges of similar byte size from its row-offset index (io.csv_index;
+    index_cache keeps it as <csv>.idx), each worker reads and converts only
+    its range with the right {rowIndex} offset, and the results are merged in
+    row order, so the output matches convert(). Encoding and delimiter are
+    resolved once for the whole file; the encoding must be ASCII-compatible
+    (ValueError for UTF-16/32).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    enc = csv_encoding or resolve_encoding(csv_path) or "utf-8"  # the sequential reader's choice
+    check_encoding(enc)
+    delim = csv_delimiter or mapping.get("context", {}).get("csv", {}).get("delimiter")
+    if delim is None:
+        with open(csv_path, "rb") as f:
+            delim = _sniff_delimiter(f.read(65536).decode(enc, errors="replace"))
+    idx = csv_index(csv_path, cache=index_cache, delimiter=delim)
+
+    triples_by_subject = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_convert_span, csv_path, mapping, idx.header_end, *idx.row_span(lo, hi), lo,
+                               enc, delim, csv_reader)
+                   for lo, hi in idx.chunks(workers)]
+        for fut in futures:
+            for s, pos in fut.result().items():
+                known = triples_by_subject.setdefault(s, [])
+                if known:
+                    # subjects shared across ranges (sensor, catchment, ...): keep the first of each triple
+                    seen = set(known)
+                    known.extend(po for po in pos if po not in seen)
+                else:
+                    known.extend(pos)
+    return triples_by_subject, mapping["prefixes"]
+
+def _convert_one(name, data, mapping, out_path, csv_encoding, csv_delimiter, csv_reader):
+    triples_by_subject, prefixes = convert(name, mapping, csv_encoding=csv_encoding,
+                                           csv_delimiter=csv_delimiter, data=data, csv_reader=csv_reader)
+    write_turtle(triples_by_subject, prefixes, out_path)
+    return out_path
+
+def _convert_blocks(name, data, mapping, csv_encoding, csv_delimiter, csv_reader):
+    return convert(name, mapping, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter,
+                   data=data, csv_reader=csv_reader)[0]
+
 def run_convert_batch(input_glob: str, mapping_path: str, out_dir: str,
-                      csv_encoding=None, csv_delimiter=None, json_encoding="utf-8"):
+                      csv_encoding=None, csv_delimiter=None, json_encoding="utf-8",
+                      archive: str | None = None, workers: int = 1, csv_reader: str = "dict",
+                      merge: str | None = None, dedup: str = "exact", shard_triples: int | None = None,
+                      bloom_capacity: int = 10_000_000, bloom_error: float = 1e-6):
+    """
+    Convert every file matching input_glob to out_dir/<stem>.ttl; two inputs
+    with the same stem (e.g. in different folders) are a ValueError.
+
+    With merge (a file name, e.g. "all.ttl.gz"), everything goes into one
+    graph out_dir/<merge> instead, or into shards of about shard_triples
+    triples (all.0001.ttl.gz, ...). Triples already written for an earlier
+    file are dropped: dedup "exact" keeps their digests in an on-disk hash
+    set, "bloom" in a Bloom filter of bloom_capacity triples at false
+    positive rate bloom_error (bounded memory; a false positive drops a new
+    triple), "none" keeps every file's triples. Returns the written paths.
+
+    With archive (a .zip or .tar[.gz|.bz2|.xz] file), input_glob matches
+    member names inside it instead ("*.csv", "TS/ID_*.csv"); members are read
+    straight from the archive, nothing is extracted to disk.
+
+    workers > 1 converts files in worker processes. Archive members are
+    handed to the workers as bytes while the archive is still being read;
+    at most 2 * workers members are in flight at a time.
+    """
     mapping = load_mapping(mapping_path, json_encoding=json_encoding)
     outd = Path(out_dir)
     outd.mkdir(parents=True, exist_ok=True)
-    for fp in sorted(glob(input_glob)):
-        out = outd / (Path(fp).stem + ".ttl")
-        triples_by_subject, prefixes = convert(fp, mapping, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter)
-        write_turtle(triples_by_subject, prefixes, str(out))
+
+    if archive:
+        sources = iter_archive_members(archive, input_glob)
+    else:
+        sources = ((fp, None) for fp in sorted(glob(input_glob)))
+
+    if merge:
+        return _run_merged(sources, mapping, str(outd / merge), csv_encoding, csv_delimiter, csv_reader,
+                           workers, make_seen_set(dedup, bloom_capacity, bloom_error), shard_triples)
+
+    def _jobs():
+        written = {}
+        for name, data in sources:
+            out = outd / (Path(name).stem + ".ttl")
+            if out in written:  # e.g. archive members A/ID_1.csv and B/ID_1.csv
+                raise ValueError(f"{written[out]} and {name} would both be written to {out}; "
+                                 f"narrow the glob or use merge")
+            written[out] = name
+            yield name, data, mapping, str(out), csv_encoding, csv_delimiter, csv_reader
+
+    if workers <= 1:
+        return [_convert_one(*job) for job in _jobs()]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    done, pending = [], deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job in _jobs():
+            if len(pending) >= 2 * workers:
+                done.append(pending.popleft().result())
+            pending.append(pool.submit(_convert_one, *job))
+        done.extend(f.result() for f in pending)
+    return done
+
+def _run_merged(sources, mapping, out_path, csv_encoding, csv_delimiter, csv_reader, workers, seen, shard_triples):
+    """Merged batch output (see run_convert_batch): files are converted in order, written by one MergedWriter."""
+    writer = MergedWriter(out_path, mapping["prefixes"], seen=seen, shard_triples=shard_triples)
+    try:
+        jobs = ((name, data, mapping, csv_encoding, csv_delimiter, csv_reader) for name, data in sources)
+        if workers <= 1:
+            for job in jobs:
+                writer.add(_convert_blocks(*job), mapping["prefixes"])
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for job in jobs:
+                    if len(pending) >= 2 * workers:
+                        writer.add(pending.popleft().result(), mapping["prefixes"])
+                    pending.append(pool.submit(_convert_blocks, *job))
+                while pending:
+                    writer.add(pending.popleft().result(), mapping["prefixes"])
+    finally:
+        paths = writer.close()
+    return paths
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from hydroturtle.core.evaluator import convert_rows
+from hydroturtle.io.nc_reader import count_positions, iter_nc_rows
+from hydroturtle.io.ttl_writer import write_turtle
+from hydroturtle.mapping.loader import load_mapping
+
+
+# NetCDF engine: applies the CSV observation mappings to NetCDF variables.
+#
+# Each mapping rule key names a variable; the file is streamed as one row per
+# (time step, station / grid cell) through io.nc_reader.iter_nc_rows and the
+# rows go through the same rule evaluation as CSV rows (evaluator.convert_rows).
+# So "@observation", "@resultTime", "@sensor", ... behave exactly as for CSV:
+#
+#   - the time coordinate is exposed as "<time_dim>" (ISO date-time) and as the
+#     components YYYY, MM, DD, hh, mm, ss for resultTime formats;
+#   - the station id comes from a 1-D variable along the station dimension
+#     (column_types.id.column_name, e.g. "station_id"), or from "cell" (grid
+#     position indices) for gridded fields, or from the file name as for CSV;
+#     with several stations / cells and no id column it defaults to "cell"
+#     (nc_mapping), since {rowIndex} alone does not tell them apart;
+#   - {rowIndex} is the time index.
+#
+# configuration.netcdf (all optional):
+#   time_dim     name of the time dimension (default: detected from CF units)
+#   time_chunk   time steps read per block (default 8760)
+#   space_chunk  stations / grid cells read per block (default 64)
+
+
+_NC_DEFAULTS = {"time_dim": None, "time_chunk": 8760, "space_chunk": 64}
+
+
+def _nc_settings(mapping: Dict[str, Any]) -> Dict[str, Any]:
+    cfg = mapping.get("configuration", {})
+    nc_cfg = cfg.get("netcdf", {}) if isinstance(cfg, dict) else {}
+    return {**_NC_DEFAULTS, **(nc_cfg if isinstance(nc_cfg, dict) else {})}
+
+
+def nc_mapping(nc_path: str, mapping: Dict[str, Any], time_dim: str | None = None) -> Dict[str, Any]:
+    """
+    The mapping to convert nc_path with: unchanged, or with the id column set
+    to "cell" when the file holds several stations / grid cells and the
+    mapping names no id column (every cell would get the file id otherwise,
+    and their observations, keyed by id and time index, would merge).
+    """
+    ctx = mapping.get("context", {})
+    columns = ctx.get("columns") or {}
+    if columns.get("id"):
+        return mapping
+    variables = list(mapping.get("rules", {}))
+    if count_positions(nc_path, variables, time_dim or _nc_settings(mapping)["time_dim"]) <= 1:
+        return mapping
+    return {**mapping, "context": {**ctx, "columns": {**columns, "id": "cell"}}}
+
+
+def iter_nc_source_rows(
+    nc_path: str,
+    mapping: Dict[str, Any],
+    time_dim: str | None = None,
+    time_chunk: int | None = None,
+    space_chunk: int | None = None
+):
+    """(rowIndex, row) pairs of a NetCDF file for the mapping's variables."""
+    settings = _nc_settings(mapping)
+    return iter_nc_rows(
+        nc_path, list(mapping.get("rules", {})),
+        time_dim=time_dim or settings["time_dim"],
+        time_chunk=int(time_chunk or settings["time_chunk"]),
+        space_chunk=int(space_chunk or settings["space_chunk"]),
+    )
+
+
+def convert_nc(
+    nc_path: str,
+    mapping: Dict[str, Any],
+    time_dim: str | None = None,
+    time_chunk: int | None = None,
+    space_chunk: int | None = None
+):
+    """NetCDF counterpart of evaluator.convert: returns (triples_by_subject, prefixes)."""
+    mapping = nc_mapping(nc_path, mapping, time_dim)
+    rows = iter_nc_source_rows(nc_path, mapping, time_dim=time_dim, time_chunk=time_chunk,
+                               space_chunk=space_chunk)
+    return convert_rows(rows, mapping, nc_path)
+
+
+def run_convert_nc(
+    nc_path: str,
+    mapping_path: str,
+    out_path: str,
+    json_encoding: str = "utf-8",
+    time_dim: str | None = None,
+    time_chunk: int | None = None,
+    space_chunk: int | None = None,
+    max_triples: int | None = None,
+    spill_dir: str | None = None
+):
+    """
+    Convert a NetCDF file to out_path. With max_triples the rows are streamed
+    into a bounded SubjectSpiller instead of one dict of all triples, as for
+    CSV (engine.convert_spilled), so the output may be larger than memory.
+    """
+    mapping = load_mapping(mapping_path, json_encoding=json_encoding)
+    if max_triples:
+        from hydroturtle.core.engine import write_rows_spilled
+
+        mapping = nc_mapping(nc_path, mapping, time_dim)
+        rows = iter_nc_source_rows(nc_path, mapping, time_dim=time_dim, time_chunk=time_chunk,
+                                   space_chunk=space_chunk)
+        return write_rows_spilled(rows, mapping, nc_path, out_path, max_triples, spill_dir=spill_dir)
+    triples_by_subject, prefixes = convert_nc(nc_path, mapping, time_dim=time_dim,
+                                              time_chunk=time_chunk, space_chunk=space_chunk)
+    write_turtle(triples_by_subject, prefixes, out_path)
+    return out_path
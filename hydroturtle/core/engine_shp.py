@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple, Optional
-
-from hydroturtle.geo.shp_reader import iter_features
-from hydroturtle.geo.wkt import wkt_literal_crs84
+import math
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from itertools import chain, repeat
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Sequence, Set, Tuple, Optional
+
+from hydroturtle.geo.shp_reader import count_features, iter_features, iter_feature_batches, read_field_names
+from hydroturtle.geo.wkt import geometry_kind_index, wkt_literal_rows
 from hydroturtle.io.ttl_writer import write_turtle
 from hydroturtle.mapping.loader import load_mapping
 
@@ -36,110 +41,409 @@ from hydroturtle.mapping.loader import load_mapping
 # Column rules only run if that field exists in the SHP attribute table.
 
 
-def _build_uri(name: str, ctx: Dict[str, Any], id_value: Any) -> str:
+_NODE_KEYS = ("sensor", "catchment", "geom", "collection", "observation")
+
+
+def _uri_template(name: str, ctx: Dict[str, Any]) -> str:
     tpl = (ctx.get("uri_templates") or {}).get(name)
     if not tpl:
         raise KeyError(f"uri_templates missing key '{name}'")
-    return tpl.format(id=id_value)
-
-
-def _resolve_ref(token: Any, ctx: Dict[str, Any], id_value: Any) -> Any:
-    if isinstance(token, str) and token.startswith("@"):
-        key = token[1:]
-        if key in ("sensor", "catchment", "geom", "collection", "observation"):
-            return _build_uri(key, ctx, id_value)
-    return token
+    return tpl
 
 
 def _emit(triples_by_subject: Dict[str, List[Tuple[str, str]]], s: str, p: str, o: str):
     triples_by_subject.setdefault(s, []).append((p, o))
 
 
-def _as_typed_literal(value: Any, datatype: str) -> str:
-    # datatype like "^^xsd:decimal"
-    return f"\"{value}\"{datatype}"
+# ---------------------------------------------------------------------------
+# Rule compilation
+#
+# The rules are compiled ONCE against the layer's field names into a flat list
+# of emit operations, so the per-feature loop only does value lookups and
+# string rendering (no isinstance dispatch, no "is this key a field?" tests).
+#
+# A compiled object is a (kind, arg, datatype) tuple:
+#   ("const", text, None)     emitted as-is (QName/IRI/literal)
+#   ("ref",   template, None) template.format(id=fid), e.g. "hyobs:sensor_{id}"
+#   ("col",   index, dt)      quoted value of fields[index], typed if dt ("^^xsd:..")
+#   ("wkt",   kind, None)     CRS84 GeoSPARQL WKT literal of the feature geometry
+#                             (kind: index into geo.wkt.GEOMETRY_KINDS, e.g. its envelope)
+#
+# An operation is (subject, predicate, obj, block):
+#   subject None  -> the feature's base subject, else a compiled object
+#   block None    -> emit  subject predicate obj
+#   block list    -> emit  subject predicate _:b{fid}_{n}  plus the block's
+#                    compiled (p, obj) pairs on that blank node
+# ---------------------------------------------------------------------------
+
+def _compile_ref(token: Any, ctx: Dict[str, Any]) -> Tuple[str, Any, Any]:
+    """Compile a subject/node token such as "@sensor" (anything else is a constant)."""
+    if isinstance(token, str) and token.startswith("@") and token[1:] in _NODE_KEYS:
+        return ("ref", _uri_template(token[1:], ctx), None)
+    return ("const", str(token), None)
 
 
-def _render_obj_shp(
+def _compile_obj(
     spec: Any,
-    props: Dict[str, Any],
     current_col: Optional[str],
     ctx: Dict[str, Any],
-    fid: Any,
-    geom: Any
-) -> str:
+    fields: List[str]
+) -> Optional[Tuple[str, Any, Any]]:
     """
-    Render an object for SHP mapping.
+    Compile an object spec. Returns None if the object can never be emitted
+    (typed-literal shorthand outside a column rule).
 
-    Returns:
-      - string object to emit
-      - "" to mean: skip this triple
+    Referenced attribute columns are appended to `fields`; the compiled
+    object stores the column's index in that list.
     """
+    def _col(name: str, dt: Optional[str]) -> Tuple[str, Any, Any]:
+        if name not in fields:
+            fields.append(name)
+        return ("col", fields.index(name), dt)
+
     # 1) WKT literal
     if isinstance(spec, dict) and "@wkt" in spec:
-        return wkt_literal_crs84(geom)
+        return ("wkt", geometry_kind_index(spec["@wkt"]), None)
 
     # 2) explicit column reference: {"@col":"Area_km2","as":"^^xsd:decimal"}
     if isinstance(spec, dict) and "@col" in spec:
-        col = spec["@col"]
-        val = props.get(col)
-        if val is None:
-            return ""
         dt = spec.get("as")
-        if isinstance(dt, str) and dt.startswith("^^"):
-            return _as_typed_literal(val, dt)
-        return f"\"{val}\""
+        return _col(spec["@col"], dt if isinstance(dt, str) and dt.startswith("^^") else None)
 
     # 3) template token "@catchment", "@geom", ...
     if isinstance(spec, str) and spec.startswith("@"):
-        return str(_resolve_ref(spec, ctx, fid))
+        return _compile_ref(spec, ctx)
 
     # 4) typed literal shorthand "^^xsd:decimal" inject current field value
     if isinstance(spec, str) and spec.startswith("^^"):
         if current_col is None:
-            return ""
-        val = props.get(current_col)
-        if val is None:
-            return ""
-        return _as_typed_literal(val, spec)
-
-    # 5) plain QName/IRI string
-    if isinstance(spec, str):
-        return spec
+            return None
+        return _col(current_col, spec)
 
-    return str(spec)
+    # 5) plain QName/IRI string (or anything else, stringified)
+    return ("const", str(spec), None)
 
 
-def _emit_blank_node_block(
-    triples_by_subject: Dict[str, List[Tuple[str, str]]],
-    subject: str,
-    predicate: str,
+def _compile_block(
     block: List[Any],
-    props: Dict[str, Any],
     current_col: Optional[str],
     ctx: Dict[str, Any],
-    fid: Any,
-    geom: Any,
-    bnode_counter: List[int]
+    fields: List[str]
+) -> List[Tuple[str, Tuple[str, Any, Any]]]:
+    out = []
+    for part in block:
+        if not (isinstance(part, list) and len(part) == 2):
+            continue
+        p3, o3 = part
+        obj3 = _compile_obj(o3, current_col, ctx, fields)
+        if obj3 is not None:
+            out.append((p3, obj3))
+    return out
+
+
+def _compile_pairs(
+    ops: List[Any],
+    subject: Optional[Tuple[str, Any, Any]],
+    pairs: List[Any],
+    current_col: Optional[str],
+    ctx: Dict[str, Any],
+    fields: List[str],
+    skip_directives: bool = False
 ):
+    """Compile [p, o] pairs emitted from one subject (o may be a blank-node block)."""
+    for part in pairs:
+        if not (isinstance(part, list) and len(part) == 2):
+            continue
+        p2, o2 = part
+
+        # skip accidental directives
+        if skip_directives and isinstance(p2, str) and p2.startswith("@"):
+            continue
+
+        if isinstance(o2, list):
+            ops.append((subject, p2, None, _compile_block(o2, current_col, ctx, fields)))
+            continue
+
+        obj2 = _compile_obj(o2, current_col, ctx, fields)
+        if obj2 is not None:
+            ops.append((subject, p2, obj2, None))
+
+
+def _compile_base_subject(rules: Dict[str, Any], ctx: Dict[str, Any]) -> Tuple[str, Any, Any]:
+    """Compile the per-feature base subject ("@subject" template, else sensor/catchment)."""
+    base: Optional[Tuple[str, Any, Any]] = None
+    subj_spec = rules.get("@subject")
+    if isinstance(subj_spec, dict) and "@template" in subj_spec:
+        base = _compile_ref(subj_spec["@template"], ctx)
+
+    if base is None or base == ("const", "", None):
+        # Default: prefer sensor if defined, else catchment
+        if "sensor" in (ctx.get("uri_templates") or {}):
+            base = _compile_ref("@sensor", ctx)
+        else:
+            base = _compile_ref("@catchment", ctx)
+    return base
+
+
+def _compile_shp_rules(
+    rules: Dict[str, Any],
+    ctx: Dict[str, Any],
+    field_names: List[str],
+    summary_geometries: bool = False
+) -> Tuple[Tuple[str, Any, Any], List[Any], List[str]]:
     """
-    Emit:
-        subject predicate _:bX .
-        _:bX p o .
-        ...
+    Compile SHP rules against the layer schema.
+
+    Returns (base_subject, ops, fields): the compiled base subject, the flat
+    list of operations (PASS A rules first, then PASS B column rules, in
+    mapping order) and the attribute columns the operations read.
+
+    summary_geometries appends, for every feature, a bounding box and a
+    centroid as lightweight geometry nodes on the base subject
+    (geo:hasBoundingBox / geo:hasCentroid, GeoSPARQL 1.1).
     """
-    bnode_counter[0] += 1
-    bnode_id = f"_:b{fid}_{bnode_counter[0]}"
-    _emit(triples_by_subject, subject, predicate, bnode_id)
+    fields: List[str] = []
+    ops: List[Any] = []
+    layer_fields = set(field_names)
+    base = _compile_base_subject(rules, ctx)
+
+    # ------------------------------------------------------------
+    # PASS A: legacy SHP dict rules (string values + node blocks)
+    # ------------------------------------------------------------
+    for pred, obj in rules.items():
+        if pred == "@subject":
+            continue
 
-    for part in block:
-        if not (isinstance(part, list) and len(part) == 2):
+        # If this rule key is a real SHP attribute column name, it is handled in PASS B.
+        if isinstance(pred, str) and (not pred.startswith("@")) and (pred in layer_fields):
             continue
-        p3, o3 = part
-        obj3 = _render_obj_shp(o3, props, current_col, ctx, fid, geom)
-        if obj3 == "":
+
+        # Node-builder blocks like "@geom": [ ... ]
+        if isinstance(obj, list) and isinstance(pred, str) and pred.startswith("@"):
+            _compile_pairs(ops, _compile_ref(pred, ctx), obj, None, ctx, fields)
+            continue
+
+        # Simple predicate -> object
+        if isinstance(obj, str):
+            if obj == "^^xsd:string" and isinstance(pred, str) and pred.endswith("identifier"):
+                # the ID field value is the feature id
+                ops.append((None, pred, ("ref", "\"{id}\"^^xsd:string", None), None))
+            else:
+                ops.append((None, pred, _compile_ref(obj, ctx), None))
+            continue
+
+        # List of immediate triples from subject (legacy style)
+        if isinstance(obj, list):
+            _compile_pairs(ops, None, obj, None, ctx, fields, skip_directives=True)
+            continue
+
+    # ------------------------------------------------------------
+    # PASS B: CSV-style column rules for SHP attribute fields
+    # ------------------------------------------------------------
+    for col_name, rule_spec in rules.items():
+        if not isinstance(col_name, str):
+            continue
+        if col_name.startswith("@"):
+            continue
+        if not isinstance(rule_spec, list):
+            continue
+        if col_name not in layer_fields:
+            continue  # only apply if the SHP has that field
+
+        local_subject = None
+        for part in rule_spec:
+            if not (isinstance(part, list) and len(part) == 2):
+                continue
+            if part[0] == "@subject":
+                local_subject = _compile_ref(part[1], ctx)
+                continue
+            _compile_pairs(ops, local_subject, [part], col_name, ctx, fields)
+
+    if summary_geometries:
+        _compile_pairs(ops, None, [
+            ["geo:hasBoundingBox", [["rdf:type", "sf:Polygon"], ["geo:asWKT", {"@wkt": "envelope"}]]],
+            ["geo:hasCentroid", [["rdf:type", "sf:Point"], ["geo:asWKT", {"@wkt": "centroid"}]]],
+        ], None, ctx, fields)
+
+    return base, ops, fields
+
+
+def _geometry_kinds(ops: List[Any]) -> Set[int]:
+    """The geometry kinds (WKT literals) the compiled operations emit."""
+    objs = []
+    for _subj, _pred, obj, block in ops:
+        objs.extend([obj] if block is None else [o for _p, o in block])
+    return {o[1] for o in objs if o[0] == "wkt"}
+
+
+def _render(obj: Tuple[str, Any, Any], vals: Sequence[Any], fid: Any, wkt: Sequence[Optional[str]]) -> str:
+    """Render a compiled object; "" means: skip this triple."""
+    kind, arg, dt = obj
+    if kind == "const":
+        return arg
+    if kind == "ref":
+        return arg.format(id=fid)
+    if kind == "col":
+        val = vals[arg]
+        if val is None:
+            return ""
+        # datatype like "^^xsd:decimal"
+        return f"\"{val}\"{dt}" if dt else f"\"{val}\""
+    return wkt[arg]
+
+
+def _emit_feature(
+    triples_by_subject: Dict[str, List[Tuple[str, str]]],
+    base: Tuple[str, Any, Any],
+    ops: List[Any],
+    fid: Any,
+    vals: Sequence[Any],
+    wkt: Sequence[Optional[str]]
+):
+    subject = _render(base, vals, fid, wkt)
+
+    # per-feature blank node counter
+    n = 0
+    for subj, pred, obj, block in ops:
+        s = subject if subj is None else _render(subj, vals, fid, wkt)
+
+        if block is None:
+            o = _render(obj, vals, fid, wkt)
+            if o == "":
+                continue
+            _emit(triples_by_subject, s, pred, o)
             continue
-        _emit(triples_by_subject, bnode_id, p3, str(_resolve_ref(obj3, ctx, fid)))
+
+        # subject predicate _:bX .  _:bX p o . ...
+        n += 1
+        bnode_id = f"_:b{fid}_{n}"
+        _emit(triples_by_subject, s, pred, bnode_id)
+        for p3, o3 in block:
+            o = _render(o3, vals, fid, wkt)
+            if o == "":
+                continue
+            _emit(triples_by_subject, bnode_id, p3, o)
+
+
+_HIERARCHY_DEFAULTS = {
+    "within": "geo:sfWithin",      # child  -> parent
+    "contains": "geo:sfContains",  # parent -> child
+    "upstream": None,              # child  -> parent, e.g. "hyobs:upstreamOf" (off by default)
+    "direct_only": True,           # only the immediate (smallest) parent
+    "min_overlap": 0.99,           # share of the child's area inside the parent
+}
+
+
+def _get_hierarchy_from_mapping(mapping: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    cfg = mapping.get("configuration", {})
+    if not isinstance(cfg, dict):
+        return None
+    shp_cfg = cfg.get("shapefile", {})
+    if not isinstance(shp_cfg, dict):
+        return None
+    h = shp_cfg.get("hierarchy")
+    return h if isinstance(h, dict) else None
+
+
+def _emit_hierarchy(
+    triples_by_subject: Dict[str, List[Tuple[str, str]]],
+    shp_path: str,
+    mapping: Dict[str, Any],
+    settings: Dict[str, Any],
+    id_field: str | None,
+    src_crs_override: str | None,
+    reader: str,
+    layer: str | None = None,
+    filters: Optional[Dict[str, Any]] = None
+):
+    """
+    Emit containment triples between the polygons of one layer (nested
+    catchments). Runs as its own pass over ids + geometries only, so the
+    per-feature conversion keeps streaming; filters (bbox/mask/ids) select
+    the same features as that conversion.
+    """
+    from hydroturtle.geo.relations import nested_polygons
+
+    cfg = {**_HIERARCHY_DEFAULTS, **settings}
+    ctx, id_field_final, src_crs_final = _shp_settings(mapping, id_field, src_crs_override)
+    subject = _compile_base_subject(mapping.get("rules", {}), ctx)
+
+    ids, geoms = _read_geometries(shp_path, id_field_final, src_crs_final, reader, layer, filters)
+    pairs = nested_polygons(geoms, min_overlap=float(cfg["min_overlap"]), direct_only=bool(cfg["direct_only"]))
+    for i, j in pairs:
+        child = _render(subject, (), ids[i], None)
+        parent = _render(subject, (), ids[j], None)
+        if cfg["within"]:
+            _emit(triples_by_subject, child, cfg["within"], parent)
+        if cfg["upstream"]:
+            _emit(triples_by_subject, child, cfg["upstream"], parent)
+        if cfg["contains"]:
+            _emit(triples_by_subject, parent, cfg["contains"], child)
+
+
+# features per vectorised WKT call on the fiona path
+_FIONA_BATCH = 1024
+
+
+def _iter_shp_rows(
+    shp_path: str,
+    fields: List[str],
+    id_field: str,
+    src_crs: Optional[str],
+    geom_kinds: Set[int],
+    reader: str = "fiona",
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    layer: Optional[str] = None
+) -> Iterator[Tuple[Any, Sequence[Any], Optional[str]]]:
+    """
+    Yield (fid, vals, wkt) per feature, where vals line up with `fields` and
+    wkt holds the CRS84 WKT literals of the requested geometry kinds (see
+    geo.wkt.wkt_literal_rows; () when no rule emits geometry). Literals are
+    computed per batch of features with vectorised shapely calls.
+
+    reader="fiona"  one feature dict at a time (default)
+    reader="arrow"  pyogrio/Arrow record batches; attribute columns, reprojection
+                    and WKT serialisation are handled per batch as arrays
+
+    filters holds the reader-level bbox/mask/ids pushdown filters; layer
+    selects a layer of multi-layer sources (GeoPackage, ...).
+    """
+    filters = filters or {}
+    with_geometry = bool(geom_kinds)
+
+    def _wkts(geoms, n):
+        return wkt_literal_rows(geoms, geom_kinds) if with_geometry else repeat((), n)
+
+    if reader == "fiona":
+        buf: List[Dict[str, Any]] = []
+        feats = iter_features(shp_path, id_field=id_field, src_crs_override=src_crs,
+                              with_geometry=with_geometry, start=start, stop=stop, layer=layer, **filters)
+        for feat in chain(feats, [None]):
+            if feat is not None:
+                buf.append(feat)
+                if len(buf) < _FIONA_BATCH:
+                    continue
+            if not buf:
+                break
+            wkts = _wkts([f["geom"] for f in buf], len(buf))
+            for f, wkt in zip(buf, wkts):
+                props = f["props"]
+                yield f["id"], [props.get(c) for c in fields], wkt
+            buf = []
+        return
+
+    if reader == "arrow":
+        for batch in iter_feature_batches(shp_path, fields, id_field=id_field,
+                                          src_crs_override=src_crs, with_geometry=with_geometry,
+                                          start=start, stop=stop, layer=layer, **filters):
+            ids = batch["ids"]
+            vals = zip(*batch["columns"]) if fields else repeat((), len(ids))
+            yield from zip(ids, vals, _wkts(batch["geoms"], len(ids)))
+        return
+
+    raise ValueError(f"Unknown SHP reader {reader!r} (expected 'fiona' or 'arrow')")
 
 
 def _build_ctx_from_mapping(mapping: Dict[str, Any]) -> Dict[str, Any]:
@@ -200,19 +504,18 @@ def _get_src_crs_from_mapping(mapping: Dict[str, Any]) -> Optional[str]:
     return shp_cfg.get("src_crs")
 
 
-def run_convert_shp(
-    shp_path: str,
-    mapping_path: str,
-    out_path: str,
-    id_field: str | None = None,
-    src_crs_override: str | None = None,
-    json_encoding: str = "utf-8"
-):
-    mapping = load_mapping(mapping_path, json_encoding=json_encoding)
+def _get_layer_from_mapping(mapping: Dict[str, Any]) -> Optional[str]:
+    cfg = mapping.get("configuration", {})
+    shp_cfg = cfg.get("shapefile", {}) if isinstance(cfg, dict) else {}
+    return shp_cfg.get("layer") if isinstance(shp_cfg, dict) else None
 
-    prefixes = mapping["prefixes"]
-    rules = mapping.get("rules", {})
 
+def _shp_settings(
+    mapping: Dict[str, Any],
+    id_field: str | None,
+    src_crs_override: str | None
+) -> Tuple[Dict[str, Any], str, Optional[str]]:
+    """Resolve (ctx, id_field, src_crs) for a layer from the mapping and CLI overrides."""
     # Build ctx regardless of mapping style (old/new)
     ctx = _build_ctx_from_mapping(mapping)
 
@@ -225,134 +528,367 @@ def run_convert_shp(
         mapping_id = ctx["columns"].get("id")
     id_field_final = id_field or mapping_id or "OBJECTID"
 
+    return ctx, id_field_final, src_crs_final
+
+
+def _convert_shp_range(
+    shp_path: str,
+    mapping: Dict[str, Any],
+    id_field: str | None = None,
+    src_crs_override: str | None = None,
+    reader: str = "fiona",
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    summary_geometries: bool = False,
+    layer: Optional[str] = None
+) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Convert the features [start, stop) of one layer (the whole layer if both
+    are None). Module-level so it can run in a worker process.
+    """
+    rules = mapping.get("rules", {})
+    ctx, id_field_final, src_crs_final = _shp_settings(mapping, id_field, src_crs_override)
+
+    base, ops, fields = _compile_shp_rules(rules, ctx, read_field_names(shp_path, layer), summary_geometries)
+
+    # Attribute-only fast path: no geometry decoding/reprojection when no rule emits WKT
+    geom_kinds = _geometry_kinds(ops)
+
     triples_by_subject: Dict[str, List[Tuple[str, str]]] = {}
 
-    for feat in iter_features(shp_path, id_field=id_field_final, src_crs_override=src_crs_final):
-        fid = feat["id"]
-        props = feat["props"]
-        geom = feat["geom"]
+    for fid, vals, wkt in _iter_shp_rows(shp_path, fields, id_field_final, src_crs_final,
+                                         geom_kinds, reader=reader, start=start, stop=stop,
+                                         filters=filters, layer=layer):
+        _emit_feature(triples_by_subject, base, ops, fid, vals, wkt)
 
-        # per-feature blank node counter
-        bnode_counter = [0]
+    return triples_by_subject
 
-        # Determine base subject
-        subject: Optional[str] = None
-        subj_spec = rules.get("@subject")
-        if isinstance(subj_spec, dict) and "@template" in subj_spec:
-            subject = str(_resolve_ref(subj_spec["@template"], ctx, fid))
 
-        if not subject:
-            # Default: prefer sensor if defined, else catchment
-            if "sensor" in (ctx.get("uri_templates") or {}):
-                subject = str(_resolve_ref("@sensor", ctx, fid))
-            else:
-                subject = str(_resolve_ref("@catchment", ctx, fid))
+def _count_selected(shp_path: str, mapping: Dict[str, Any], id_field: str | None, src_crs_override: str | None,
+                    reader: str, filters: Dict[str, Any], layer: str | None) -> int:
+    """Number of features the bbox/mask/ids filters select (no attributes read, nothing reprojected)."""
+    _ctx, id_field_final, src_crs_final = _shp_settings(mapping, id_field, src_crs_override)
+    rows = _iter_shp_rows(shp_path, [], id_field_final, src_crs_final, set(), reader=reader, filters=filters,
+                          layer=layer)
+    return sum(1 for _ in rows)
 
-        # ------------------------------------------------------------
-        # PASS A: legacy SHP dict rules (string values + node blocks)
-        # ------------------------------------------------------------
-        for pred, obj in rules.items():
-            if pred == "@subject":
-                continue
 
-            # If this rule key is a real SHP attribute column name, it will be handled in PASS B.
-            if isinstance(pred, str) and (not pred.startswith("@")) and (pred in props):
-                continue
+def convert_shp(
+    shp_path: str,
+    mapping: Dict[str, Any],
+    id_field: str | None = None,
+    src_crs_override: str | None = None,
+    reader: str = "fiona",
+    workers: int = 1,
+    chunk_size: int | None = None,
+    bbox: Tuple[float, float, float, float] | None = None,
+    mask: Any = None,
+    ids: List[Any] | None = None,
+    hierarchy: bool | Dict[str, Any] | None = None,
+    summary_geometries: bool = False,
+    layer: str | None = None
+):
+    """
+    SHP counterpart of evaluator.convert: returns (triples_by_subject, prefixes).
+
+    shp_path may be any vector source the readers open: Shapefile,
+    GeoPackage, GeoJSON, FlatGeobuf (through OGR) or GeoParquet (read by row
+    group with pyarrow). layer (default: configuration.shapefile.layer, else
+    the first layer) picks a layer of multi-layer sources such as GeoPackage.
+
+    With workers > 1 the layer is split into feature ranges (chunk_size
+    features each, default: one range per worker) that are converted in
+    worker processes. Blank nodes are named per feature (_:b{fid}_{n}), so
+    ranges never collide, and results are merged in range order: the output
+    is the same as a single-process run.
+
+    bbox (CRS84 lon/lat), mask (CRS84 geometry) and ids (values of the ID
+    field) select features at the reader, before any decoding. With workers,
+    a filtered layer is first counted (a pass over ids, plus geometries for
+    a spatial filter) and the ranges then cover the selected features.
+
+    hierarchy adds containment triples between the layer's polygons (nested
+    catchments): True uses configuration.shapefile.hierarchy of the mapping
+    (or the defaults), a dict overrides individual settings, None/False
+    disables it unless the mapping configures it. Settings:
+    within / contains / upstream (predicates or null), direct_only, min_overlap.
+
+    summary_geometries adds a bounding box and a centroid per
+    feature (geo:hasBoundingBox / geo:hasCentroid nodes with their own WKT),
+    so spatial queries can pre-filter without parsing full polygons.
+    """
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    prefixes = mapping["prefixes"]
+    filters = {k: v for k, v in (("bbox", bbox), ("mask", mask), ("ids", ids)) if v is not None}
+    layer = layer or _get_layer_from_mapping(mapping)
+
+    if workers <= 1:
+        triples_by_subject = _convert_shp_range(shp_path, mapping, id_field, src_crs_override, reader,
+                                                filters=filters, summary_geometries=summary_geometries,
+                                                layer=layer)
+    else:
+        if filters:
+            n = _count_selected(shp_path, mapping, id_field, src_crs_override, reader, filters, layer)
+        else:
+            n = count_features(shp_path, layer)
+        size = chunk_size or max(1, math.ceil(n / workers))
+        ranges = [(lo, min(lo + size, n)) for lo in range(0, n, size)]
+        if filters and ranges:
+            # start/stop count the features the reader passes; the last range stays open in case
+            # OGR passed more than were counted (envelope-only filtering, see shp_reader._filter_region)
+            ranges[-1] = (ranges[-1][0], None)
+
+        triples_by_subject = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_convert_shp_range, shp_path, mapping, id_field, src_crs_override, reader, lo, hi,
+                            filters, summary_geometries, layer)
+                for lo, hi in ranges
+            ]
+            for fut in futures:
+                for s, pos in fut.result().items():
+                    triples_by_subject.setdefault(s, []).extend(pos)
+
+    h_settings = _hierarchy_settings(mapping, hierarchy)
+    if h_settings is not None:
+        _emit_hierarchy(triples_by_subject, shp_path, mapping, h_settings, id_field, src_crs_override, reader,
+                        layer, filters)
+
+    return triples_by_subject, _shp_prefixes(prefixes, h_settings is not None, summary_geometries)
+
+
+def _hierarchy_settings(mapping: Dict[str, Any], hierarchy: bool | Dict[str, Any] | None):
+    """Hierarchy settings from the mapping and the hierarchy argument; None = off."""
+    h_settings = _get_hierarchy_from_mapping(mapping)
+    if isinstance(hierarchy, dict):
+        h_settings = {**(h_settings or {}), **hierarchy}
+    elif hierarchy:
+        h_settings = h_settings or {}
+    return h_settings
+
+
+def _shp_prefixes(prefixes: Dict[str, str], hierarchy: bool, summary_geometries: bool) -> Dict[str, str]:
+    if hierarchy and "geo" not in prefixes:
+        prefixes = {**prefixes, "geo": "http://www.opengis.net/ont/geosparql#"}
+    if summary_geometries:
+        prefixes = {"geo": "http://www.opengis.net/ont/geosparql#",
+                    "sf": "http://www.opengis.net/ont/sf#", **prefixes}
+    return prefixes
+
+
+def iter_shp_subjects(
+    shp_path: str,
+    mapping: Dict[str, Any],
+    id_field: str | None = None,
+    src_crs_override: str | None = None,
+    reader: str = "fiona",
+    bbox: Tuple[float, float, float, float] | None = None,
+    mask: Any = None,
+    ids: List[Any] | None = None,
+    hierarchy: bool | Dict[str, Any] | None = None,
+    summary_geometries: bool = False,
+    layer: str | None = None
+) -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    Streaming counterpart of convert_shp (one process): yields the
+    (subject, [(p, o), ...]) blocks of each feature as it is read, then the
+    hierarchy triples if enabled. Prefixes: shp_prefixes(mapping, ...).
+    """
+    filters = {k: v for k, v in (("bbox", bbox), ("mask", mask), ("ids", ids)) if v is not None}
+    layer = layer or _get_layer_from_mapping(mapping)
+    ctx, id_field_final, src_crs_final = _shp_settings(mapping, id_field, src_crs_override)
+    base, ops, fields = _compile_shp_rules(mapping.get("rules", {}), ctx, read_field_names(shp_path, layer),
+                                           summary_geometries)
+
+    for fid, vals, wkt in _iter_shp_rows(shp_path, fields, id_field_final, src_crs_final, _geometry_kinds(ops),
+                                         reader=reader, filters=filters, layer=layer):
+        feature: Dict[str, List[Tuple[str, str]]] = {}
+        _emit_feature(feature, base, ops, fid, vals, wkt)
+        yield from feature.items()
+
+    h_settings = _hierarchy_settings(mapping, hierarchy)
+    if h_settings is not None:
+        relations: Dict[str, List[Tuple[str, str]]] = {}
+        _emit_hierarchy(relations, shp_path, mapping, h_settings, id_field, src_crs_override, reader, layer,
+                        filters)
+        yield from relations.items()
+
+
+def shp_prefixes(
+    mapping: Dict[str, Any],
+    hierarchy: bool | Dict[str, Any] | None = None,
+    summary_geometries: bool = False
+) -> Dict[str, str]:
+    """The prefixes convert_shp / iter_shp_subjects use with these options."""
+    return _shp_prefixes(mapping["prefixes"], _hierarchy_settings(mapping, hierarchy) is not None,
+                         summary_geometries)
 
-            # Node-builder blocks like "@geom": [ ... ]
-            if isinstance(obj, list) and isinstance(pred, str) and pred.startswith("@"):
-                node_uri = str(_resolve_ref(pred, ctx, fid))
-                for part in obj:
-                    if not (isinstance(part, list) and len(part) == 2):
-                        continue
-                    p2, o2 = part
-
-                    if isinstance(o2, list):
-                        _emit_blank_node_block(
-                            triples_by_subject, node_uri, p2, o2,
-                            props, current_col=None, ctx=ctx, fid=fid, geom=geom,
-                            bnode_counter=bnode_counter
-                        )
-                        continue
-
-                    obj2 = _render_obj_shp(o2, props, current_col=None, ctx=ctx, fid=fid, geom=geom)
-                    if obj2 == "":
-                        continue
-                    _emit(triples_by_subject, node_uri, p2, str(_resolve_ref(obj2, ctx, fid)))
-                continue
 
-            # Simple predicate -> object
-            if isinstance(obj, str):
-                if obj == "^^xsd:string" and isinstance(pred, str) and pred.endswith("identifier"):
-                    val = props.get(id_field_final, fid)
-                    o = f"\"{val}\"^^xsd:string"
-                else:
-                    o = str(_resolve_ref(obj, ctx, fid))
-                _emit(triples_by_subject, subject, pred, o)
-                continue
+def run_convert_shp(
+    shp_path: str,
+    mapping_path: str,
+    out_path: str,
+    id_field: str | None = None,
+    src_crs_override: str | None = None,
+    json_encoding: str = "utf-8",
+    reader: str = "fiona",
+    workers: int = 1,
+    chunk_size: int | None = None,
+    bbox: Tuple[float, float, float, float] | None = None,
+    mask: Any = None,
+    ids: List[Any] | None = None,
+    hierarchy: bool | Dict[str, Any] | None = None,
+    summary_geometries: bool = False,
+    layer: str | None = None
+):
+    mapping = load_mapping(mapping_path, json_encoding=json_encoding)
+    triples_by_subject, prefixes = convert_shp(
+        shp_path, mapping,
+        id_field=id_field, src_crs_override=src_crs_override,
+        reader=reader, workers=workers, chunk_size=chunk_size,
+        bbox=bbox, mask=mask, ids=ids, hierarchy=hierarchy,
+        summary_geometries=summary_geometries, layer=layer
+    )
+    write_turtle(triples_by_subject, prefixes, out_path)
+    return out_path
 
-            # List of immediate triples from subject (legacy style)
-            if isinstance(obj, list) and not (isinstance(pred, str) and pred.startswith("@")):
-                for part in obj:
-                    if not (isinstance(part, list) and len(part) == 2):
-                        continue
-                    p2, o2 = part
-
-                    # skip accidental directives
-                    if isinstance(p2, str) and p2.startswith("@"):
-                        continue
-
-                    if isinstance(o2, list):
-                        _emit_blank_node_block(
-                            triples_by_subject, subject, p2, o2,
-                            props, current_col=None, ctx=ctx, fid=fid, geom=geom,
-                            bnode_counter=bnode_counter
-                        )
-                        continue
-
-                    obj2 = _render_obj_shp(o2, props, current_col=None, ctx=ctx, fid=fid, geom=geom)
-                    if obj2 == "":
-                        continue
-                    _emit(triples_by_subject, subject, p2, str(_resolve_ref(obj2, ctx, fid)))
-                continue
 
-        # ------------------------------------------------------------
-        # PASS B: CSV-style column rules for SHP attribute fields
-        # ------------------------------------------------------------
-        for col_name, rule_spec in rules.items():
-            if not isinstance(col_name, str):
-                continue
-            if col_name.startswith("@"):
-                continue
-            if not isinstance(rule_spec, list):
-                continue
-            if col_name not in props:
-                continue  # only apply if the SHP has that field
+def _run_convert_shp_file(shp_path: str, mapping: Dict[str, Any], out_path: str,
+                          id_field, src_crs_override, reader, filters) -> str:
+    triples_by_subject, prefixes = convert_shp(
+        shp_path, mapping, id_field=id_field, src_crs_override=src_crs_override, reader=reader,
+        **filters
+    )
+    write_turtle(triples_by_subject, prefixes, out_path)
+    return out_path
 
-            current_col = col_name
-            local_subject = subject
 
-            for part in rule_spec:
-                if not (isinstance(part, list) and len(part) == 2):
-                    continue
-                p, o = part
+def run_convert_shp_batch(
+    input_glob: str,
+    mapping_path: str,
+    out_dir: str,
+    id_field: str | None = None,
+    src_crs_override: str | None = None,
+    json_encoding: str = "utf-8",
+    reader: str = "fiona",
+    workers: int = 1,
+    bbox: Tuple[float, float, float, float] | None = None,
+    mask: Any = None,
+    ids: List[Any] | None = None,
+    layer: str | None = None
+):
+    """
+    Convert every layer matching input_glob to out_dir/<stem>.ttl, one file
+    per worker process (workers=1 converts them one after another).
+    bbox/mask/ids filter every layer as in convert_shp; layer names the layer
+    to read from each file.
+    """
+    filters = {"bbox": bbox, "mask": mask, "ids": ids, "layer": layer}
+    mapping = load_mapping(mapping_path, json_encoding=json_encoding)
+    outd = Path(out_dir)
+    outd.mkdir(parents=True, exist_ok=True)
+    files = sorted(glob(input_glob))
+    jobs = [(fp, mapping, str(outd / (Path(fp).stem + ".ttl")), id_field, src_crs_override, reader, filters)
+            for fp in files]
+
+    if workers <= 1 or len(jobs) <= 1:
+        return [_run_convert_shp_file(*job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_convert_shp_file, *zip(*jobs)))
+
+
+# ---------------------------------------------------------------------------
+# Spatial linking between layers (gauge points -> catchment polygons)
+# ---------------------------------------------------------------------------
+
+def _read_geometries(shp_path: str, id_field: str, src_crs: Optional[str], reader: str = "fiona",
+                     layer: Optional[str] = None, filters: Optional[Dict[str, Any]] = None):
+    """(ids, CRS84 geometry array) of a layer (or its filtered features); attributes are not kept."""
+    import numpy as np
+
+    filters = filters or {}
+
+    if reader == "arrow":
+        ids: List[Any] = []
+        parts = []
+        for batch in iter_feature_batches(shp_path, [], id_field=id_field, src_crs_override=src_crs, layer=layer,
+                                          **filters):
+            ids.extend(batch["ids"])
+            parts.append(batch["geoms"])
+        geoms = np.concatenate(parts) if parts else np.empty(0, dtype=object)
+        return ids, geoms
+
+    ids, geoms = [], []
+    for feat in iter_features(shp_path, id_field=id_field, src_crs_override=src_crs, layer=layer, **filters):
+        ids.append(feat["id"])
+        geoms.append(feat["geom"])
+    return ids, np.asarray(geoms, dtype=object)
+
+
+def link_shp(
+    points_path: str,
+    polygons_path: str,
+    points_mapping: Dict[str, Any],
+    polygons_mapping: Dict[str, Any],
+    predicate: str = "sosa:hasFeatureOfInterest",
+    all_matches: bool = False,
+    max_distance: float | None = None,
+    reader: str = "fiona"
+):
+    """
+    Link every point feature (e.g. gauges) to the polygon feature containing
+    it (e.g. its catchment): <point subject> <predicate> <polygon subject> .
 
-                if p == "@subject":
-                    local_subject = str(_resolve_ref(o, ctx, fid))
-                    continue
+    Subjects are the base subjects of the two SHP mappings ("@subject", else
+    sensor/catchment). The assignment is one bulk STRtree query, see
+    geo.relations.points_in_polygons for all_matches / max_distance.
+    Returns (triples_by_subject, prefixes).
+    """
+    from hydroturtle.geo.relations import points_in_polygons
 
-                if isinstance(o, list):
-                    _emit_blank_node_block(
-                        triples_by_subject, local_subject, p, o,
-                        props, current_col=current_col, ctx=ctx, fid=fid, geom=geom,
-                        bnode_counter=bnode_counter
-                    )
-                    continue
+    pt_ctx, pt_id_field, pt_crs = _shp_settings(points_mapping, None, None)
+    pg_ctx, pg_id_field, pg_crs = _shp_settings(polygons_mapping, None, None)
+    pt_subject = _compile_base_subject(points_mapping.get("rules", {}), pt_ctx)
+    pg_subject = _compile_base_subject(polygons_mapping.get("rules", {}), pg_ctx)
 
-                objv = _render_obj_shp(o, props, current_col=current_col, ctx=ctx, fid=fid, geom=geom)
-                if objv == "":
-                    continue
-                _emit(triples_by_subject, local_subject, p, str(_resolve_ref(objv, ctx, fid)))
+    pt_ids, pt_geoms = _read_geometries(points_path, pt_id_field, pt_crs, reader,
+                                        _get_layer_from_mapping(points_mapping))
+    pg_ids, pg_geoms = _read_geometries(polygons_path, pg_id_field, pg_crs, reader,
+                                        _get_layer_from_mapping(polygons_mapping))
 
+    triples_by_subject: Dict[str, List[Tuple[str, str]]] = {}
+    for i, j in points_in_polygons(pt_geoms, pg_geoms, all_matches=all_matches, max_distance=max_distance):
+        _emit(triples_by_subject,
+              _render(pt_subject, (), pt_ids[i], None),
+              predicate,
+              _render(pg_subject, (), pg_ids[j], None))
+
+    prefixes = {**polygons_mapping["prefixes"], **points_mapping["prefixes"]}
+    if predicate.startswith("sosa:"):
+        prefixes.setdefault("sosa", "http://www.w3.org/ns/sosa/")
+    return triples_by_subject, prefixes
+
+
+def run_link_shp(
+    points_path: str,
+    polygons_path: str,
+    points_mapping_path: str,
+    polygons_mapping_path: str,
+    out_path: str,
+    predicate: str = "sosa:hasFeatureOfInterest",
+    all_matches: bool = False,
+    max_distance: float | None = None,
+    reader: str = "fiona",
+    json_encoding: str = "utf-8"
+):
+    triples_by_subject, prefixes = link_shp(
+        points_path, polygons_path,
+        load_mapping(points_mapping_path, json_encoding=json_encoding),
+        load_mapping(polygons_mapping_path, json_encoding=json_encoding),
+        predicate=predicate, all_matches=all_matches, max_distance=max_distance, reader=reader
+    )
     write_turtle(triples_by_subject, prefixes, out_path)
     return out_path
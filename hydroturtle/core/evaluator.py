@@ -2,8 +2,11 @@ import json
 import csv
 import re
 from datetime import datetime, date, time
+from functools import lru_cache
 from pathlib import Path
 from hydroturtle.mapping.loader import load_mapping as _load_mapping
+from hydroturtle.io.csv_reader import detect_encoding, iter_rows  # noqa: F401 (re-exported)
+from hydroturtle.io.parquet_reader import is_columnar, iter_table_rows
 
 # --- time helpers ------------------------------------------------------------
 def _iso_datetime_from(parts, fmts):
@@ -15,10 +18,16 @@ def _iso_datetime_from(parts, fmts):
     s = " ".join([str(p).strip() for p in parts if p is not None])
     if not s:
         raise ValueError("Empty date/time parts")
+    return _iso_datetime(s, len(parts), tuple(fmts) if isinstance(fmts, list) else fmts)
 
+
+# Dates repeat across the files of a dataset (every station has the same
+# days), so parsed values are kept; 2**16 entries cover ~180 years of days.
+@lru_cache(maxsize=1 << 16)
+def _iso_datetime(s, n_parts, fmts):
     # If fmts are component-wise and match the number of parts, join with space
-    if isinstance(fmts, list) and len(fmts) > 1:
-        if len(fmts) == len(parts):
+    if isinstance(fmts, tuple) and len(fmts) > 1:
+        if len(fmts) == n_parts:
             try:
                 fmt = " ".join(fmts)
                 dt = datetime.strptime(s, fmt)
@@ -118,23 +127,146 @@ def load_mapping(mapping_path: str, json_encoding: str = "utf-8"):
     return _load_mapping(mapping_path, json_encoding=json_encoding)
 
 
-def iter_rows(csv_path):
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        yield from csv.DictReader(f)
+def iter_source_rows(csv_path: str, mapping: dict,
+                     csv_encoding: str | None = None,
+                     csv_delimiter: str | None = None,
+                     data: bytes | None = None,
+                     csv_reader: str = "dict"):
+    """
+    The rows (dicts of strings) of a CSV / Parquet / Arrow input, as convert
+    reads them. mapping may also be a list of mappings read in one pass (the
+    rows then hold the columns of all of them).
+    """
+    mappings = mapping if isinstance(mapping, list) else [mapping]
+    # delimiter hint from the (first) mapping if not given
+    if csv_delimiter is None:
+        csv_delimiter = next((m["context"]["csv"]["delimiter"] for m in mappings
+                              if m.get("context", {}).get("csv", {}).get("delimiter")), None)
+
+    needed = set().union(*(_required_columns(m) for m in mappings))
+    if is_columnar(csv_path):
+        # Parquet / Arrow: read only the columns the mapping refers to
+        return iter_table_rows(csv_path, columns=needed, data=data)
+    columns = None if csv_reader == "dict" else needed
+    return iter_rows(csv_path, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter, data=data,
+                     reader=csv_reader, columns=columns)
+
 
 def convert(csv_path: str, mapping: dict,
             csv_encoding: str | None = None,
-            csv_delimiter: str | None = None):
+            csv_delimiter: str | None = None,
+            data: bytes | None = None,
+            csv_reader: str = "dict",
+            row_start: int = 0):
+    """
+    data: the file content when csv_path does not exist on disk (e.g. an
+    archive member); csv_path then only names the input (suffix, file id).
+    csv_reader: CSV backend (io.csv_reader.CSV_READERS); "tuple" and "arrow"
+    only build the columns the mapping refers to.
+    row_start: {rowIndex} of the first row, when data holds a row range of a
+    larger file (see io.csv_index).
+    """
+    rows = iter_source_rows(csv_path, mapping, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter,
+                            data=data, csv_reader=csv_reader)
+    return convert_rows(enumerate(rows, start=row_start), mapping, csv_path)
+
+
+def convert_multi(csv_path: str, mappings: list,
+                  csv_encoding: str | None = None,
+                  csv_delimiter: str | None = None,
+                  data: bytes | None = None,
+                  csv_reader: str = "dict",
+                  row_start: int = 0):
+    """
+    convert() with several mappings in one pass: the input is detected, read
+    and parsed once and every row goes through all mappings. Returns one
+    (triples_by_subject, prefixes) per mapping, in order.
+    """
+    rows = iter_source_rows(csv_path, mappings, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter,
+                            data=data, csv_reader=csv_reader)
+    return convert_rows_multi(enumerate(rows, start=row_start), mappings, csv_path)
+
+
+def convert_rows(indexed_rows, mapping: dict, csv_path: str):
+    """
+    Apply the mapping rules to (rowIndex, row) pairs, where each row is a dict
+    of column -> string (as from csv.DictReader). Shared by convert and other
+    tabular sources (NetCDF); csv_path only names the source (file id).
+    Returns (triples_by_subject, prefixes).
+    """
+    return convert_rows_multi(indexed_rows, [mapping], csv_path)[0]
+
+
+def convert_rows_multi(indexed_rows, mappings: list, csv_path: str):
+    """convert_rows for several mappings over the same rows; one result per mapping."""
+    results = [({}, m["prefixes"]) for m in mappings]
+    evaluators = []
+    for m, (triples_by_subject, _) in zip(mappings, results):
+        def add_triple(s, p, o, shared, tbs=triples_by_subject):
+            tbs.setdefault(s, []).append((p, o))
+        evaluators.append(row_evaluator(m, csv_path, add_triple))
+
+    for i, row in indexed_rows:
+        for evaluate in evaluators:
+            evaluate(i, row)
+
+    for triples_by_subject, _ in results:
+        _dedupe(triples_by_subject)
+    return results
+
+
+def _dedupe(triples_by_subject: dict) -> None:
+    # remove deduplicate triples per subject
+    for s, po_list in triples_by_subject.items():
+        seen = set()
+        deduped = []
+        for p, o in po_list:
+            key = (p, o)
+            if key in seen:
+                continue
+            seen.add(key)
+            deduped.append((p, o))
+        triples_by_subject[s] = deduped
+
+
+def _shared_subject_rules(mapping: dict) -> set:
+    """
+    Rule columns whose subject is NOT unique per row, i.e. whose subject
+    template has no {rowIndex} (sensor, catchment, collection, ...). Their
+    subjects recur across rows; row-local subjects (observations) never do.
+    """
+    templates = mapping["context"].get("uri_templates", {})
+    defaults = {"observation": "hyobs:observation_{id}_{rowIndex}_{slug}", "geom": "hyobs:geomPoint_{id}"}
+    shared = set()
+    for col, spec in mapping["rules"].items():
+        tpl = templates.get("observation", "hyobs:observation_{id}_{rowIndex}")
+        first = spec[0] if spec else None
+        if isinstance(first, list) and first and first[0] == "@subject":
+            tok = str(first[1])
+            tpl = templates.get(tok[1:], defaults.get(tok[1:], tok)) if tok.startswith("@") else tok
+        if "{rowIndex}" not in tpl:
+            shared.add(col)
+    return shared
+
+
+def eval_rows(indexed_rows, mapping: dict, csv_path: str, add_triple):
+    """
+    The rule evaluation loop: calls add_triple(s, p, o, shared) for every
+    triple, in row order, without collecting or de-duplicating anything.
+    shared is True for subjects that can recur in later rows (see
+    _shared_subject_rules), so streaming consumers know what to remember.
+    """
+    evaluate = row_evaluator(mapping, csv_path, add_triple)
+    for i, row in indexed_rows:
+        evaluate(i, row)
 
+
+def row_evaluator(mapping: dict, csv_path: str, add_triple):
+    """The body of eval_rows as a function evaluate(rowIndex, row), for callers feeding rows themselves."""
     ctx = mapping["context"]
-    prefixes = mapping["prefixes"]
     rules = mapping["rules"]
     use_legacy = mapping.get("compat", {}).get("typed_literal_shorthand", True)
 
-    # delimiter hint from mapping if not given
-    if csv_delimiter is None:
-        csv_delimiter = mapping.get("context", {}).get("csv", {}).get("delimiter")
-
     # derive file id (for batch cases like LamaH-CE)
     ctx["_file_id"] = _derive_id_from_filename(csv_path, mapping)
 
@@ -146,12 +278,9 @@ def convert(csv_path: str, mapping: dict,
             f"Set mapping.context.columns.id OR mapping.derive.id_from_filename.regex."
         )
 
-    triples_by_subject = {}
+    shared_cols = _shared_subject_rules(mapping)
 
-    def add_triple(s, p, o):
-        triples_by_subject.setdefault(s, []).append((p, o))
-
-    for i, row in enumerate(iter_rows(csv_path, csv_encoding=csv_encoding, csv_delimiter=csv_delimiter)):
+    def evaluate(i, row):
         # resolve the effective id for THIS row
         rid = _row_id(row, ctx, ctx.get("_file_id"))
 
@@ -177,6 +306,7 @@ def convert(csv_path: str, mapping: dict,
             else:
                 spec_iter = iter(spec)
 
+            shared = col in shared_cols
             for entry in spec_iter:
                 p, o = entry[0], entry[1]
                 if use_legacy and isinstance(o, str) and o.startswith("^^"):
@@ -190,21 +320,9 @@ def convert(csv_path: str, mapping: dict,
                         current_col=col,
                         use_legacy=use_legacy
                     )
-                add_triple(s, p, o_eval)
-    
-    # remove deduplicate triples per subject
-    for s, po_list in triples_by_subject.items():
-        seen = set()
-        deduped = []
-        for p, o in po_list:
-            key = (p, o)
-            if key in seen:
-                continue
-            seen.add(key)
-            deduped.append((p, o))
-        triples_by_subject[s] = deduped
+                add_triple(s, p, o_eval, shared)
 
-    return triples_by_subject, prefixes
+    return evaluate
 
 
 def run_convert(csv_path, mapping_path, out_path):
@@ -213,77 +331,6 @@ def run_convert(csv_path, mapping_path, out_path):
     write_turtle(triples_by_subject, prefixes, out_path)
     return out_path
 
-# --- Encoding detection & robust CSV reading ---------------------------------
-def detect_encoding(path: str) -> str | None:
-    try:
-        from charset_normalizer import from_path
-        best = from_path(path).best()
-        if best and best.encoding:
-            return best.encoding
-    except Exception:
-        pass
-    return None
-
-# --- CSV reader with encoding + delimiter robustness ------------------------
-def _sniff_delimiter(sample: str) -> str:
-    # Try csv.Sniffer first
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=[",",";","\t","|"])
-        return dialect.delimiter
-    except Exception:
-        pass
-    # Simple heuristic: pick the delimiter with the most hits in the header
-    header = sample.splitlines()[0] if sample else ""
-    candidates = [",",";","\t","|"]
-    counts = {d: header.count(d) for d in candidates}
-    best = max(counts, key=counts.get)
-    return best if counts[best] > 0 else ","
-
-def iter_rows(csv_path: str,
-              csv_encoding: str | None = None,
-              csv_delimiter: str | None = None):
-    """
-    Robust CSV reader with:
-      - encoding auto/override,
-      - delimiter auto/override.
-    """
-    def _yield_with(enc: str, delim: str | None, strict: bool = True):
-        with open(csv_path, "r", newline="", encoding=enc, errors=("strict" if strict else "replace")) as f:
-            # Sniff if needed
-            if delim is None:
-                sample = f.read(65536)
-                f.seek(0)
-                d = _sniff_delimiter(sample)
-            else:
-                d = delim
-            reader = csv.DictReader(f, delimiter=d)
-            first = next(reader)  # early validate
-            yield first
-            for r in reader:
-                yield r
-
-    # Encoding selection (explicit → detected → fallbacks → replace)
-    if csv_encoding:
-        yield from _yield_with(csv_encoding, csv_delimiter, strict=True)
-        return
-
-    enc = detect_encoding(csv_path)
-    if enc:
-        try:
-            yield from _yield_with(enc, csv_delimiter, strict=True)
-            return
-        except Exception:
-            pass
-
-    for enc_try in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-        try:
-            yield from _yield_with(enc_try, csv_delimiter, strict=True)
-            return
-        except Exception:
-            continue
-
-    yield from _yield_with("utf-8", csv_delimiter, strict=False)
-
 def _render_template(tpl: str, mapping: dict) -> str:
     return tpl.format(**mapping)
 
@@ -324,9 +371,7 @@ def eval_value(spec, row):
             src = pt.get("src_crs")
             dst = pt.get("dst_crs", "EPSG:4326")
 
-            from pyproj import Transformer
-            tf = Transformer.from_crs(src, dst, always_xy=True)
-            lon, lat = tf.transform(E, N)
+            lon, lat = _point_transformer(src, dst).transform(E, N)
 
             # you can round if you like
             lon_s = f"{lon:.8f}"
@@ -344,6 +389,11 @@ def eval_value(spec, row):
     # fallback
     return str(spec)
 
+@lru_cache(maxsize=32)
+def _point_transformer(src, dst):
+    from pyproj import Transformer
+    return Transformer.from_crs(src, dst, always_xy=True)
+
 def _render_obj(spec, row, row_index, ctx, current_col=None, use_legacy=True):
     # 1) typed-literal shorthand anywhere (nested or top-level)
     if use_legacy and isinstance(spec, str) and spec.startswith("^^"):
@@ -423,6 +473,35 @@ def _derive_id_from_filename(csv_path: str, mapping: dict) -> str | None:
     return m2.group(1) if m2 else stem
 
 
+def _required_columns(mapping: dict) -> set:
+    """
+    Columns a mapping reads: rule keys, the id column, "$col" time parts and
+    select keys, and @col / @template / @point references inside rules.
+    """
+    ctx = mapping.get("context", {})
+    cols = set(mapping.get("rules", {}))
+    id_col = (ctx.get("columns") or {}).get("id")
+    if id_col:
+        cols.add(id_col)
+    for t in (ctx.get("time_defaults") or {}).values():
+        cols.update(c[1:] for c in t.get("from", []) if isinstance(c, str) and c.startswith("$"))
+
+    def _walk(spec):
+        if isinstance(spec, list):
+            if spec and spec[0] == "select" and len(spec) > 1 and isinstance(spec[1], str):
+                cols.add(spec[1].lstrip("$"))
+            for x in spec:
+                _walk(x)
+        elif isinstance(spec, dict):
+            if isinstance(spec.get("@col"), str):
+                cols.add(spec["@col"])
+            for x in spec.values():
+                _walk(x)
+
+    _walk(list(mapping.get("rules", {}).values()))
+    return cols
+
+
 def _row_id(row: dict, ctx: dict, file_id: str | None) -> str:
     id_col = (ctx or {}).get("columns", {}).get("id")
     if id_col:
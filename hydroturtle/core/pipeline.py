@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import queue
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any, Dict
+
+from hydroturtle.core.evaluator import eval_rows, iter_source_rows
+from hydroturtle.io.ttl_writer import format_prefixes, format_subject, open_out
+
+
+# Pipelined CSV conversion: reading, rule evaluation and writing overlap.
+#
+#   reader thread  --rows-->  evaluate (main thread or eval_workers processes)
+#                  --text-->  writer thread (formatting done, writes / gzips)
+#
+# The stages are connected by bounded queues (queue_size batches of
+# batch_rows rows each), so a slow stage holds the others back instead of
+# letting batches pile up in memory. CSV/Arrow parsing, zlib and file I/O run
+# outside the GIL, so threads overlap them with evaluation; with
+# eval_workers > 1 evaluation itself runs in processes as well.
+#
+# Output is written batch by batch, so nothing is grouped over the whole file:
+#   - row-local subjects (subject template with {rowIndex}, i.e. observations)
+#     are complete within their batch and come out exactly as in convert();
+#   - shared subjects (sensor, catchment, ...) are written where they first
+#     appear; a later batch only writes the triples not written before, as a
+#     further block for the same subject (same graph, different layout).
+
+_END = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once another stage has failed."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_batches(rows, batch_rows: int, q: queue.Queue, stop: threading.Event):
+    try:
+        it = iter(rows)
+        start = 0
+        while True:
+            batch = list(islice(it, batch_rows))
+            if not batch or not _put(q, (start, batch), stop):
+                break
+            start += len(batch)
+        _put(q, _END, stop)
+    except BaseException as e:
+        _put(q, e, stop)
+
+
+def _write_blocks(out_path: str, q: queue.Queue, stop: threading.Event, errors: list):
+    try:
+        with open_out(out_path) as out:
+            while True:
+                try:
+                    text = q.get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        return  # evaluation failed; the error is raised there
+                    continue
+                if text is _END:
+                    return
+                out.write(text)
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+
+
+def evaluate_batch(mapping: Dict[str, Any], csv_path: str, indexed_rows) -> list:
+    """
+    One batch of (rowIndex, row) pairs -> [(subject, triples, shared), ...]
+    in subject order, triples de-duplicated within the batch. Shared
+    subjects still need drop_emitted against the earlier batches.
+    """
+    by_subject, shared = {}, set()
+
+    def add_triple(s, p, o, is_shared):
+        pos = by_subject.get(s)
+        if pos is None:
+            pos = by_subject[s] = {}
+            if is_shared:
+                shared.add(s)
+        pos[(p, o)] = None
+
+    eval_rows(indexed_rows, mapping, csv_path, add_triple)
+    return [(s, list(pos), s in shared) for s, pos in by_subject.items()]
+
+
+def _render_local(items: list) -> list:
+    """Format the row-local subjects of a batch right away (they need no further filtering)."""
+    return [item if item[2] else format_subject(item[0], item[1]) for item in items]
+
+
+def drop_emitted(items, emitted: Dict[str, set]):
+    """
+    Yield the (subject, triples) blocks of evaluate_batch items, dropping the
+    triples of shared subjects that were emitted before (emitted: subject ->
+    triples, updated in place). Pre-formatted text items pass through.
+    """
+    for item in items:
+        if isinstance(item, str):
+            yield item
+            continue
+        s, pos, is_shared = item
+        if not is_shared:
+            yield s, pos
+            continue
+        seen = emitted.setdefault(s, set())
+        new = [po for po in pos if po not in seen]
+        if new:
+            seen.update(new)
+            yield s, new
+
+
+_worker_args = None
+
+
+def _init_worker(mapping, csv_path):
+    global _worker_args
+    _worker_args = (mapping, csv_path)
+
+
+def _evaluate_in_worker(start: int, batch: list):
+    mapping, csv_path = _worker_args
+    return _render_local(evaluate_batch(mapping, csv_path, enumerate(batch, start=start)))
+
+
+def convert_pipelined(
+    csv_path: str,
+    mapping: Dict[str, Any],
+    out_path: str,
+    csv_encoding: str | None = None,
+    csv_delimiter: str | None = None,
+    csv_reader: str = "dict",
+    batch_rows: int = 5000,
+    queue_size: int = 4,
+    eval_workers: int = 1
+) -> str:
+    """
+    Convert csv_path to out_path (Turtle; a path, "-" or another io.sinks
+    target, compressed for .gz / .bz2 / .xz paths) with overlapped read / evaluate / write stages. See the notes above.
+    """
+    rows = iter_source_rows(csv_path, mapping, csv_encoding=csv_encoding,
+                            csv_delimiter=csv_delimiter, csv_reader=csv_reader)
+    stop = threading.Event()
+    q_rows: queue.Queue = queue.Queue(maxsize=queue_size)
+    q_text: queue.Queue = queue.Queue(maxsize=queue_size)
+    write_errors: list = []
+
+    reader = threading.Thread(target=_read_batches, args=(rows, batch_rows, q_rows, stop), daemon=True)
+    writer = threading.Thread(target=_write_blocks, args=(out_path, q_text, stop, write_errors), daemon=True)
+    writer.start()
+    reader.start()
+
+    emitted: Dict[str, set] = {}  # shared subject -> triples already written
+
+    def _emit(items) -> bool:
+        parts = [item if isinstance(item, str) else format_subject(*item) for item in drop_emitted(items, emitted)]
+        return not parts or _put(q_text, "".join(parts), stop)
+
+    def _batches():
+        while True:
+            item = q_rows.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    try:
+        if not _put(q_text, format_prefixes(mapping["prefixes"]), stop):
+            raise write_errors[0]
+        if eval_workers <= 1:
+            for start, batch in _batches():
+                if not _emit(_render_local(evaluate_batch(mapping, csv_path, enumerate(batch, start=start)))):
+                    break
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=eval_workers, initializer=_init_worker,
+                                     initargs=(mapping, csv_path)) as pool:
+                for start, batch in _batches():
+                    if len(pending) >= queue_size:
+                        if not _emit(pending.popleft().result()):
+                            break
+                    pending.append(pool.submit(_evaluate_in_worker, start, batch))
+                while pending and not stop.is_set():
+                    _emit(pending.popleft().result())
+        _put(q_text, _END, stop)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        writer.join()
+        stop.set()
+        reader.join()
+    if write_errors:
+        raise write_errors[0]
+    return out_path
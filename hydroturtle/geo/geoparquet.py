@@ -0,0 +1,201 @@
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pyproj import CRS
+
+GEOPARQUET_SUFFIXES = (".parquet", ".geoparquet", ".pq")
+
+# GeoParquet: a geometry column without a "crs" key is OGC:CRS84
+_DEFAULT_CRS = "OGC:CRS84"
+
+
+def is_geoparquet(path: str) -> bool:
+    return Path(path).suffix.lower() in GEOPARQUET_SUFFIXES
+
+
+def parse_id(v: Any, kind: str, id_field: str) -> Any:
+    """
+    One ID (CLI values are strings) as a value of its field kind "int",
+    "float" or "str"; ValueError names an ID that is not a number.
+    """
+    if kind == "str":
+        return str(v)
+    text = str(v).strip()
+    try:
+        num = int(text) if kind == "int" else float(text)
+    except ValueError:
+        num = None
+    if num is None or (kind == "float" and not math.isfinite(num)):
+        raise ValueError(f"ID {v!r} is not a valid {kind}, the type of ID field {id_field!r}")
+    return num
+
+
+def _geo_metadata(pf) -> Dict[str, Any]:
+    meta = pf.schema_arrow.metadata or {}
+    if b"geo" not in meta:
+        raise ValueError("Parquet file has no GeoParquet 'geo' metadata")
+    geo = json.loads(meta[b"geo"])
+    col = geo["primary_column"]
+    col_meta = geo["columns"][col]
+    if str(col_meta.get("encoding", "WKB")).upper() != "WKB":
+        raise ValueError(f"GeoParquet column '{col}' uses {col_meta['encoding']!r} encoding; only WKB is supported")
+    return {"column": col, **col_meta}
+
+
+def _crs_of(col_meta: Dict[str, Any]) -> Optional[CRS]:
+    if "crs" not in col_meta:
+        return CRS.from_user_input(_DEFAULT_CRS)
+    if col_meta["crs"] is None:
+        return None
+    crs = col_meta["crs"]
+    return CRS.from_json_dict(crs) if isinstance(crs, dict) else CRS.from_user_input(crs)
+
+
+def read_geoparquet_info(path: str) -> Dict[str, Any]:
+    """{"fields": attribute names, "features": row count, "geometry": column, "crs": CRS or None}"""
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    col_meta = _geo_metadata(pf)
+    geo_cols = set(json.loads(pf.schema_arrow.metadata[b"geo"])["columns"])
+    covering = (col_meta.get("covering") or {}).get("bbox") or {}
+    skip = geo_cols | {v[0] for v in covering.values() if v}
+    return {
+        "fields": [n for n in pf.schema_arrow.names if n not in skip],
+        "features": pf.metadata.num_rows,
+        "geometry": col_meta["column"],
+        "crs": _crs_of(col_meta),
+    }
+
+
+def _filter_expression(col_meta: Dict[str, Any],
+                       schema,
+                       id_field: str,
+                       ids: Optional[Iterable[Any]],
+                       bbox_src: Optional[Tuple[float, float, float, float]]):
+    """
+    Arrow dataset filter for the ID list and, if the file has a bbox covering
+    column (GeoParquet 1.1), the bbox. Row groups whose statistics cannot
+    match are skipped without being read. IDs given as strings (CLI) are
+    parsed like the OGR readers do (parse_id), then cast to the type of the
+    ID column.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    expr = None
+    if ids is not None:
+        typ = schema.field(id_field).type
+        kind = "int" if pa.types.is_integer(typ) else "float" if pa.types.is_floating(typ) else "str"
+        values = [parse_id(v, kind, id_field) for v in ids]
+        try:
+            values = pa.array(values, type=pa.string() if kind == "str" else None).cast(typ)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, OverflowError) as e:
+            raise ValueError(f"IDs do not fit the type {typ} of ID field {id_field!r}: {e}") from None
+        expr = pc.field(id_field).isin(values)
+    covering = (col_meta.get("covering") or {}).get("bbox")
+    if bbox_src is not None and covering:
+        minx, miny, maxx, maxy = bbox_src
+        box_expr = ((pc.field(*covering["xmax"]) >= minx) & (pc.field(*covering["xmin"]) <= maxx)
+                    & (pc.field(*covering["ymax"]) >= miny) & (pc.field(*covering["ymin"]) <= maxy))
+        expr = box_expr if expr is None else expr & box_expr
+    return expr
+
+
+def iter_geoparquet_batches(path: str,
+                            columns: List[str],
+                            id_field: str,
+                            with_geometry: bool = True,
+                            batch_size: int = 65536,
+                            start: Optional[int] = None,
+                            stop: Optional[int] = None,
+                            bbox_src: Optional[Tuple[float, float, float, float]] = None,
+                            mask_src: Any = None,
+                            ids: Optional[Iterable[Any]] = None
+                            ) -> Iterator[Tuple[Any, Any]]:
+    """
+    Stream (record_batch, wkb_geometries) from a GeoParquet file, row group by
+    row group, reading only the requested columns.
+
+    - start/stop select rows [start, stop); only overlapping row groups are read.
+      With filters they count the rows that pass them, as OGR counts features.
+    - ids and a bbox (through the bbox covering column, when present) become an
+      Arrow dataset filter and prune row groups by their statistics.
+    - bbox_src/mask_src (in the file CRS) are then applied exactly to the
+      decoded geometries, before any reprojection (done by the caller).
+    """
+    import numpy as np
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    import shapely
+
+    pf = pq.ParquetFile(path)
+    col_meta = _geo_metadata(pf)
+    geom_col = col_meta["column"]
+    spatial = bbox_src is not None or mask_src is not None
+    read_cols = list(dict.fromkeys([id_field, *columns] + ([geom_col] if with_geometry or spatial else [])))
+
+    if id_field not in pf.schema_arrow.names:
+        raise KeyError(f"ID field '{id_field}' not found in attributes: available={pf.schema_arrow.names[:10]}...")
+
+    region = None
+    if spatial:
+        region = mask_src if mask_src is not None else shapely.box(*bbox_src)
+        shapely.prepare(region)
+
+    expr = _filter_expression(col_meta, pf.schema_arrow, id_field, ids, bbox_src)
+    if expr is not None:
+        batches = ds.dataset(path, format="parquet").to_batches(columns=read_cols, filter=expr,
+                                                                 batch_size=batch_size)
+        lo, hi = start or 0, stop
+    elif region is not None:
+        batches = pf.iter_batches(batch_size=batch_size, columns=read_cols)
+        lo, hi = start or 0, stop
+    else:
+        # row groups overlapping [start, stop), then trim the edges
+        groups, offset, first_row = [], 0, None
+        for g in range(pf.metadata.num_row_groups):
+            n = pf.metadata.row_group(g).num_rows
+            if (stop is None or offset < stop) and offset + n > (start or 0):
+                groups.append(g)
+                first_row = offset if first_row is None else first_row
+            offset += n
+        if not groups:
+            return
+        batches = pf.iter_batches(batch_size=batch_size, row_groups=groups, columns=read_cols)
+        lo = (start or 0) - first_row
+        hi = None if stop is None else stop - first_row
+
+    def _decode(batch):
+        return shapely.from_wkb(batch.column(geom_col).to_numpy(zero_copy_only=False))
+
+    pos = 0
+    for batch in batches:
+        geoms = None
+        if region is not None:
+            geoms = _decode(batch)
+            hit = shapely.intersects(region, geoms)
+            if not hit.all():
+                idx = np.flatnonzero(hit)
+                batch, geoms = batch.take(idx), geoms[idx]
+
+        n = batch.num_rows
+        a, b = max(lo - pos, 0), n if hi is None else min(hi - pos, n)
+        pos += n
+        if b <= a:
+            if hi is not None and pos >= hi:
+                break
+            continue
+        if (a, b) != (0, n):
+            batch = batch.slice(a, b - a)
+            geoms = None if geoms is None else geoms[a:b]
+
+        if with_geometry:
+            geoms = _decode(batch) if geoms is None else geoms
+            present = ~shapely.is_missing(geoms)
+            if not present.all():
+                idx = np.flatnonzero(present)
+                batch, geoms = batch.take(idx), geoms[idx]
+        yield batch, geoms
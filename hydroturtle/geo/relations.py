@@ -0,0 +1,97 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+
+def points_in_polygons(points,
+                       polygons,
+                       all_matches: bool = False,
+                       max_distance: Optional[float] = None
+                       ) -> List[Tuple[int, int]]:
+    """
+    Assign points to the polygons that contain them, in bulk.
+
+    One STRtree is built over `polygons` and queried with the whole `points`
+    array at once (no pairwise tests). Points on a polygon boundary count as
+    inside. Returns (point_index, polygon_index) pairs sorted by point index.
+
+    - all_matches=False keeps only the smallest containing polygon per point
+      (the most specific catchment when catchments are nested).
+    - max_distance (in layer units, degrees for CRS84) additionally links points
+      that fall in no polygon to their nearest polygon within that distance,
+      e.g. gauges digitised just outside their catchment outlet.
+    """
+    points = np.asarray(points, dtype=object)
+    polygons = np.asarray(polygons, dtype=object)
+    tree = STRtree(polygons)
+
+    pt_idx, poly_idx = tree.query(points, predicate="intersects")
+
+    if max_distance is not None:
+        unmatched = np.setdiff1d(np.arange(len(points)), pt_idx)
+        if len(unmatched):
+            near_pt, near_poly = tree.query_nearest(points[unmatched], max_distance=max_distance,
+                                                    all_matches=False)
+            pt_idx = np.concatenate([pt_idx, unmatched[near_pt]])
+            poly_idx = np.concatenate([poly_idx, near_poly])
+
+    if not all_matches and len(pt_idx):
+        # sort by point, then polygon area; keep the first pair per point
+        areas = shapely.area(polygons)[poly_idx]
+        order = np.lexsort((areas, pt_idx))
+        pt_idx, poly_idx = pt_idx[order], poly_idx[order]
+        first = np.ones(len(pt_idx), dtype=bool)
+        first[1:] = pt_idx[1:] != pt_idx[:-1]
+        pt_idx, poly_idx = pt_idx[first], poly_idx[first]
+    else:
+        order = np.lexsort((poly_idx, pt_idx))
+        pt_idx, poly_idx = pt_idx[order], poly_idx[order]
+
+    return list(zip(pt_idx.tolist(), poly_idx.tolist()))
+
+
+def nested_polygons(polygons,
+                    min_overlap: float = 0.99,
+                    direct_only: bool = False
+                    ) -> List[Tuple[int, int]]:
+    """
+    Containment pairs (child_index, parent_index) within one polygon layer,
+    e.g. nested sub-basins.
+
+    A polygon is a child of a larger polygon if at least `min_overlap` of its
+    area lies inside it (1.0 = fully covered; slightly less tolerates
+    digitising noise along shared boundaries). Candidate pairs come from one
+    STRtree query; the covers test runs on prepared geometries and only the
+    remaining candidates get an intersection-area check, so there is no O(n²)
+    scan. direct_only keeps just the smallest parent of each child.
+    """
+    polygons = np.asarray(polygons, dtype=object)
+    shapely.prepare(polygons)
+    areas = shapely.area(polygons)
+    tree = STRtree(polygons)
+
+    child, parent = tree.query(polygons, predicate="intersects")
+    cand = areas[child] < areas[parent]
+    child, parent = child[cand], parent[cand]
+
+    covered = shapely.covers(polygons[parent], polygons[child])
+    if min_overlap < 1.0:
+        rest = np.flatnonzero(~covered)
+        if len(rest):
+            inter = shapely.area(shapely.intersection(polygons[parent[rest]], polygons[child[rest]]))
+            covered[rest] = inter >= min_overlap * areas[child[rest]]
+    child, parent = child[covered], parent[covered]
+
+    if direct_only and len(child):
+        order = np.lexsort((areas[parent], child))
+        child, parent = child[order], parent[order]
+        first = np.ones(len(child), dtype=bool)
+        first[1:] = child[1:] != child[:-1]
+        child, parent = child[first], parent[first]
+    else:
+        order = np.lexsort((parent, child))
+        child, parent = child[order], parent[order]
+
+    return list(zip(child.tolist(), parent.tolist()))
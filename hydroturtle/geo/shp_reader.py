@@ -1,8 +1,12 @@
-from typing import Iterator, Optional, Dict, Any
+import json
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Dict, Any, List, Tuple
 import fiona
-from shapely.geometry import shape
-from shapely.ops import transform as shp_transform
+from shapely.geometry import box, mapping, shape
+from shapely.geometry.base import BaseGeometry
+from shapely.ops import transform as shp_transform, unary_union
 from pyproj import CRS, Transformer
+from hydroturtle.geo.geoparquet import is_geoparquet, iter_geoparquet_batches, parse_id, read_geoparquet_info
 
 def _derive_src_crs(dataset) -> Optional[CRS]:
     # Fiona exposes crs_wkt (new) or crs (legacy). Handle both.
@@ -18,39 +22,182 @@ def _derive_src_crs(dataset) -> Optional[CRS]:
         pass
     return None
 
+@lru_cache(maxsize=32)
 def _make_transformer(src: CRS, dst: CRS) -> Transformer:
     # always_xy=True enforces lon,lat order which we want for CRS84
     return Transformer.from_crs(src, dst, always_xy=True)
 
+def read_field_names(shp_path: str, layer: Optional[str] = None) -> List[str]:
+    """Attribute field names of the layer, in schema order."""
+    if is_geoparquet(shp_path):
+        return read_geoparquet_info(shp_path)["fields"]
+    with fiona.open(shp_path, layer=layer) as ds:
+        return list(ds.schema["properties"].keys())
+
+def count_features(shp_path: str, layer: Optional[str] = None) -> int:
+    """Number of features in the layer (from the layer header, no decoding)."""
+    if is_geoparquet(shp_path):
+        return read_geoparquet_info(shp_path)["features"]
+    with fiona.open(shp_path, layer=layer) as ds:
+        return len(ds)
+
+def _id_literal(v: Any, kind: str, id_field: str) -> str:
+    """One ID as an OGR SQL literal: a parsed number for int/float fields, else a quoted string."""
+    if kind == "str":
+        return "'" + str(v).replace("'", "''") + "'"
+    return repr(parse_id(v, kind, id_field))
+
+def _id_where(id_field: str, ids: Iterable[Any], field_type: str) -> str:
+    """
+    OGR SQL attribute filter selecting the given IDs. Every ID is parsed as a
+    number for numeric fields and quoted for the others, so nothing of an ID
+    ends up as SQL; ValueError names an ID that is not a number.
+    """
+    ftype = str(field_type)
+    kind = "int" if ftype.startswith(("int", "uint")) else "float" if ftype.startswith("float") else "str"
+    lits = [_id_literal(v, kind, id_field) for v in ids]
+    field = id_field.replace('"', '""')
+    return f'"{field}" IN ({", ".join(lits) or "NULL"})'
+
+def _filters_to_source(src_crs: CRS,
+                       bbox: Optional[Tuple[float, float, float, float]],
+                       mask: Any):
+    """
+    Reproject CRS84 (lon/lat) bbox/mask filters into the layer CRS, where OGR
+    evaluates them. bbox and mask together become one mask (their intersection).
+    Returns (bbox_src, mask_src), at most one of them set.
+    """
+    if bbox is None and mask is None:
+        return None, None
+    tfm = _make_transformer(CRS.from_user_input("OGC:CRS84"), src_crs)
+
+    if mask is None:
+        return tuple(tfm.transform_bounds(*bbox)), None
+
+    g = mask if isinstance(mask, BaseGeometry) else shape(mask)
+    if bbox is not None:
+        g = g.intersection(box(*bbox))
+
+    def _xy(x, y, z=None):
+        return tfm.transform(x, y)
+
+    return None, shp_transform(_xy, g)
+
+def _filter_region(bbox_src, mask_src):
+    """
+    The source-CRS region of a bbox/mask filter, prepared, or None. Features
+    OGR passes are checked against it: without GEOS, GDAL only compares
+    envelopes, while GeoParquet filters by exact intersection.
+    """
+    import shapely
+
+    if bbox_src is None and mask_src is None:
+        return None
+    region = mask_src if mask_src is not None else box(*bbox_src)
+    shapely.prepare(region)
+    return region
+
+def load_mask(path: str) -> BaseGeometry:
+    """Union of all geometries in a GeoJSON file (Feature, FeatureCollection or bare geometry)."""
+    with open(path, encoding="utf-8") as f:
+        gj = json.load(f)
+    if gj.get("type") == "FeatureCollection":
+        geoms = [shape(ft["geometry"]) for ft in gj.get("features", []) if ft.get("geometry")]
+    elif gj.get("type") == "Feature":
+        geoms = [shape(gj["geometry"])]
+    else:
+        geoms = [shape(gj)]
+    return unary_union(geoms)
+
 def iter_features(shp_path: str,
                   id_field: str = "OBJECTID",
-                  src_crs_override: Optional[str] = None
+                  src_crs_override: Optional[str] = None,
+                  with_geometry: bool = True,
+                  start: Optional[int] = None,
+                  stop: Optional[int] = None,
+                  bbox: Optional[Tuple[float, float, float, float]] = None,
+                  mask: Any = None,
+                  ids: Optional[Iterable[Any]] = None,
+                  layer: Optional[str] = None
                   ) -> Iterator[Dict[str, Any]]:
     """
-    Stream features from a shapefile. Each item:
+    Stream features from a vector file. Each item:
       { "id": <id value>, "props": <attr dict>, "geom": <shapely geometry in CRS84> }
+
+    Any OGR vector format fiona can open works (Shapefile, GeoPackage,
+    GeoJSON, FlatGeobuf, ...); `layer` selects a layer of multi-layer
+    sources. GeoParquet files are read natively by row group (see
+    iter_feature_batches).
+
+    With with_geometry=False the geometry column is never read (fiona's
+    ignore_geometry), no CRS is required and "geom" is None. Features with an
+    empty geometry are then kept, since nothing is skipped on their account.
+
+    start/stop restrict the stream to the feature range [start, stop) of the
+    layer, so one layer can be converted in slices.
+
+    Filters are pushed down to OGR, so rejected features are never decoded
+    or reprojected:
+      bbox  (min_lon, min_lat, max_lon, max_lat) in CRS84
+      mask  shapely geometry / GeoJSON dict in CRS84
+      ids   values of id_field to keep (SQL "IN" attribute filter)
+    A spatial filter needs the layer CRS even when with_geometry=False. It
+    keeps the features whose geometry intersects the region, for every
+    reader and GDAL build (see _filter_region).
     """
-    dst_crs = CRS.from_user_input("OGC:CRS84")  # lon/lat
+    if is_geoparquet(shp_path):
+        names = read_field_names(shp_path)
+        for batch in iter_feature_batches(shp_path, names, id_field=id_field,
+                                          src_crs_override=src_crs_override, with_geometry=with_geometry,
+                                          start=start, stop=stop, bbox=bbox, mask=mask, ids=ids):
+            geoms = batch["geoms"] if with_geometry else [None] * len(batch["ids"])
+            for fid, row, g in zip(batch["ids"], zip(*batch["columns"]), geoms):
+                yield {"id": fid, "props": dict(zip(names, row)), "geom": g}
+        return
 
-    with fiona.open(shp_path) as ds:
-        src_crs = CRS.from_user_input(src_crs_override) if src_crs_override else _derive_src_crs(ds)
-        if not src_crs:
-            raise RuntimeError(
-                "No CRS detected for shapefile and none provided. "
-                "Re-run with --src-crs EPSG:xxxx (e.g. --src-crs EPSG:25833)."
-            )
+    spatial = bbox is not None or mask is not None
+    read_geometry = with_geometry or spatial
 
-        tfm = _make_transformer(src_crs, dst_crs)
+    with fiona.open(shp_path, layer=layer, ignore_geometry=not read_geometry) as ds:
+        tfm = region = None
+        filters: Dict[str, Any] = {}
+        if read_geometry:
+            src_crs = CRS.from_user_input(src_crs_override) if src_crs_override else _derive_src_crs(ds)
+            if not src_crs:
+                raise RuntimeError(
+                    "No CRS detected for shapefile and none provided. "
+                    "Re-run with --src-crs EPSG:xxxx (e.g. --src-crs EPSG:25833)."
+                )
+            if with_geometry:
+                tfm = _make_transformer(src_crs, CRS.from_user_input("OGC:CRS84"))  # lon/lat
+            bbox_src, mask_src = _filters_to_source(src_crs, bbox, mask)
+            if bbox_src is not None:
+                filters["bbox"] = bbox_src
+            if mask_src is not None:
+                filters["mask"] = mapping(mask_src)
+            region = _filter_region(bbox_src, mask_src)
+        if ids is not None:
+            filters["where"] = _id_where(id_field, ids, ds.schema["properties"].get(id_field, "str"))
 
-        for feat in ds:
+        if start is None and stop is None:
+            records = ds.filter(**filters) if filters else iter(ds)
+        else:
+            records = ds.filter(start or 0, stop if stop is not None else len(ds), **filters)
+
+        for feat in records:
             props = dict(feat.get("properties", {}))
             if id_field not in props:
                 raise KeyError(f"ID field '{id_field}' not found in attributes: available={list(props.keys())[:10]}...")
             fid = props[id_field]
-            if feat.get("geometry") is None:
+            g = shape(feat["geometry"]) if read_geometry and feat.get("geometry") is not None else None
+            if region is not None and (g is None or not region.intersects(g)):
+                continue
+            if tfm is None:
+                yield {"id": fid, "props": props, "geom": None}
+                continue
+            if g is None:
                 # skip empty geometries cleanly
                 continue
-            g = shape(feat["geometry"])
 
             # Support 2D and 3D transforms
             def _xy(x, y, z=None):
@@ -63,3 +210,161 @@ def iter_features(shp_path: str,
 
             g84 = shp_transform(_xy, g)
             yield {"id": fid, "props": props, "geom": g84}
+
+def _transform_geoms(geoms, tfm: Transformer):
+    """
+    Reproject a shapely geometry array with vectorised calls. Geometries with
+    and without Z are transformed apart: with include_z on a mixed array,
+    shapely < 2.1 gives the 2D ones a NaN Z.
+    """
+    import numpy as np
+    import shapely
+
+    def _xy(xy):
+        x2, y2 = tfm.transform(xy[:, 0], xy[:, 1])
+        return np.column_stack([x2, y2])
+
+    def _xyz(xyz):
+        x2, y2, z2 = tfm.transform(xyz[:, 0], xyz[:, 1], xyz[:, 2])
+        return np.column_stack([x2, y2, z2])
+
+    has_z = shapely.has_z(geoms)
+    if not has_z.any():
+        return shapely.transform(geoms, _xy)
+    if has_z.all():
+        return shapely.transform(geoms, _xyz, include_z=True)
+    out = np.array(geoms, dtype=object)
+    out[has_z] = shapely.transform(out[has_z], _xyz, include_z=True)
+    out[~has_z] = shapely.transform(out[~has_z], _xy)
+    return out
+
+def _wkb_column(schema, meta: Dict[str, Any]) -> str:
+    """Name of the WKB geometry column in a pyogrio Arrow stream (varies with GDAL version)."""
+    for field in schema:
+        if (field.metadata or {}).get(b"ARROW:extension:name") == b"geoarrow.wkb":
+            return field.name
+    for name in (meta.get("geometry_name"), "wkb_geometry", "wkb", "geometry"):
+        if name and name in schema.names:
+            return name
+    raise KeyError(f"No WKB geometry column in Arrow stream: {schema.names}")
+
+def iter_feature_batches(shp_path: str,
+                         columns: List[str],
+                         id_field: str = "OBJECTID",
+                         src_crs_override: Optional[str] = None,
+                         with_geometry: bool = True,
+                         batch_size: int = 65536,
+                         start: Optional[int] = None,
+                         stop: Optional[int] = None,
+                         bbox: Optional[Tuple[float, float, float, float]] = None,
+                         mask: Any = None,
+                         ids: Optional[Iterable[Any]] = None,
+                         layer: Optional[str] = None
+                         ) -> Iterator[Dict[str, Any]]:
+    """
+    Columnar alternative to iter_features (pyogrio + Arrow). Each item is one
+    record batch:
+      { "ids": [...], "columns": [[...], ...] (one list per name in `columns`),
+        "geoms": <shapely geometry array in CRS84> or None }
+
+    Only `columns` and the ID field are read; geometries arrive as WKB and are
+    decoded, reprojected and (by the caller) serialised as whole arrays.
+    Features with an empty geometry are skipped unless with_geometry=False.
+    start/stop select the feature range [start, stop) and bbox/mask/ids are
+    pushed down to OGR, both as in iter_features.
+
+    GeoParquet files bypass OGR: row groups are read with pyarrow (only the
+    needed columns, only the row groups a range or filter can touch).
+    """
+    import numpy as np
+    import shapely
+
+    if is_geoparquet(shp_path):
+        crs = CRS.from_user_input(src_crs_override) if src_crs_override else read_geoparquet_info(shp_path)["crs"]
+        if not crs and (with_geometry or bbox is not None or mask is not None):
+            raise RuntimeError(
+                "No CRS detected for GeoParquet file and none provided. "
+                "Re-run with --src-crs EPSG:xxxx (e.g. --src-crs EPSG:25833)."
+            )
+        bbox_src, mask_src = _filters_to_source(crs, bbox, mask) if crs else (None, None)
+        tfm = _make_transformer(crs, CRS.from_user_input("OGC:CRS84")) if with_geometry else None
+        for batch, geoms in iter_geoparquet_batches(shp_path, columns, id_field, with_geometry=with_geometry,
+                                                    batch_size=batch_size, start=start, stop=stop,
+                                                    bbox_src=bbox_src, mask_src=mask_src, ids=ids):
+            yield {
+                "ids": batch.column(id_field).to_pylist(),
+                "columns": [batch.column(c).to_pylist() for c in columns],
+                "geoms": _transform_geoms(geoms, tfm) if with_geometry else None,
+            }
+        return
+
+    from pyogrio import read_info
+    from pyogrio.raw import open_arrow
+
+    read_cols = list(dict.fromkeys([id_field, *columns]))
+
+    info = read_info(shp_path, layer=layer)
+    src = src_crs_override or info.get("crs")
+    spatial = bbox is not None or mask is not None
+    filters: Dict[str, Any] = {}
+    region = None
+    if spatial:
+        if not src:
+            raise RuntimeError(
+                "No CRS detected for shapefile and none provided. "
+                "Re-run with --src-crs EPSG:xxxx (e.g. --src-crs EPSG:25833)."
+            )
+        bbox_src, mask_src = _filters_to_source(CRS.from_user_input(src), bbox, mask)
+        if bbox_src is not None:
+            filters["bbox"] = bbox_src
+        if mask_src is not None:
+            filters["mask"] = mask_src
+        region = _filter_region(bbox_src, mask_src)
+    if ids is not None:
+        dtypes = dict(zip(info["fields"], info["dtypes"]))
+        filters["where"] = _id_where(id_field, ids, dtypes.get(id_field, "object"))
+
+    skip = start or 0
+    remaining = None if stop is None else max(0, stop - skip)
+
+    with open_arrow(shp_path, layer=layer, columns=read_cols, read_geometry=with_geometry or spatial,
+                    skip_features=skip, batch_size=batch_size, use_pyarrow=True,
+                    **filters) as (meta, reader):
+        tfm = None
+        if with_geometry:
+            if not src:
+                raise RuntimeError(
+                    "No CRS detected for shapefile and none provided. "
+                    "Re-run with --src-crs EPSG:xxxx (e.g. --src-crs EPSG:25833)."
+                )
+            tfm = _make_transformer(CRS.from_user_input(src), CRS.from_user_input("OGC:CRS84"))
+        geom_col = _wkb_column(reader.schema, meta) if with_geometry or spatial else None
+
+        for batch in reader:
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                if batch.num_rows > remaining:
+                    batch = batch.slice(0, remaining)
+                remaining -= batch.num_rows
+
+            if id_field not in batch.schema.names:
+                raise KeyError(f"ID field '{id_field}' not found in attributes: available={batch.schema.names[:10]}...")
+
+            geoms = None
+            if with_geometry or spatial:
+                geoms = shapely.from_wkb(batch.column(geom_col).to_numpy(zero_copy_only=False))
+                keep = ~shapely.is_missing(geoms) if with_geometry else np.ones(len(geoms), dtype=bool)
+                if region is not None:
+                    keep &= shapely.intersects(region, geoms)
+                if not keep.all():
+                    idx = np.flatnonzero(keep)
+                    batch = batch.take(idx)
+                    geoms = geoms[idx]
+                geoms = _transform_geoms(geoms, tfm) if with_geometry else None
+
+            yield {
+                "ids": batch.column(id_field).to_pylist(),
+                "columns": [batch.column(c).to_pylist() for c in columns],
+                "geoms": geoms,
+            }
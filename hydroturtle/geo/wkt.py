@@ -1,4 +1,6 @@
-from typing import Optional
+from itertools import repeat
+from typing import Collection, Iterator, List, Optional, Tuple
+import shapely
 from shapely.geometry.base import BaseGeometry
 from shapely import to_wkt
 
@@ -13,3 +15,49 @@ def wkt_literal_crs84(geom: BaseGeometry) -> str:
     # Preserve Z if present; Shapely 2's to_wkt auto-detects dimension
     wkt = to_wkt(geom, rounding_precision=15)
     return f"\"<{CRS84_IRI}> {wkt}\"^^geo:wktLiteral"
+
+def wkt_literals_crs84(geoms) -> List[str]:
+    """
+    Vectorised wkt_literal_crs84 over an array of geometries (one to_wkt call).
+    """
+    return [f"\"<{CRS84_IRI}> {wkt}\"^^geo:wktLiteral" for wkt in to_wkt(geoms, rounding_precision=15)]
+
+# {"@wkt": <kind>} values; a non-string value (e.g. true) means the geometry
+# itself, an unknown name is an error. "envelope" is the bounding box,
+# "point_on_surface" a representative point guaranteed to lie inside the
+# feature (unlike "centroid").
+GEOMETRY_KINDS = ("geometry", "envelope", "centroid", "point_on_surface")
+_KIND_ALIASES = {"bbox": "envelope", "representative_point": "point_on_surface"}
+_DERIVE = {
+    "envelope": shapely.envelope,
+    "centroid": shapely.centroid,
+    "point_on_surface": shapely.point_on_surface,
+}
+
+def geometry_kind_index(kind: object) -> int:
+    """Position of a {"@wkt": kind} value in GEOMETRY_KINDS."""
+    if not isinstance(kind, str):
+        return 0
+    kind = _KIND_ALIASES.get(kind, kind)
+    if kind not in GEOMETRY_KINDS:
+        raise ValueError(f"Unknown @wkt kind {kind!r} (expected one of {', '.join(GEOMETRY_KINDS)}; "
+                         f"aliases: {', '.join(f'{a} = {k}' for a, k in _KIND_ALIASES.items())})")
+    return GEOMETRY_KINDS.index(kind)
+
+def wkt_literal_rows(geoms, kinds: Collection[int]) -> Iterator[Tuple[Optional[str], ...]]:
+    """
+    Per-feature tuples of WKT literals, aligned with GEOMETRY_KINDS; only the
+    kinds listed (by index) are computed, each with one vectorised call over
+    the whole geometry array. With no kinds every tuple is all None.
+    """
+    if not kinds:
+        return repeat((None,) * len(GEOMETRY_KINDS), len(geoms))
+    cols = []
+    for i, kind in enumerate(GEOMETRY_KINDS):
+        if i not in kinds:
+            cols.append(repeat(None))
+        elif kind == "geometry":
+            cols.append(wkt_literals_crs84(geoms))
+        else:
+            cols.append(wkt_literals_crs84(_DERIVE[kind](geoms)))
+    return zip(*cols)
@@ -0,0 +1,40 @@
+import tarfile
+import zipfile
+from fnmatch import fnmatch
+from pathlib import PurePosixPath
+from typing import Iterator, Tuple
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+def is_archive(path: str) -> bool:
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _matches(name: str, pattern: str) -> bool:
+    # "*.csv" matches members in any folder; "TS/*.csv" matches the full member path
+    return fnmatch(name, pattern) or ("/" not in pattern and fnmatch(PurePosixPath(name).name, pattern))
+
+
+def iter_archive_members(archive_path: str, pattern: str = "*") -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (member_name, content) for every file in a zip or tar archive whose
+    name matches `pattern`, one member at a time and without extracting
+    anything to disk.
+
+    zip members come in name order. tar archives (also .tar.gz/.tgz/...)
+    are read as a stream in archive order, so a compressed tarball is
+    decompressed exactly once.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in sorted(zf.infolist(), key=lambda i: i.filename):
+                if not info.is_dir() and _matches(info.filename, pattern):
+                    yield info.filename, zf.read(info)
+        return
+
+    with tarfile.open(archive_path, mode="r|*") as tf:
+        for member in tf:
+            if member.isfile() and _matches(member.name, pattern):
+                f = tf.extractfile(member)
+                yield member.name, f.read()
@@ -0,0 +1,220 @@
+import json
+import mmap
+import os
+import re
+from array import array
+from typing import List, Optional, Tuple
+
+# One CSV record: delimiter-separated fields up to the terminating newline.
+# As in the csv module, a quote opens a quoted section (which may hold
+# newlines and "" escapes) only at the start of a field; elsewhere, as in
+# 1"0, it is an ordinary character. Matching runs in C straight on the
+# memory map; nothing is decoded, so the encoding must be ASCII-compatible.
+_BLANK = (b"\n", b"\r\n")
+_ASCII_PROBE = "\n\r\",;|\t"
+
+
+def _record(delimiter: str):
+    d = re.escape(delimiter.encode("ascii"))
+    # the two kinds of field are told apart by their first byte, so a row that
+    # does not match (an unterminated last line) fails without backtracking
+    field = rb'(?:(?:"[^"]*")+(?:[^"%s\n][^%s\n]*)?|(?:[^"%s\n][^%s\n]*)?)' % (d, d, d, d)
+    # a line without quotes is matched whole first (most rows, as fast as no field split)
+    return re.compile(rb'[^"\n]*\n|%s(?:%s%s)*\n' % (field, d, field))
+
+
+def check_encoding(encoding: str) -> None:
+    """Raise ValueError for encodings the byte-level index cannot read (UTF-16, UTF-32, ...)."""
+    if not _ASCII_PROBE.encode(encoding).endswith(_ASCII_PROBE.encode("ascii")):
+        raise ValueError(f"A CSV row index needs an ASCII-compatible encoding, not {encoding}; "
+                         f"convert the file with one worker")
+
+INDEX_SUFFIX = ".idx"
+_TAIL = 64  # bytes before the scan position kept to detect rewrites (vs. appends)
+
+
+def _scan(buf, pos: int, end: int, offsets: array, record) -> int:
+    """
+    Append the start offsets of the non-blank records in buf[pos:end] and
+    return the offset just past the last complete record.
+    """
+    match = record.match
+    m = match(buf, pos, end)
+    while m:
+        nxt = m.end()
+        if nxt - pos > 2 or buf[pos:nxt] not in _BLANK:
+            offsets.append(pos)
+        pos = nxt
+        m = match(buf, pos, end)
+    return pos
+
+
+class CsvIndex:
+    """
+    Byte offsets of the rows of a CSV file, found on the raw bytes through a
+    memory map (quote-aware: newlines inside quoted fields do not start a row;
+    blank lines are skipped as csv.DictReader does). delimiter is the field
+    separator, needed to tell an opening quote from one inside a field.
+
+    Works for ASCII-compatible encodings (UTF-8, cp1252, latin-1, ...; see
+    check_encoding).
+
+    - n_rows              number of data rows (what {rowIndex} counts)
+    - row_span(lo, hi)    byte range of rows [lo, hi)
+    - chunks(n)           row ranges for parallel conversion
+    - header_bytes()      the header line, to prepend to a row range
+    - refresh()           index rows appended since the last scan (tail only)
+    - save() / load()     sidecar file <csv>.idx, reused while the CSV is unchanged
+    """
+
+    def __init__(self, path: str, header_end: int, offsets: array, scanned_to: int, size: int, mtime: float,
+                 tail: Optional[str] = None, delimiter: str = ","):
+        self.path = path
+        self.delimiter = delimiter
+        self.header_end = header_end
+        self.offsets = offsets
+        self.scanned_to = scanned_to
+        self.size = size
+        self.mtime = mtime
+        self.tail = tail if tail is not None else self._tail()
+
+    def _tail(self) -> str:
+        with open(self.path, "rb") as f:
+            f.seek(max(0, self.scanned_to - _TAIL))
+            return f.read(min(_TAIL, self.scanned_to)).hex()
+
+    # --- building ------------------------------------------------------------
+    @classmethod
+    def build(cls, path: str, delimiter: str = ",") -> "CsvIndex":
+        st = os.stat(path)
+        offsets = array("q")
+        header_end = scanned_to = 0
+        if st.st_size:
+            record = _record(delimiter)
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                m = record.match(mm)
+                header_end = m.end() if m else st.st_size
+                scanned_to = _scan(mm, header_end, st.st_size, offsets, record)
+                if scanned_to < st.st_size and mm[scanned_to:st.st_size].strip():
+                    offsets.append(scanned_to)  # last row without trailing newline
+        return cls(path, header_end, offsets, scanned_to, st.st_size, st.st_mtime, delimiter=delimiter)
+
+    def refresh(self) -> int:
+        """Scan only the bytes appended since the last scan; returns the number of new rows."""
+        st = os.stat(self.path)
+        if st.st_size < self.size or self._tail() != self.tail:
+            raise ValueError(f"{self.path} was rewritten since it was indexed; rebuild the index")
+        before = len(self.offsets)
+        if self.offsets and self.offsets[-1] >= self.scanned_to:
+            self.offsets.pop()  # the unterminated last row may have grown
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            self.scanned_to = _scan(mm, self.scanned_to, st.st_size, self.offsets, _record(self.delimiter))
+            if self.scanned_to < st.st_size and mm[self.scanned_to:st.st_size].strip():
+                self.offsets.append(self.scanned_to)
+        self.size, self.mtime = st.st_size, st.st_mtime
+        self.tail = self._tail()
+        return len(self.offsets) - before
+
+    # --- queries -------------------------------------------------------------
+    @property
+    def n_rows(self) -> int:
+        return len(self.offsets)
+
+    def row_span(self, lo: int, hi: int) -> Tuple[int, int]:
+        """Byte range [start, end) holding rows lo..hi-1."""
+        hi = min(hi, self.n_rows)
+        if lo >= hi:
+            return self.size, self.size
+        return self.offsets[lo], (self.offsets[hi] if hi < self.n_rows else self.size)
+
+    def chunks(self, n: int, min_rows: int = 1) -> List[Tuple[int, int]]:
+        """Split the rows into at most n contiguous ranges [lo, hi) of similar byte size."""
+        if not self.n_rows:
+            return []
+        data_bytes = self.size - self.header_end
+        target = max(1, data_bytes // max(1, n))
+        ranges, lo = [], 0
+        for k in range(1, n):
+            cut = self.header_end + k * target
+            hi = _bisect(self.offsets, cut, lo + min_rows)
+            if hi >= self.n_rows:
+                break
+            ranges.append((lo, hi))
+            lo = hi
+        ranges.append((lo, self.n_rows))
+        return ranges
+
+    def avg_row_bytes(self) -> float:
+        return (self.size - self.header_end) / self.n_rows if self.n_rows else 0.0
+
+    def header_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read(self.header_end)
+
+    def read_rows(self, lo: int, hi: int) -> bytes:
+        """Header plus the raw bytes of rows [lo, hi): a small CSV on its own."""
+        start, end = self.row_span(lo, hi)
+        with open(self.path, "rb") as f:
+            head = f.read(self.header_end)
+            f.seek(start)
+            return head + f.read(end - start)
+
+    # --- persistence ---------------------------------------------------------
+    def is_current(self) -> bool:
+        st = os.stat(self.path)
+        return st.st_size == self.size and st.st_mtime == self.mtime
+
+    def save(self, idx_path: Optional[str] = None) -> str:
+        idx_path = idx_path or self.path + INDEX_SUFFIX
+        meta = {"header_end": self.header_end, "scanned_to": self.scanned_to,
+                "size": self.size, "mtime": self.mtime, "tail": self.tail, "rows": self.n_rows,
+                "delimiter": self.delimiter}
+        with open(idx_path, "wb") as f:
+            f.write(json.dumps(meta).encode("utf-8") + b"\n")
+            self.offsets.tofile(f)
+        return idx_path
+
+    @classmethod
+    def load(cls, path: str, idx_path: Optional[str] = None) -> "CsvIndex":
+        idx_path = idx_path or path + INDEX_SUFFIX
+        with open(idx_path, "rb") as f:
+            meta = json.loads(f.readline())
+            offsets = array("q")
+            offsets.fromfile(f, meta["rows"])
+        return cls(path, meta["header_end"], offsets, meta["scanned_to"], meta["size"], meta["mtime"], meta["tail"],
+                   delimiter=meta.get("delimiter", ","))
+
+
+def _bisect(offsets: array, value: int, lo: int) -> int:
+    """First row index >= lo whose start offset is >= value."""
+    hi = len(offsets)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if offsets[mid] < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def csv_index(path: str, cache: bool = False, delimiter: str = ",") -> CsvIndex:
+    """
+    Index of a CSV file with fields separated by delimiter. With cache=True a
+    sidecar <csv>.idx is reused while the CSV is unchanged (and was indexed
+    with the same delimiter), extended if rows were only appended, and
+    written otherwise.
+    """
+    idx = CsvIndex.load(path) if cache and os.path.exists(path + INDEX_SUFFIX) else None
+    if idx is not None and idx.delimiter == delimiter:
+        if idx.is_current():
+            return idx
+        try:
+            idx.refresh()
+            idx.save()
+            return idx
+        except ValueError:
+            pass
+    idx = CsvIndex.build(path, delimiter)
+    if cache:
+        idx.save()
+    return idx
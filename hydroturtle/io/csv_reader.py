@@ -0,0 +1,232 @@
+import codecs
+import csv
+import io
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# CSV reader backends, all yielding the same logical rows (dicts of strings):
+#
+#   "dict"   csv.DictReader, every column (default)
+#   "tuple"  csv.reader tuples, projected onto the needed columns; skips the
+#            per-row DictReader bookkeeping and builds smaller dicts
+#   "arrow"  pyarrow.csv streaming reader: parsing runs in C++ on blocks of
+#            the file, only the needed columns are materialised; at the
+#            first row with another column count than the header it goes on
+#            with the "tuple" reader from that row (short rows padded with
+#            None, as DictReader does)
+#
+# Encoding and delimiter are resolved the same way for every backend
+# (explicit -> detected -> utf-8/utf-8-sig/cp1252/latin-1 -> utf-8 "replace").
+# A candidate encoding is checked against the whole file before the first
+# row, so a cp1252 byte late in the file still selects cp1252.
+CSV_READERS = ("dict", "tuple", "arrow")
+FALLBACK_ENCODINGS = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
+
+_ARROW_BLOCK = 1 << 22  # 4 MiB per parsed block
+_CHECK_BLOCK = 1 << 20  # bytes per step of the up-front encoding check
+
+
+def detect_encoding(path: str, data: bytes | None = None) -> str | None:
+    try:
+        from charset_normalizer import from_bytes, from_path
+        best = (from_path(path) if data is None else from_bytes(data)).best()
+        if best and best.encoding:
+            return best.encoding
+    except Exception:
+        pass
+    return None
+
+
+def _sniff_delimiter(sample: str) -> str:
+    # Try csv.Sniffer first
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=[",",";","\t","|"])
+        return dialect.delimiter
+    except Exception:
+        pass
+    # Simple heuristic: pick the delimiter with the most hits in the header
+    header = sample.splitlines()[0] if sample else ""
+    candidates = [",",";","\t","|"]
+    counts = {d: header.count(d) for d in candidates}
+    best = max(counts, key=counts.get)
+    return best if counts[best] > 0 else ","
+
+
+# --- backends ----------------------------------------------------------------
+def _rows_dict(f, delim: str, columns: Optional[List[str]]) -> Iterator[Dict[str, str]]:
+    return iter(csv.DictReader(f, delimiter=delim))
+
+
+def _rows_tuple(f, delim: str, columns: Optional[List[str]]) -> Iterator[Dict[str, str]]:
+    reader = csv.reader(f, delimiter=delim)
+    header = next(reader, None)
+    if header is None:
+        return
+    names = header if columns is None else [c for c in header if c in set(columns)]
+    idx = [header.index(c) for c in names]
+    n = len(header)
+    if not idx:
+        get = lambda r: ()
+    elif len(idx) == 1:
+        get = lambda r, i=idx[0]: (r[i],)
+    else:
+        get = itemgetter(*idx)
+    for r in reader:
+        if not r:
+            continue  # blank line, skipped like DictReader does
+        if len(r) < n:
+            r = r + [None] * (n - len(r))  # DictReader fills short rows with None
+        yield dict(zip(names, get(r)))
+
+
+def _rows_arrow(source, header: List[str], enc: str, delim: str, columns: Optional[List[str]],
+                ragged_rows) -> Iterator[Dict[str, str]]:
+    """ragged_rows(): the same rows from the csv module, for a file with rows of another column count."""
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    ragged = []
+
+    def _on_invalid(row):
+        ragged.append(row.number)
+        return "error"
+
+    names = header if columns is None else [c for c in header if c in set(columns)]
+    read = pacsv.ReadOptions(encoding=enc, block_size=_ARROW_BLOCK)
+    parse = pacsv.ParseOptions(delimiter=delim, newlines_in_values=True, invalid_row_handler=_on_invalid)
+    # every column as text, no type inference; empty cells stay "" (as in the csv module)
+    convert = pacsv.ConvertOptions(column_types={c: pa.string() for c in header}, include_columns=names,
+                                   strings_can_be_null=False, quoted_strings_can_be_null=False,
+                                   null_values=[])
+    n = 0
+    try:
+        with pacsv.open_csv(source, read_options=read, parse_options=parse, convert_options=convert) as reader:
+            for batch in reader:
+                cols = [batch.column(c).to_pylist() for c in names]
+                for vals in zip(*cols):
+                    yield dict(zip(names, vals))
+                    n += 1
+    except pa.ArrowInvalid:
+        if not ragged:
+            raise
+        # the block with the ragged row was not yielded: resume after the n rows that were
+        yield from islice(ragged_rows(), n, None)
+
+
+_BACKENDS = {"dict": _rows_dict, "tuple": _rows_tuple}
+
+
+class _NextEncoding(Exception):
+    pass
+
+
+def _candidate_encodings(path: str, data: bytes | None = None) -> List[str]:
+    found = [detect_encoding(path, data)] + list(FALLBACK_ENCODINGS)
+    return list(dict.fromkeys(e for e in found if e))
+
+
+def _decodes(path: str, data: bytes | None, enc: str) -> bool:
+    """Whether the whole file decodes strictly with enc (read in blocks, nothing kept)."""
+    try:
+        dec = codecs.getincrementaldecoder(enc)("strict")
+        if data is not None:
+            view = memoryview(data)
+            for i in range(0, len(view), _CHECK_BLOCK):
+                dec.decode(view[i:i + _CHECK_BLOCK])
+        else:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(_CHECK_BLOCK), b""):
+                    dec.decode(block)
+        dec.decode(b"", final=True)
+    except (UnicodeDecodeError, LookupError):
+        return False
+    return True
+
+
+def resolve_encoding(path: str, data: bytes | None = None) -> str | None:
+    """
+    The encoding iter_rows reads the file with when none is given: the first
+    of detected, utf-8, utf-8-sig, cp1252, latin-1 that decodes the whole
+    file (None if none does).
+    """
+    return next((e for e in _candidate_encodings(path, data) if _decodes(path, data, e)), None)
+
+
+def iter_rows(csv_path: str,
+              csv_encoding: str | None = None,
+              csv_delimiter: str | None = None,
+              data: bytes | None = None,
+              reader: str = "dict",
+              columns: Optional[Iterable[str]] = None):
+    """
+    Robust CSV reader with:
+      - encoding auto/override,
+      - delimiter auto/override.
+    data: in-memory file content to read instead of opening csv_path.
+    reader: backend, one of CSV_READERS. columns: the columns the caller
+    needs; the "tuple" and "arrow" backends only build those (None = all).
+    """
+    if reader not in CSV_READERS:
+        raise ValueError(f"Unknown CSV reader {reader!r} (expected one of {', '.join(CSV_READERS)})")
+    columns = None if columns is None else list(columns)
+
+    def _open(enc: str, errors: str):
+        if data is None:
+            return open(csv_path, "r", newline="", encoding=enc, errors=errors)
+        return io.TextIOWrapper(io.BytesIO(data), newline="", encoding=enc, errors=errors)
+
+    def _yield_with(enc: str, delim: str | None, strict: bool = True):
+        with _open(enc, "strict" if strict else "replace") as f:
+            # Sniff if needed
+            if delim is None:
+                sample = f.read(65536)
+                f.seek(0)
+                d = _sniff_delimiter(sample)
+            else:
+                d = delim
+            if reader == "arrow" and strict:
+                # pyarrow decodes strictly; the lossy last resort stays on the csv module
+                header = next(csv.reader(f, delimiter=d), [])
+                source = csv_path if data is None else io.BytesIO(data)
+
+                def ragged_rows():
+                    f.seek(0)
+                    return _rows_tuple(f, d, columns)
+
+                rows = _rows_arrow(source, header, enc, d, columns, ragged_rows)
+            else:
+                rows = _BACKENDS.get(reader, _rows_tuple)(f, d, columns)
+            first = next(rows)  # early validate
+            yield first
+            for r in rows:
+                yield r
+
+    # Encoding selection (explicit → detected → fallbacks → replace)
+    if csv_encoding:
+        yield from _yield_with(csv_encoding, csv_delimiter, strict=True)
+        return
+
+    def _try(enc: str) -> Iterator[Dict[str, str]]:
+        # a failure before the first row means "try the next encoding"; after
+        # rows went out, starting over would emit them (and their rowIndex) twice
+        yielded = False
+        try:
+            for r in _yield_with(enc, csv_delimiter, strict=True):
+                yielded = True
+                yield r
+        except Exception:
+            if yielded:
+                raise
+            raise _NextEncoding
+
+    for enc_try in _candidate_encodings(csv_path, data):
+        if not _decodes(csv_path, data, enc_try):
+            continue  # checked up front: a decode error after the first rows cannot be retried
+        try:
+            yield from _try(enc_try)
+            return
+        except _NextEncoding:
+            continue
+
+    yield from _yield_with("utf-8", csv_delimiter, strict=False)
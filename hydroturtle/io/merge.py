@@ -0,0 +1,167 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from hydroturtle.io.ttl_writer import format_prefixes, format_subject, open_out
+
+# Merged batch output: the results of many files written as one graph (one
+# prefix header per output file), optionally split into shards of about
+# shard_triples triples, with triples seen in an earlier file dropped.
+#
+# Seen triples are kept as 16-byte BLAKE2b digests of "s p o" in
+#
+#   DiskHashSet   exact: an SQLite table on disk (WITHOUT ROWID, primary key
+#                 on the digest), looked up and filled once per file
+#   BloomFilter   bounded memory (~1.2 bytes per triple at 1e-6): a triple
+#                 falsely taken as seen is dropped, with probability error_rate
+#
+# Within a file, convert() already de-duplicates per subject.
+
+def triple_key(s: str, p: str, o: str) -> bytes:
+    return hashlib.blake2b(f"{s}\x00{p}\x00{o}".encode("utf-8"), digest_size=16).digest()
+
+
+class DiskHashSet:
+    """Exact set of triple digests in an SQLite file (a temporary one unless path is given)."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._tmp = None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="hydroturtle-seen-", suffix=".sqlite")
+            os.close(fd)
+            self._tmp = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (h BLOB PRIMARY KEY) WITHOUT ROWID")
+        self.db.execute("CREATE TEMP TABLE batch (h BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def add_new(self, keys: List[bytes]) -> List[bool]:
+        """Add keys; True for each key not seen before (in earlier calls or earlier in keys)."""
+        # one set-based round trip per call: stage the keys, read back the known ones, merge
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO batch VALUES (?)", ((k,) for k in keys))
+            known = {r[0] for r in self.db.execute("SELECT h FROM batch WHERE h IN (SELECT h FROM seen)")}
+            self.db.execute("INSERT OR IGNORE INTO seen SELECT h FROM batch")
+            self.db.execute("DELETE FROM batch")
+        out = []
+        for k in keys:
+            out.append(k not in known)
+            known.add(k)
+        return out
+
+    def close(self) -> None:
+        self.db.close()
+        if self._tmp:
+            os.remove(self._tmp)
+
+
+class BloomFilter:
+    """Approximate set of triple digests in a bit array sized for capacity keys at error_rate."""
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 1e-6):
+        self.m = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+
+    def add_new(self, keys: List[bytes]) -> List[bool]:
+        bits, m, k = self.bits, self.m, self.k
+        out = []
+        for key in keys:
+            # double hashing: positions h1 + i * h2 from the two halves of the digest
+            h1 = int.from_bytes(key[:8], "little")
+            h2 = int.from_bytes(key[8:], "little") | 1
+            new = False
+            for i in range(k):
+                pos = (h1 + i * h2) % m
+                byte, bit = pos >> 3, 1 << (pos & 7)
+                if not bits[byte] & bit:
+                    bits[byte] |= bit
+                    new = True
+            out.append(new)
+        return out
+
+    def close(self) -> None:
+        self.bits = bytearray()
+
+
+def make_seen_set(dedup: str, bloom_capacity: int = 10_000_000, bloom_error: float = 1e-6):
+    """"exact" -> DiskHashSet, "bloom" -> BloomFilter, "none" -> None."""
+    if dedup == "exact":
+        return DiskHashSet()
+    if dedup == "bloom":
+        return BloomFilter(bloom_capacity, bloom_error)
+    if dedup == "none":
+        return None
+    raise ValueError(f"Unknown dedup mode {dedup!r} (expected exact, bloom or none)")
+
+
+def shard_path(out_path: str, index: int) -> str:
+    """merged.ttl.gz, 3 -> merged.0003.ttl.gz"""
+    head, name = os.path.split(out_path)
+    stem, dot, rest = name.partition(".")
+    return os.path.join(head, f"{stem}.{index:04d}{dot}{rest}")
+
+
+class MergedWriter:
+    """
+    Writes the (triples_by_subject, prefixes) results of several files into
+    one Turtle output, or into shards of about shard_triples triples, each
+    with the prefix header; drops triples already written (see make_seen_set).
+    """
+
+    def __init__(self, out_path: str, prefixes: Dict[str, str], seen=None, shard_triples: Optional[int] = None):
+        self.out_path = out_path
+        self.prefixes = dict(prefixes)
+        self.seen = seen
+        self.shard_triples = shard_triples
+        self.paths: List[str] = []
+        self.written = 0
+        self.dropped = 0
+        self._out = None
+        self._in_shard = 0
+
+    def _open_next(self) -> None:
+        if self._out is not None:
+            self._out.close()
+        path = shard_path(self.out_path, len(self.paths) + 1) if self.shard_triples else self.out_path
+        self._out = open_out(path)
+        self._out.write(format_prefixes(self.prefixes))
+        self.paths.append(path)
+        self._in_shard = 0
+
+    def add(self, triples_by_subject: Dict[str, List[Tuple[str, str]]], prefixes: Dict[str, str]) -> None:
+        for k, v in prefixes.items():
+            if self.prefixes.get(k) != v:
+                raise ValueError(f"Prefix {k}: <{v}> is not in the merged output's header")
+        if self._out is None:
+            self._open_next()
+
+        blocks = [(s, pos) for s, pos in triples_by_subject.items() if pos]
+        if self.seen is not None:
+            flags = iter(self.seen.add_new([triple_key(s, p, o) for s, pos in blocks for p, o in pos]))
+            kept = []
+            for s, pos in blocks:
+                pos = [po for po in pos if next(flags)]
+                if pos:
+                    kept.append((s, pos))
+            self.dropped += sum(len(pos) for _, pos in blocks) - sum(len(pos) for _, pos in kept)
+            blocks = kept
+
+        for s, pos in blocks:
+            if self.shard_triples and self._in_shard >= self.shard_triples:
+                self._open_next()
+            self._out.write(format_subject(s, pos))
+            self._in_shard += len(pos)
+            self.written += len(pos)
+
+    def close(self) -> List[str]:
+        if self._out is None:
+            self._open_next()  # no input: still a valid (empty) graph
+        self._out.close()
+        if self.seen is not None:
+            self.seen.close()
+        return self.paths
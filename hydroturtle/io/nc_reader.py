@@ -0,0 +1,183 @@
+from itertools import product
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# extra row columns derived from the time coordinate, next to "<time_dim>" (ISO)
+TIME_PARTS = ("YYYY", "MM", "DD", "hh", "mm", "ss")
+
+
+def _find_time_dim(ds, dims: Tuple[str, ...]) -> str:
+    """The dimension whose coordinate variable has CF time units ("... since ..."), else one named time."""
+    for d in dims:
+        v = ds.variables.get(d)
+        if v is not None and " since " in str(getattr(v, "units", "")):
+            return d
+    for d in dims:
+        if d.lower() in ("time", "t", "date"):
+            return d
+    raise ValueError(f"No time dimension among {dims}; set configuration.netcdf.time_dim in the mapping")
+
+
+def _as_strings(arr) -> List[Any]:
+    """Array values as CSV-like cell strings; masked (_FillValue) and NaN cells become ""."""
+    import numpy as np
+
+    data = np.ma.getdata(arr)
+    missing = np.ma.getmaskarray(arr)
+    if data.dtype.kind == "f":
+        missing = missing | np.isnan(data)
+    if data.dtype.kind == "S":
+        out = np.char.decode(data, "utf-8").astype(object)
+    elif data.dtype.kind == "f":
+        # integral floats as "3", not "3.0" (same text as the Parquet/Arrow path)
+        text = data.astype(str)
+        whole = np.char.endswith(text, ".0")
+        if whole.any():
+            text[whole] = np.char.rpartition(text[whole], ".")[..., 0]
+        out = text.astype(object)
+    else:
+        out = data.astype(str).astype(object)
+    out[missing] = ""
+    return out
+
+
+def _read_1d(var, sl: slice) -> List[str]:
+    """A 1-D variable slice as strings; char arrays (id strings) are joined per element."""
+    import netCDF4
+
+    arr = var[sl]
+    if getattr(arr, "ndim", 1) == 2 and arr.dtype.kind == "S":
+        arr = netCDF4.chartostring(arr)
+    return [str(v) for v in _as_strings(arr).tolist()]
+
+
+def _time_columns(tvar, sl: slice, time_dim: str) -> List[Dict[str, str]]:
+    import netCDF4
+
+    values = tvar[sl]
+    if not hasattr(tvar, "units"):
+        return [{time_dim: v} for v in _as_strings(values).tolist()]
+    dts = netCDF4.num2date(values, tvar.units, calendar=getattr(tvar, "calendar", "standard"),
+                           only_use_cftime_datetimes=False)
+    cols = []
+    for dt in dts:
+        parts = (f"{dt.year:04d}", f"{dt.month:02d}", f"{dt.day:02d}",
+                 f"{dt.hour:02d}", f"{dt.minute:02d}", f"{dt.second:02d}")
+        iso = f"{parts[0]}-{parts[1]}-{parts[2]}T{parts[3]}:{parts[4]}:{parts[5]}"
+        cols.append({time_dim: iso, **dict(zip(TIME_PARTS, parts))})
+    return cols
+
+
+def _layout(ds, nc_path: str, variables: Iterable[str], time_dim: Optional[str]):
+    """(variables present, their dimensions, time dimension, space dimensions) of the mapped variables."""
+    variables = list(variables)
+    names = [v for v in variables if v in ds.variables]
+    if not names:
+        raise KeyError(f"None of the mapped variables {variables} found in {nc_path}")
+    dims = ds.variables[names[0]].dimensions
+    for v in names[1:]:
+        if ds.variables[v].dimensions != dims:
+            raise ValueError(f"Variables {names[0]!r} {dims} and {v!r} {ds.variables[v].dimensions} "
+                             f"have different dimensions; convert them with separate mappings")
+    time_dim = time_dim or _find_time_dim(ds, dims)
+    if time_dim not in dims:
+        raise ValueError(f"Time dimension {time_dim!r} not in {dims}")
+    return names, dims, time_dim, [d for d in dims if d != time_dim]
+
+
+def count_positions(nc_path: str, variables: Iterable[str], time_dim: Optional[str] = None) -> int:
+    """Number of stations / grid cells of the mapped variables (1 for a single series)."""
+    from netCDF4 import Dataset
+
+    with Dataset(nc_path) as ds:
+        _, _, _, space_dims = _layout(ds, nc_path, variables, time_dim)
+        n = 1
+        for d in space_dims:
+            n *= len(ds.dimensions[d])
+        return n
+
+
+def _block_shape(sizes: List[int], limit: int) -> List[int]:
+    """
+    Slice length per space dimension for blocks of at most `limit` positions,
+    filled from the last (fastest varying, contiguous) dimension: (1800, 3600)
+    lat x lon with limit 64 -> (1, 64); (500,) stations -> (64,).
+    """
+    shape, room = [], max(1, limit)
+    for n in reversed(sizes):
+        k = max(1, min(n, room))
+        shape.append(k)
+        room //= k
+    return shape[::-1]
+
+
+def iter_nc_rows(nc_path: str,
+                 variables: Iterable[str],
+                 time_dim: Optional[str] = None,
+                 time_chunk: int = 8760,
+                 space_chunk: int = 64) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Stream a NetCDF file as (time_index, row) pairs, one row per time step and
+    station (or grid cell), with CSV-like string values.
+
+    Only the requested `variables` that exist in the file are read; they must
+    share their dimensions, e.g. (time, station) or (time, lat, lon). Data is
+    read in blocks of time_chunk steps x at most space_chunk positions (see
+    _block_shape), so memory is bounded by the block size, not the file or
+    the grid.
+
+    Row columns:
+      - each variable                       -> value ("" for _FillValue / NaN)
+      - <time_dim>                          -> ISO date-time "YYYY-MM-DDTHH:MM:SS"
+      - YYYY, MM, DD, hh, mm, ss            -> its components
+      - each other dimension                -> coordinate value (index if none)
+      - 1-D variables along those dims      -> their values (station_id, lat, ...)
+      - cell                                -> position indices joined by "_"
+    """
+    import numpy as np
+    from netCDF4 import Dataset
+
+    with Dataset(nc_path) as ds:
+        names, dims, time_dim, space_dims = _layout(ds, nc_path, variables, time_dim)
+        axes = [dims.index(d) for d in space_dims] + [dims.index(time_dim)]
+        n_time = len(ds.dimensions[time_dim])
+        tvar = ds.variables.get(time_dim)
+
+        # 1-D variables along each space dimension (coordinates, station ids/names, ...)
+        aux = {d: [v for v, var in ds.variables.items()
+                   if var.dimensions[:1] == (d,) and (var.ndim == 1 or var.dtype.kind == "S") and v not in names]
+               for d in space_dims}
+
+        sizes = [len(ds.dimensions[d]) for d in space_dims]
+        steps = _block_shape(sizes, space_chunk)
+        for starts in product(*(range(0, n, k) for n, k in zip(sizes, steps))):
+            spans = {d: range(a, min(a + k, n)) for d, a, k, n in zip(space_dims, starts, steps, sizes)}
+            aux_cols = {d: {c: _read_1d(ds.variables[c], slice(r.start, r.stop)) for c in aux[d]}
+                        for d, r in spans.items()}
+            positions = list(product(*spans.values()))
+
+            # static columns per position: dimension coordinates / indices, aux variables, cell
+            static = []
+            for pos in positions:
+                row: Dict[str, str] = {}
+                for (d, r), i in zip(spans.items(), pos):
+                    row[d] = str(i)
+                    row.update({c: vals[i - r.start] for c, vals in aux_cols[d].items()})
+                if pos:
+                    row["cell"] = "_".join(map(str, pos))
+                static.append(row)
+
+            for t0 in range(0, n_time, time_chunk):
+                t1 = min(t0 + time_chunk, n_time)
+                times = (_time_columns(tvar, slice(t0, t1), time_dim) if tvar is not None
+                         else [{time_dim: str(t)} for t in range(t0, t1)])
+
+                sl = tuple(slice(t0, t1) if d == time_dim else slice(spans[d].start, spans[d].stop) for d in dims)
+                blocks = [_as_strings(np.transpose(ds.variables[v][sl], axes)).reshape(len(positions), t1 - t0)
+                          for v in names]
+
+                for p, base in enumerate(static):
+                    for k, tcols in enumerate(times):
+                        row = {**base, **tcols}
+                        for v, block in zip(names, blocks):
+                            row[v] = block[p, k]
+                        yield t0 + k, row
@@ -0,0 +1,78 @@
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".arrow", ".arrows", ".feather", ".ipc")
+
+
+def is_columnar(path: str) -> bool:
+    """True for Parquet and Arrow IPC/Feather files (by suffix)."""
+    return Path(path).suffix.lower() in PARQUET_SUFFIXES + ARROW_SUFFIXES
+
+
+def _as_strings(col) -> List[str]:
+    """
+    One Arrow column as CSV-like cell strings: values are cast to text in one
+    vectorised call and nulls become "" (an empty CSV cell).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        col = pc.cast(col, pa.string())
+        return [("" if v is None else v) for v in col.to_pylist()]
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+        return [("" if v is None else str(v)) for v in col.to_pylist()]
+
+
+def _iter_batches(path: str, columns: Optional[List[str]], batch_size: int, data: Optional[bytes]):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = path if data is None else pa.BufferReader(data)
+    if Path(path).suffix.lower() in PARQUET_SUFFIXES:
+        pf = pq.ParquetFile(source)
+        names = pf.schema_arrow.names
+        cols = names if columns is None else [c for c in names if c in set(columns)]
+        # streams row group by row group, decoding only the projected columns
+        yield from pf.iter_batches(batch_size=batch_size, columns=cols)
+        return
+
+    # Arrow IPC / Feather v2: one record batch at a time, projected per batch
+    def _source():
+        return pa.memory_map(path) if data is None else pa.BufferReader(data)
+
+    try:
+        reader = pa.ipc.open_file(_source())
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        # IPC stream format (.arrows, pyarrow RecordBatchStreamWriter): no footer, read front to back
+        reader = batches = pa.ipc.open_stream(_source())
+    names = reader.schema.names
+    idx = [i for i, c in enumerate(names) if columns is None or c in set(columns)]
+    for batch in batches:
+        batch = batch.select(idx)
+        for off in range(0, batch.num_rows, batch_size):
+            yield batch.slice(off, batch_size)
+
+
+def iter_table_rows(path: str,
+                    columns: Optional[Iterable[str]] = None,
+                    batch_size: int = 65536,
+                    data: Optional[bytes] = None) -> Iterator[Dict[str, str]]:
+    """
+    Stream the rows of a Parquet or Arrow IPC/Feather file as dicts of
+    strings, like csv.DictReader rows, so mappings written for CSV apply
+    unchanged.
+
+    Only `columns` are read (all columns if None; names missing from the
+    file are ignored). Parquet is read one record batch at a time within
+    row groups, so memory stays bounded by batch_size. data is the file
+    content when path does not exist on disk (archive members).
+    """
+    columns = None if columns is None else list(columns)
+    for batch in _iter_batches(path, columns, batch_size, data):
+        names = batch.schema.names
+        cols = [_as_strings(batch.column(i)) for i in range(batch.num_columns)]
+        for vals in zip(*cols):
+            yield dict(zip(names, vals))
@@ -0,0 +1,139 @@
+import io
+import os
+import sys
+from typing import Any, Callable, List, Optional
+
+# Output sinks: where the Turtle text goes. open_sink(target) accepts
+#
+#   "-"                  stdout (UTF-8 bytes; stdout itself is left open)
+#   a path (str / Path)  a file; ".gz" / ".bz2" / ".xz" compress it
+#   a binary stream      anything with write(bytes): sys.stdout.buffer, a
+#                        subprocess stdin, a socket file, BytesIO (left open)
+#   a callable           called with the text in chunks of ~64 KiB
+#
+# compress ("gzip", "bz2", "xz") compresses any target except a callable,
+# e.g. gzip onto stdout; for paths the suffix decides unless it is given.
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+_CALLBACK_CHUNK = 1 << 16
+
+
+def _compressor(raw, compress: str):
+    # all three leave a passed-in file object open on close()
+    if compress == "gzip":
+        import gzip
+        return gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+    if compress == "bz2":
+        import bz2
+        return bz2.BZ2File(raw, mode="wb")
+    if compress == "xz":
+        import lzma
+        return lzma.LZMAFile(raw, mode="wb")
+    raise ValueError(f"Unknown compression {compress!r} (expected one of {', '.join(COMPRESSION_SUFFIXES.values())})")
+
+
+class CallbackSink(io.TextIOBase):
+    """Text stream passing what is written to fn(text), in chunks of about chunk_size characters."""
+
+    def __init__(self, fn: Callable[[str], Any], chunk_size: int = _CALLBACK_CHUNK):
+        super().__init__()
+        self._fn = fn
+        self._size = chunk_size
+        self._buf: List[str] = []
+        self._n = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self._buf.append(s)
+        self._n += len(s)
+        if self._n >= self._size:
+            self.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buf:
+            text, self._buf, self._n = "".join(self._buf), [], 0
+            self._fn(text)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.flush()
+        super().close()
+
+
+class Sink:
+    """
+    Text output stream over a target (see open_sink). close() flushes,
+    finishes the compression and closes only what the sink opened itself.
+    Usable as a context manager.
+    """
+
+    def __init__(self, text, layers: List[Any], owned: Optional[Any] = None):
+        self._text = text
+        self._layers = layers  # compressor / raw stream under the text wrapper, outermost first
+        self._owned = owned
+        self.closed = False
+
+    def write(self, s: str) -> int:
+        return self._text.write(s)
+
+    def flush(self) -> None:
+        self._text.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if isinstance(self._text, io.TextIOWrapper):
+                self._text.flush()
+                self._text.detach()  # keep the layers below open for an orderly close
+            else:
+                self._text.close()
+            *compressors, raw = self._layers or [None]
+            for layer in compressors:
+                layer.close()  # writes the trailer; the stream below stays open
+            if raw is not None:
+                raw.flush()
+        finally:
+            if self._owned is not None:
+                self._owned.close()
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_sink(target: Any, compress: Optional[str] = None, encoding: str = "utf-8") -> Sink:
+    """Open a text sink for target ("-", a path, a binary stream or a callable)."""
+    if callable(target) and not hasattr(target, "write"):
+        if compress:
+            raise ValueError("A callback sink receives text; it cannot be compressed")
+        return Sink(CallbackSink(target), [])
+
+    owned = None
+    if isinstance(target, str) and target == "-":
+        raw = sys.stdout.buffer
+    elif isinstance(target, (str, os.PathLike)):
+        path = os.fspath(target)
+        compress = compress or COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+        raw = owned = open(path, "wb")
+    elif hasattr(target, "write"):
+        raw = target
+    else:
+        raise TypeError(f"Unsupported output target {target!r}")
+
+    layers = [raw]
+    if compress:
+        try:
+            layers.insert(0, _compressor(raw, compress))
+        except BaseException:
+            if owned is not None:
+                owned.close()
+            raise
+    return Sink(io.TextIOWrapper(layers[0], encoding=encoding), layers, owned)
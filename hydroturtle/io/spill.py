@@ -0,0 +1,137 @@
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Subject grouping on a memory budget. Turtle wants all triples of a subject
+# in one block, so convert() keeps everything until the end. SubjectSpiller
+# keeps at most max_triples triples in memory: when the budget is reached,
+# the partial groups are sorted by subject and written to a temporary run
+# file; blocks() then k-way merges the runs (heapq.merge) into one block per
+# subject, reading each run sequentially in chunks.
+#
+# Records are (subject, seq, p, o); seq numbers the triples in arrival order,
+# so a subject's triples keep their order across runs and the first of
+# duplicate triples is kept, as in convert(). If nothing was spilled the
+# blocks come out in first-seen subject order, exactly as without a budget;
+# otherwise subjects come out sorted.
+
+_CHUNK = 8192   # records per pickled chunk of a run file
+_FAN_IN = 128   # runs merged at once; more are first merged into larger runs
+
+Block = Tuple[str, List[Tuple[str, str]]]
+
+
+def _read_run(path: str) -> Iterator[tuple]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            yield from chunk
+
+
+def _write_run(records, path: str) -> None:
+    with open(path, "wb") as f:
+        chunk = []
+        for rec in records:
+            chunk.append(rec)
+            if len(chunk) >= _CHUNK:
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                chunk = []
+        if chunk:
+            pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _first_of(entries) -> Tuple[List[int], List[Tuple[str, str]]]:
+    """(seq, p, o) entries of one subject -> seqs and (p, o) of the first occurrence of each triple."""
+    seen, seqs, pos = set(), [], []
+    for seq, p, o in entries:
+        if (p, o) not in seen:
+            seen.add((p, o))
+            seqs.append(seq)
+            pos.append((p, o))
+    return seqs, pos
+
+
+def _unique_pos(records) -> List[Tuple[str, str]]:
+    seen, pos = set(), []
+    for p, o in records:
+        if (p, o) not in seen:
+            seen.add((p, o))
+            pos.append((p, o))
+    return pos
+
+
+class SubjectSpiller:
+    """Collect (s, p, o) with at most max_triples in memory; blocks() yields them grouped by subject."""
+
+    def __init__(self, max_triples: int, spill_dir: Optional[str] = None):
+        if max_triples < 1:
+            raise ValueError("max_triples must be at least 1")
+        self.max_triples = max_triples
+        self._spill_dir = spill_dir
+        self._tmp: Optional[str] = None
+        self._groups: Dict[str, List[Tuple[int, str, str]]] = {}
+        self._n = 0
+        self._seq = 0
+        self._run_id = 0
+        self.runs: List[str] = []
+
+    def add(self, s: str, p: str, o: str) -> None:
+        self._groups.setdefault(s, []).append((self._seq, p, o))
+        self._seq += 1
+        self._n += 1
+        if self._n >= self.max_triples:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._tmp is None:
+            self._tmp = tempfile.mkdtemp(prefix="hydroturtle-spill-", dir=self._spill_dir)
+        groups = self._groups
+        # duplicates within the run go right away
+        records = ((s, seq, p, o) for s in sorted(groups)
+                   for seq, (p, o) in zip(*_first_of(groups[s])))
+        self.runs.append(self._new_run(records))
+        self._groups = {}
+        self._n = 0
+
+    def _new_run(self, records) -> str:
+        path = os.path.join(self._tmp, f"run{self._run_id:06d}.pkl")
+        self._run_id += 1
+        _write_run(records, path)
+        return path
+
+    def blocks(self) -> Iterator[Block]:
+        """(subject, [(p, o), ...]) with each triple once; call after the last add()."""
+        if not self.runs:
+            for s, entries in self._groups.items():
+                yield s, _unique_pos((p, o) for _, p, o in entries)
+            return
+        if self._groups:
+            self._spill()
+        while len(self.runs) > _FAN_IN:
+            # too many open files otherwise: merge the oldest runs into one
+            batch, self.runs = self.runs[:_FAN_IN], self.runs[_FAN_IN:]
+            self.runs.append(self._new_run(heapq.merge(*(_read_run(path) for path in batch))))
+            for path in batch:
+                os.remove(path)
+        merged = heapq.merge(*(_read_run(path) for path in self.runs))  # by (subject, seq)
+        for s, records in groupby(merged, key=itemgetter(0)):
+            yield s, _unique_pos((p, o) for _, _, p, o in records)
+
+    def close(self) -> None:
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+
+    def __enter__(self) -> "SubjectSpiller":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
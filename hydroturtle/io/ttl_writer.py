@@ -16,15 +16,26 @@ def _pretty_bnode(o: str, indent: str = "\t") -> str:
 def _p_shorthand(p: str) -> str:
     return "a" if p == "rdf:type" else p
 
-def write_turtle(triples_by_subject, prefixes, path):
-    with open(path, "w", encoding="utf-8") as out:
-        for k, v in prefixes.items():
-            out.write(f"@prefix {k}: <{v}> .\n")
-        out.write("\n")
-        for s, pos in triples_by_subject.items():
-            out.write(f"{s} ")
-            for j, (p, o) in enumerate(pos):
-                p_fmt = _p_shorthand(p)
-                o_fmt = _pretty_bnode(o)
-                end = " .\n" if j == len(pos)-1 else " ;\n\t"
-                out.write(f"{p_fmt} {o_fmt}{end}")
+def open_out(target, compress=None):
+    """Text output stream for target: a path (.gz/.bz2/.xz compressed), "-" for stdout, a binary stream or a callback (see sinks.open_sink)."""
+    from hydroturtle.io.sinks import open_sink
+    return open_sink(target, compress=compress)
+
+def format_prefixes(prefixes) -> str:
+    return "".join(f"@prefix {k}: <{v}> .\n" for k, v in prefixes.items()) + "\n"
+
+def format_subject(s, pos) -> str:
+    """One subject block: "s p1 o1 ;\n\tp2 o2 .\n"."""
+    body = " ;\n\t".join(f"{_p_shorthand(p)} {_pretty_bnode(o)}" for p, o in pos)
+    return f"{s} {body} .\n"
+
+def write_turtle(triples_by_subject, prefixes, path, compress=None):
+    write_blocks(triples_by_subject.items(), prefixes, path, compress=compress)
+
+def write_blocks(blocks, prefixes, path, compress=None):
+    """write_turtle for an iterable of (subject, [(p, o), ...]) blocks, e.g. a streamed merge."""
+    with open_out(path, compress=compress) as out:
+        out.write(format_prefixes(prefixes))
+        for s, pos in blocks:
+            if pos:
+                out.write(format_subject(s, pos))
@@ -140,6 +140,13 @@ def _from_new_configuration(raw: Dict[str, Any]) -> Dict[str, Any]:
     if derive:
         legacy["derive"] = derive
 
+    # SHP / NetCDF engine settings (src_crs, layer, hierarchy, dims, ...) are
+    # read by engine_shp / engine_nc from here as-is. Only these two sections
+    # are kept: csv and column_types were translated into context above.
+    engine_cfg = {k: cfg[k] for k in ("shapefile", "netcdf") if cfg.get(k)}
+    if engine_cfg:
+        legacy["configuration"] = engine_cfg
+
     return legacy
 
 
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+# Conversion daemon: `hydroturtle serve`.
+#
+# Keeps a pool of worker processes alive between jobs, so each job skips the
+# interpreter start and imports (the geo stack alone is ~0.4 s) and reuses
+# what the engines cache in-process: pyproj transformers and parsed dates
+# (evaluator._iso_datetime).
+#
+# HTTP API (JSON), on 127.0.0.1:<port> or on a Unix socket (--socket):
+#
+#   POST   /jobs               submit {"kind", "input", "mapping", "out"?, "options"?}
+#                              -> 202 {job}; with ?wait=1 -> 200 {job} when finished
+#   GET    /jobs               all jobs
+#   GET    /jobs/<id>          {"id", "status", "out", "error", "seconds", ...}
+#                              status: queued | running | done | failed | cancelled
+#   GET    /jobs/<id>/result   the Turtle output, streamed
+#   DELETE /jobs/<id>          cancel a queued job / forget a finished one
+#                              (removes its output if the server chose the path)
+#   GET    /health             {"status": "ok", "workers", "jobs", "restarts"}
+#                              -> 503 {"status": "broken", "error"} after a worker died
+#
+# kind is "csv" (also Parquet/Arrow), "nc" or "shp"; options are the keyword
+# arguments of the matching run_convert* function (see JOB_OPTIONS). Without
+# "out" the result is written to the server's spool directory and fetched
+# through /result. Paths are resolved on the server: bind it to localhost or
+# a socket only; there is no authentication.
+#
+# A worker that dies (killed, out of memory) breaks the whole process pool:
+# the jobs it held fail with BrokenProcessPool, /health reports it, and the
+# next submitted job starts a fresh pool.
+
+JOB_OPTIONS = {
+    "csv": {"csv_encoding", "csv_delimiter", "json_encoding", "csv_reader", "pipeline", "batch_rows"},
+    "nc": {"json_encoding", "time_dim", "time_chunk", "space_chunk"},
+    "shp": {"id_field", "src_crs_override", "json_encoding", "reader", "bbox", "ids",
+            "hierarchy", "summary_geometries", "layer"},
+}
+
+_CHUNK = 1 << 16
+
+
+# --- worker side ---------------------------------------------------------------
+def _warm():
+    """Pool initializer: import the CSV engine once per worker (others on first use, then kept)."""
+    import hydroturtle.core.engine  # noqa: F401
+
+
+def _run_job(kind: str, input_path: str, mapping_path: str, out_path: str, options: Dict[str, Any]) -> str:
+    from hydroturtle.api import convert_file
+
+    if options.get("bbox") is not None:
+        options = {**options, "bbox": tuple(options["bbox"])}  # JSON has no tuples
+    return convert_file(input_path, mapping_path, out_path, kind=kind, **options)
+
+
+# --- job table -----------------------------------------------------------------
+class JobError(ValueError):
+    """Invalid job request (HTTP 400)."""
+
+
+class JobManager:
+    def __init__(self, workers: int = 1, spool_dir: Optional[str] = None):
+        self.workers = workers
+        self.pool = self._new_pool()
+        self.restarts = 0
+        self.broken: Optional[str] = None  # set when a worker death broke the pool
+        self.spool_dir = spool_dir or tempfile.mkdtemp(prefix="hydroturtle-")
+        self._own_spool = spool_dir is None
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.futures = {}
+        self.lock = threading.RLock()  # Future.cancel() runs the done callback in the caller
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm)
+        pool.submit(os.getpid).result()  # start (and warm) the workers before serving
+        return pool
+
+    def _restart_pool(self) -> None:
+        """Replace a broken pool (caller holds the lock)."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._new_pool()
+        self.restarts += 1
+        self.broken = None
+
+    def submit(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        kind = spec.get("kind", "csv")
+        if kind not in JOB_OPTIONS:
+            raise JobError(f"Unknown kind {kind!r} (expected one of {', '.join(JOB_OPTIONS)})")
+        for key in ("input", "mapping"):
+            if not spec.get(key):
+                raise JobError(f"Missing {key!r}")
+            if not os.path.exists(spec[key]):
+                raise JobError(f"{key} not found: {spec[key]}")
+        options = spec.get("options") or {}
+        unknown = set(options) - JOB_OPTIONS[kind]
+        if unknown:
+            raise JobError(f"Unknown options for {kind}: {', '.join(sorted(unknown))}")
+
+        job_id = uuid.uuid4().hex[:12]
+        spooled = not spec.get("out")
+        out = os.path.join(self.spool_dir, f"{job_id}.ttl") if spooled else os.path.abspath(spec["out"])
+        job = {"id": job_id, "kind": kind, "input": spec["input"], "mapping": spec["mapping"], "out": out,
+               "status": "queued", "error": None, "submitted": time.time(), "seconds": None,
+               "_spooled": spooled}
+        args = (_run_job, kind, spec["input"], spec["mapping"], out, dict(options))
+        with self.lock:
+            if self.broken:
+                self._restart_pool()
+            try:
+                fut = self.pool.submit(*args)
+            except BrokenProcessPool:  # broke before the failed jobs' callbacks ran
+                self._restart_pool()
+                fut = self.pool.submit(*args)
+            job["_pool"] = self.restarts
+            self.jobs[job_id] = job
+            self.futures[job_id] = fut
+        fut.add_done_callback(lambda f, j=job: self._finish(j, f))
+        return self.status(job_id)
+
+    def _finish(self, job: Dict[str, Any], fut) -> None:
+        with self.lock:
+            self._settle(job, fut)
+            if (not fut.cancelled() and isinstance(fut.exception(), BrokenProcessPool)
+                    and job["_pool"] == self.restarts):  # not an already replaced pool
+                self.broken = f"BrokenProcessPool: {fut.exception()}"
+
+    @staticmethod
+    def _settle(job: Dict[str, Any], fut) -> None:
+        """Record the outcome of a finished future (once; caller holds the lock)."""
+        if job["seconds"] is not None:
+            return
+        job["seconds"] = round(time.time() - job["submitted"], 3)
+        if fut.cancelled():
+            job["status"] = "cancelled"
+        elif fut.exception() is not None:
+            exc = fut.exception()
+            job["status"], job["error"] = "failed", f"{type(exc).__name__}: {exc}"
+        else:
+            job["status"] = "done"
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            fut = self.futures.get(job_id)
+            if fut is not None and fut.done():
+                self._settle(job, fut)  # the done callback may not have run yet
+            elif job["status"] == "queued" and fut is not None and fut.running():
+                job["status"] = "running"
+            return {k: v for k, v in job.items() if not k.startswith("_")}
+
+    def list_jobs(self):
+        return [self.status(j) for j in list(self.jobs)]
+
+    def wait(self, job_id: str) -> Dict[str, Any]:
+        fut = self.futures[job_id]
+        try:
+            fut.result()
+        except BaseException:
+            pass  # recorded in the job status
+        return self.status(job_id)
+
+    def delete(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            fut = self.futures[job_id]
+            if not fut.done() and not fut.cancel():
+                raise JobError("Job is running; it can be deleted once finished")
+            del self.jobs[job_id], self.futures[job_id]
+        if job["_spooled"] and os.path.exists(job["out"]):
+            os.remove(job["out"])
+        return {k: v for k, v in job.items() if not k.startswith("_")}
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self._own_spool:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+
+# --- HTTP layer ----------------------------------------------------------------
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "HydroTurtle"
+    manager: JobManager = None  # set by make_server
+
+    def log_message(self, fmt, *args):
+        if not getattr(self.server, "quiet", False):
+            super().log_message(fmt, *args)
+
+    def address_string(self):
+        # Unix socket clients have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send_json(self, code: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _parts(self):
+        url = urlsplit(self.path)
+        return [p for p in url.path.split("/") if p], parse_qs(url.query)
+
+    def do_GET(self):
+        parts, _ = self._parts()
+        if parts == ["health"]:
+            m = self.manager
+            health = {"status": "broken" if m.broken else "ok", "workers": m.workers,
+                      "jobs": len(m.jobs), "restarts": m.restarts}
+            if m.broken:
+                health["error"] = m.broken
+            return self._send_json(503 if m.broken else 200, health)
+        if parts == ["jobs"]:
+            return self._send_json(200, self.manager.list_jobs())
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.manager.status(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": f"No job {parts[1]}"})
+            if len(parts) == 2:
+                return self._send_json(200, job)
+            if parts[2] == "result":
+                return self._send_result(job)
+        self._send_json(404, {"error": f"Not found: {self.path}"})
+
+    def _send_result(self, job: Dict[str, Any]) -> None:
+        if job["status"] != "done":
+            return self._send_json(409, {"error": f"Job is {job['status']}", "job": job})
+        with open(job["out"], "rb") as f:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/gzip" if job["out"].endswith(".gz") else "text/turtle")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, _CHUNK)
+
+    def do_POST(self):
+        parts, query = self._parts()
+        if parts != ["jobs"]:
+            return self._send_json(404, {"error": f"Not found: {self.path}"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(spec, dict):
+                raise JobError("Expected a JSON object")
+            job = self.manager.submit(spec)
+        except (JobError, json.JSONDecodeError) as e:
+            return self._send_json(400, {"error": str(e)})
+        if query.get("wait", ["0"])[0] not in ("0", "", "false"):
+            return self._send_json(200, self.manager.wait(job["id"]))
+        self._send_json(202, job)
+
+    def do_DELETE(self):
+        parts, _ = self._parts()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": f"Not found: {self.path}"})
+        try:
+            job = self.manager.delete(parts[1])
+        except JobError as e:
+            return self._send_json(409, {"error": str(e)})
+        if job is None:
+            return self._send_json(404, {"error": f"No job {parts[1]}"})
+        self._send_json(200, job)
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)  # stale socket from a previous run
+        UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "unix", 0
+
+
+def make_server(manager: JobManager, host: str = "127.0.0.1", port: int = 8765,
+                socket_path: Optional[str] = None, quiet: bool = False):
+    handler = type("Handler", (_Handler,), {"manager": manager})
+    if socket_path:
+        if not hasattr(socket, "AF_UNIX"):
+            raise SystemExit("Unix sockets are not available on this platform; use --port")
+        server = _UnixHTTPServer(socket_path, handler)
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+    server.quiet = quiet
+    return server
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+          workers: int = 1, spool_dir: Optional[str] = None, quiet: bool = False) -> None:
+    """Run the conversion daemon until interrupted (Ctrl+C / SIGTERM)."""
+    manager = JobManager(workers=workers, spool_dir=spool_dir)
+    server = make_server(manager, host=host, port=port, socket_path=socket_path, quiet=quiet)
+    where = socket_path or f"http://{host}:{server.server_address[1]}"
+    print(f"hydroturtle serve: {workers} worker(s) on {where}", flush=True)
+    # SIGTERM (service managers, schedulers) stops the loop like Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
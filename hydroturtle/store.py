@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from hydroturtle.api import as_mapping, iter_triples
+
+# Loading into an embedded triple store: `hydroturtle load` / `hydroturtle query`.
+#
+# The conversion's triples go straight into a local store in large batches
+# instead of being written as Turtle and parsed again on the store side:
+#
+#   oxigraph   pyoxigraph.Store(path) (RocksDB). Each batch is one
+#              Store.bulk_load of N-Triples (parsed in Rust, written as new
+#              SST files, no per-triple transaction)
+#   rdflib     an rdflib Graph on a persistent store plugin (BerkeleyDB by
+#              default; e.g. "SQLAlchemy" with rdflib-sqlalchemy and a
+#              sqlite:/// URL as path). Terms are built directly, added with
+#              addN and committed once per batch
+#
+# Embedded stores have a single writer. With workers > 1 the sources are
+# converted in worker processes to N-Triples spool files, which the main
+# process loads one by one as they finish.
+#
+# Blank node labels (_:b0, _:b1, ... restart for every source) get a random
+# per-source prefix (_tag_bnode). That prefix is what keeps blank nodes of
+# different files, and of repeated runs into the same store, apart: rdflib
+# takes labels as they are, store-wide, so without it every source's _:b0
+# would be one node. Do not drop it. oxigraph relabels blank nodes per
+# load, so batches are only cut between subject blocks: a blank node and
+# the triples that mention it are always loaded together.
+
+BACKENDS = ("oxigraph", "rdflib")
+RDFLIB_GRAPH = "urn:x-hydroturtle:graph"  # the rdflib backend's graph in the store
+
+Triple = Tuple[str, str, str]
+
+
+# --- batches -------------------------------------------------------------------
+def _tag_bnode(term: str, tag: str) -> str:
+    return f"_:{tag}{term[2:]}" if term.startswith("_:") else term
+
+
+def _triple_batches(source: str, mapping: Dict[str, Any], batch_triples: int, kind: Optional[str],
+                    options: Dict[str, Any]) -> Iterator[List[Triple]]:
+    """N-Triples-term triples of one source in batches of about batch_triples."""
+    tag = uuid.uuid4().hex[:8]
+    batch: List[Triple] = []
+    for s, p, o in iter_triples(source, mapping, kind=kind, expand=True, **options):
+        # cut before a new subject block only, never inside a blank node's triples
+        if len(batch) >= batch_triples and not s.startswith("_:"):
+            yield batch
+            batch = []
+        batch.append((_tag_bnode(s, tag), p, _tag_bnode(o, tag)))
+    if batch:
+        yield batch
+
+
+def _spool_ntriples(source: str, mapping: Dict[str, Any], spool_dir: str, batch_triples: int,
+                    kind: Optional[str], options: Dict[str, Any]) -> Tuple[str, int]:
+    """Worker: convert source to an N-Triples spool file; returns (path, triples)."""
+    path = os.path.join(spool_dir, uuid.uuid4().hex + ".nt")
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for batch in _triple_batches(source, mapping, batch_triples, kind, options):
+            f.write("".join(f"{s} {p} {o} .\n" for s, p, o in batch))
+            n += len(batch)
+    return path, n
+
+
+def _read_ntriples(path: str, batch_triples: int) -> Iterator[List[Triple]]:
+    """Batches of a spool file (one "s p o ." per line, as written above)."""
+    batch: List[Triple] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            s, p, o = line.rstrip("\n")[:-2].split(" ", 2)
+            if len(batch) >= batch_triples and not s.startswith("_:"):
+                yield batch
+                batch = []
+            batch.append((s, p, o))
+    if batch:
+        yield batch
+
+
+# --- backends ------------------------------------------------------------------
+class _OxigraphStore:
+    def __init__(self, path: str, read_only: bool = False):
+        try:
+            import pyoxigraph
+        except ImportError:
+            raise SystemExit("The oxigraph backend needs pyoxigraph: pip install pyoxigraph")
+        self._ox = pyoxigraph
+        self.read_only = read_only
+        self.store = pyoxigraph.Store.read_only(path) if read_only else pyoxigraph.Store(path)
+
+    def _bulk_load(self, data: bytes) -> None:
+        if hasattr(self._ox, "RdfFormat"):  # pyoxigraph >= 0.4
+            self.store.bulk_load(data, format=self._ox.RdfFormat.N_TRIPLES)
+        else:
+            self.store.bulk_load(data, mime_type="application/n-triples")
+
+    def add(self, triples: List[Triple]) -> None:
+        self._bulk_load("".join(f"{s} {p} {o} .\n" for s, p, o in triples).encode("utf-8"))
+
+    def load_file(self, path: str, batch_triples: int) -> None:
+        with open(path, "rb") as f:  # a spool file is one source: a single load keeps its blank nodes
+            self._bulk_load(f.read())
+
+    def query(self, sparql: str) -> Iterator[str]:
+        result = self.store.query(sparql)
+        if isinstance(result, self._ox.QueryBoolean):
+            yield "true\n" if bool(result) else "false\n"
+        elif isinstance(result, self._ox.QuerySolutions):
+            yield "\t".join(f"?{v.value}" for v in result.variables) + "\n"
+            for row in result:
+                yield "\t".join("" if t is None else str(t) for t in row) + "\n"
+        else:
+            for t in result:
+                yield f"{t} .\n"
+
+    def close(self) -> None:
+        if not self.read_only and hasattr(self.store, "flush"):
+            self.store.flush()
+        self.store = None
+
+
+@lru_cache(maxsize=1 << 16)
+def _rdflib_term(term: str):
+    """An N-Triples term (as produced by api.nt_term) -> the rdflib term."""
+    from rdflib import BNode, Literal, URIRef
+    from rdflib.plugins.parsers.ntriples import unquote
+
+    if term.startswith("<"):
+        return URIRef(term[1:-1])
+    if term.startswith("_:"):
+        return BNode(term[2:])
+    end = term.rfind('"')
+    lexical, tail = unquote(term[1:end]), term[end + 1:]
+    if tail.startswith("^^"):
+        return Literal(lexical, datatype=URIRef(tail[3:-1]))
+    if tail.startswith("@"):
+        return Literal(lexical, lang=tail[1:])
+    return Literal(lexical)
+
+
+class _RdflibStore:
+    def __init__(self, path: str, plugin: str = "BerkeleyDB", read_only: bool = False):
+        try:
+            from rdflib import Graph, URIRef
+        except ImportError:
+            raise SystemExit("The rdflib backend needs rdflib: pip install rdflib")
+        self.graph = Graph(store=plugin, identifier=URIRef(RDFLIB_GRAPH))
+        self.graph.open(path, create=not read_only)
+
+    def add(self, triples: List[Triple]) -> None:
+        g = self.graph
+        g.addN((_rdflib_term(s), _rdflib_term(p), _rdflib_term(o), g) for s, p, o in triples)
+        g.commit()
+
+    def load_file(self, path: str, batch_triples: int) -> None:
+        for batch in _read_ntriples(path, batch_triples):
+            self.add(batch)
+
+    def query(self, sparql: str) -> Iterator[str]:
+        result = self.graph.query(sparql)
+        if result.type == "ASK":
+            yield "true\n" if result.askAnswer else "false\n"
+        elif result.type == "SELECT":
+            yield "\t".join(f"?{v}" for v in result.vars) + "\n"
+            for row in result:
+                yield "\t".join("" if t is None else t.n3() for t in row) + "\n"
+        else:
+            for s, p, o in result:
+                yield f"{s.n3()} {p.n3()} {o.n3()} .\n"
+
+    def close(self) -> None:
+        self.graph.close(commit_pending_transaction=True)
+
+
+def open_store(path: str, backend: str = "oxigraph", rdflib_store: str = "BerkeleyDB",
+               read_only: bool = False):
+    """Open (or create) an embedded store: add(triples), load_file(path, n), query(sparql), close()."""
+    if backend == "oxigraph":
+        return _OxigraphStore(path, read_only=read_only)
+    if backend == "rdflib":
+        return _RdflibStore(path, plugin=rdflib_store, read_only=read_only)
+    raise ValueError(f"Unknown backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+
+
+# --- entry points --------------------------------------------------------------
+def load_store(
+    sources: Union[str, Iterable[str]],
+    mapping: Union[str, Dict[str, Any]],
+    store_path: str,
+    backend: str = "oxigraph",
+    kind: Optional[str] = None,
+    workers: int = 1,
+    batch_triples: int = 200_000,
+    rdflib_store: str = "BerkeleyDB",
+    json_encoding: str = "utf-8",
+    **options: Any
+) -> int:
+    """
+    Convert sources with mapping and add the triples to the store at
+    store_path (created if needed). options are the converter keyword
+    arguments (see api.iter_subjects). Returns the number of triples loaded.
+    """
+    sources = [sources] if isinstance(sources, str) else [str(s) for s in sources]
+    mapping = as_mapping(mapping, json_encoding)
+    store = open_store(store_path, backend=backend, rdflib_store=rdflib_store)
+    total = 0
+    try:
+        if workers <= 1 or len(sources) < 2:
+            for src in sources:
+                for batch in _triple_batches(src, mapping, batch_triples, kind, options):
+                    store.add(batch)
+                    total += len(batch)
+            return total
+
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        spool_dir = tempfile.mkdtemp(prefix="hydroturtle-load-")
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_spool_ntriples, src, mapping, spool_dir, batch_triples, kind, options)
+                           for src in sources]
+                for fut in as_completed(futures):
+                    path, n = fut.result()
+                    store.load_file(path, batch_triples)
+                    os.remove(path)
+                    total += n
+        finally:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+        return total
+    finally:
+        store.close()
+
+
+def query_store(store_path: str, sparql: str, backend: str = "oxigraph",
+                rdflib_store: str = "BerkeleyDB") -> Iterator[str]:
+    """
+    Run a SPARQL query on a store; yields text lines: SELECT as TSV (header
+    of ?variables, N-Triples terms), ASK as true/false, CONSTRUCT/DESCRIBE
+    as N-Triples.
+    """
+    store = open_store(store_path, backend=backend, rdflib_store=rdflib_store, read_only=True)
+    try:
+        yield from store.query(sparql)
+    finally:
+        store.close()
@@ -0,0 +1,20 @@
+import pytest
+
+
+@pytest.fixture
+def grid(tmp_path):
+    """A (time 5, lat 3, lon 4) NetCDF grid with prec = its flat index."""
+    netCDF4 = pytest.importorskip("netCDF4")
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "grid.nc")
+    with netCDF4.Dataset(path, "w") as ds:
+        for name, n in (("time", 5), ("lat", 3), ("lon", 4)):
+            ds.createDimension(name, n)
+        t = ds.createVariable("time", "f8", ("time",))
+        t.units = "days since 2000-01-01"
+        t[:] = np.arange(5)
+        ds.createVariable("lat", "f4", ("lat",))[:] = [47.0, 47.5, 48.0]
+        ds.createVariable("lon", "f4", ("lon",))[:] = [10.0, 10.5, 11.0, 11.5]
+        prec = ds.createVariable("prec", "f4", ("time", "lat", "lon"))
+        prec[:] = np.arange(60, dtype="f4").reshape(5, 3, 4)
+    return path
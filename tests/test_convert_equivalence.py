@@ -0,0 +1,114 @@
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from hydroturtle.core.engine import run_convert
+from hydroturtle.io.csv_reader import CSV_READERS
+
+MAPPING = str(Path(__file__).resolve().parents[1] / "examples" / "lamah_ce" / "mapping_lamah_ce_timeseries.json")
+HEADER = "YYYY;MM;DD;2m_temp_max;prec"
+
+
+def _write_csv(path: Path, n: int, messy: bool = False) -> str:
+    """LamaH-style daily series; messy adds stray quotes, quoted fields and ragged rows."""
+    rnd = random.Random(7)
+    lines = [HEADER]
+    for i in range(n):
+        y, m, d = 1981 + i // 360, 1 + i // 30 % 12, 1 + i % 28
+        temp = "NA" if i % 17 == 0 else f"{rnd.uniform(-10, 30):.1f}"
+        row = f"{y};{m:02d};{d:02d};{temp};{rnd.randint(0, 9)}"
+        if messy and i % 97 == 5:
+            row = f'{y};{m:02d};{d:02d};1"5;{i % 10}'       # quote inside an unquoted field
+        elif messy and i % 211 == 9:
+            row = f'{y};{m:02d};{d:02d};"2.5";"{i % 10}"'   # quoted fields
+        elif messy and i % 331 == 11:
+            row = f"{y};{m:02d};{d:02d};3.5"                # short row
+        elif messy and i % 401 == 13:
+            row += ";extra"                                  # long row
+        lines.append(row)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture(params=[False, True], ids=["clean", "messy"])
+def csv_file(request, tmp_path):
+    return _write_csv(tmp_path / "ID_7.csv", 3000, messy=request.param)
+
+
+def _convert(csv_path, out_dir, name, **kwargs) -> bytes:
+    out = str(Path(out_dir) / f"{name}.ttl")
+    run_convert(csv_path, MAPPING, out, **kwargs)
+    return Path(out).read_bytes()
+
+
+@pytest.mark.parametrize("variant", [
+    {"workers": 2},
+    {"workers": 3, "index_cache": True},
+    {"pipeline": True, "batch_rows": 500},
+    {"pipeline": True, "batch_rows": 500, "workers": 2},
+    {"max_triples": 10_000_000},  # nothing spilled: byte-identical
+], ids=lambda v: ",".join(f"{k}={v[k]}" for k in v))
+def test_variants_match_sequential(csv_file, tmp_path, variant):
+    expected = _convert(csv_file, tmp_path, "sequential")
+    assert _convert(csv_file, tmp_path, "variant", **variant) == expected
+
+
+@pytest.mark.parametrize("reader", [r for r in CSV_READERS if r != "dict"])
+def test_csv_readers_match_dict(csv_file, tmp_path, reader):
+    if reader == "arrow":
+        pytest.importorskip("pyarrow")
+    expected = _convert(csv_file, tmp_path, "dict")
+    assert _convert(csv_file, tmp_path, reader, csv_reader=reader) == expected
+
+
+def _blocks(ttl: bytes):
+    """Prefix header and the sorted subject blocks of a Turtle output."""
+    head, _, body = ttl.decode("utf-8").partition("\n\n")
+    return head, sorted(re.split(r"(?<= \.\n)(?=\S)", body))
+
+
+def test_spilled_output_has_the_same_blocks(csv_file, tmp_path):
+    expected = _convert(csv_file, tmp_path, "sequential")
+    spilled = _convert(csv_file, tmp_path, "spilled", max_triples=2000)
+    assert spilled != expected  # subjects come out sorted once anything was spilled
+    assert _blocks(spilled) == _blocks(expected)
+
+
+def test_index_cache_is_reused_and_extended(tmp_path):
+    csv_path = _write_csv(tmp_path / "ID_7.csv", 1000, messy=True)
+    _convert(csv_path, tmp_path, "first", workers=2, index_cache=True)
+    assert Path(csv_path + ".idx").exists()
+    # append rows: the cached index is extended, the output still matches
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write('1990;01;01;1"0;1\n1990;01;02;2.0;2\n')
+    expected = _convert(csv_path, tmp_path, "sequential")
+    assert _convert(csv_path, tmp_path, "second", workers=2, index_cache=True) == expected
+
+
+def test_workers_use_the_sequential_encoding_fallback(tmp_path, monkeypatch):
+    from hydroturtle.io import csv_reader
+
+    monkeypatch.setattr(csv_reader, "detect_encoding", lambda path, data=None: None)  # detection misses
+    csv_path = _write_csv(tmp_path / "ID_7.csv", 2000)
+    with open(csv_path, "ab") as f:
+        f.write(b"1990;01;01;2.5;\xe9\n")  # cp1252, past the first blocks
+    expected = _convert(csv_path, tmp_path, "sequential")
+    assert _convert(csv_path, tmp_path, "workers", workers=2) == expected
+
+
+def test_batch_members_with_the_same_stem_are_refused(tmp_path):
+    import zipfile
+
+    from hydroturtle.core.engine import run_convert_batch
+
+    csv_path = _write_csv(tmp_path / "ID_7.csv", 50)
+    archive = tmp_path / "ts.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(csv_path, "A/ID_7.csv")
+        zf.write(csv_path, "B/ID_7.csv")
+    with pytest.raises(ValueError, match="A/ID_7.csv and B/ID_7.csv"):
+        run_convert_batch("*.csv", MAPPING, str(tmp_path / "out"), archive=str(archive))
+    assert run_convert_batch("A/*.csv", MAPPING, str(tmp_path / "out"), archive=str(archive)) == [
+        str(tmp_path / "out" / "ID_7.ttl")]
@@ -0,0 +1,59 @@
+import csv
+
+import pytest
+
+from hydroturtle.io.csv_index import CsvIndex, check_encoding, csv_index
+
+
+def _csv_module_rows(data: bytes, delimiter: str):
+    return [r for r in csv.reader(data.decode("utf-8").splitlines(keepends=True), delimiter=delimiter) if r]
+
+
+@pytest.mark.parametrize("delimiter", [",", ";", "\t"])
+def test_rows_match_the_csv_module(tmp_path, delimiter):
+    d = delimiter
+    lines = ["id{0}value{0}note".format(d)]
+    for i in range(1000):
+        if i % 50 == 3:
+            lines.append(f'{i}{d}1"0{d}x')                  # stray quote, not a quoted section
+        elif i % 70 == 4:
+            lines.append(f'{i}{d}"multi\nline{d}""q"""{d}y')  # quoted newline, delimiter and "" escape
+        elif i % 90 == 5:
+            lines.append("")                                  # blank line
+        else:
+            lines.append(f"{i}{d}{i * 3}{d}z")
+    path = tmp_path / "data.csv"
+    path.write_bytes(("\n".join(lines) + "\n").encode("utf-8"))
+
+    idx = CsvIndex.build(str(path), delimiter)
+    data = path.read_bytes()
+    expected = _csv_module_rows(data, d)[1:]
+    assert idx.n_rows == len(expected)
+    for lo, hi in idx.chunks(4):
+        start, end = idx.row_span(lo, hi)
+        assert _csv_module_rows(data[start:end], d) == expected[lo:hi]
+
+
+def test_unterminated_last_line_with_many_quoted_fields(tmp_path):
+    # no final newline: the record pattern fails on the last line, which must not backtrack per field
+    path = tmp_path / "quoted.csv"
+    path.write_bytes(b"a,b\n1,2\n" + b'"x",' * 40 + b'"x"')
+    idx = CsvIndex.build(str(path))
+    assert idx.n_rows == 2
+    assert idx.row_span(1, 2) == (8, path.stat().st_size)
+
+
+def test_cached_index_is_rebuilt_for_another_delimiter(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text('a;b\n1;"x\n2;y"\n3;z\n', encoding="utf-8")
+    assert csv_index(str(path), cache=True, delimiter=";").n_rows == 2
+    # with "," the quote is inside the field "1;\"x", so no quoted newline
+    assert csv_index(str(path), cache=True, delimiter=",").n_rows == 3
+
+
+def test_non_ascii_compatible_encodings_are_refused():
+    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
+        check_encoding(enc)
+    for enc in ("utf-16", "utf-16-le", "utf-32"):
+        with pytest.raises(ValueError):
+            check_encoding(enc)
@@ -0,0 +1,64 @@
+import pytest
+
+from hydroturtle.io import csv_reader
+from hydroturtle.io.csv_reader import CSV_READERS, iter_rows
+
+
+def _ragged_csv(path, n=2000):
+    lines = ["a,b,c"] + [f"{i},{i * 2},x" for i in range(n)]
+    lines[n // 2] = "short,1"
+    lines[n // 2 + 10] = "long,1,2,3"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _rows(path, reader, **kwargs):
+    # DictReader keeps extra fields under the key None; the projecting backends drop them
+    return [{k: v for k, v in r.items() if k is not None} for r in iter_rows(path, reader=reader, **kwargs)]
+
+
+@pytest.mark.parametrize("reader", CSV_READERS)
+def test_ragged_rows_are_padded_like_dictreader(tmp_path, monkeypatch, reader):
+    if reader == "arrow":
+        pytest.importorskip("pyarrow")
+        monkeypatch.setattr(csv_reader, "_ARROW_BLOCK", 1024)  # the ragged row lies past the first block
+    path = _ragged_csv(tmp_path / "r.csv")
+    rows = _rows(path, reader)
+    assert len(rows) == 2000
+    assert rows == _rows(path, "dict")
+    assert rows[999] == {"a": "short", "b": "1", "c": None}
+
+
+def test_arrow_ragged_rows_with_projection(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(csv_reader, "_ARROW_BLOCK", 1024)
+    path = _ragged_csv(tmp_path / "r.csv")
+    assert list(iter_rows(path, reader="arrow", columns=["b"])) == list(iter_rows(path, reader="tuple", columns=["b"]))
+
+
+@pytest.mark.parametrize("reader", CSV_READERS)
+def test_stray_quotes_are_field_content(tmp_path, reader):
+    if reader == "arrow":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / "q.csv"
+    path.write_text('a,b\n1,1"0\n2,x\n3,2"0\n4,"y,z"\n', encoding="utf-8")
+    assert [r["b"] for r in iter_rows(str(path), reader=reader)] == ['1"0', "x", '2"0', "y,z"]
+
+
+def test_late_undecodable_byte_selects_the_fallback_encoding(tmp_path, monkeypatch):
+    # utf-8 decodes the first rows, then fails: the encoding is chosen for the
+    # whole file up front, so every row is yielded once, decoded as cp1252
+    monkeypatch.setattr(csv_reader, "detect_encoding", lambda path, data=None: None)
+    path = tmp_path / "late.csv"
+    path.write_bytes(b"a,b\n" + b"".join(b"%d,x\n" % i for i in range(50000)) + b"9,\xe9\n")
+    rows = list(iter_rows(str(path)))
+    assert len(rows) == 50001
+    assert rows[-1] == {"a": "9", "b": "\u00e9"}
+    assert csv_reader.resolve_encoding(str(path)) == "cp1252"
+
+
+def test_undecodable_file_falls_back_before_any_row(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_reader, "detect_encoding", lambda path, data=None: None)
+    path = tmp_path / "cp.csv"
+    path.write_bytes("a,b\n1,Grüße\n".encode("cp1252"))
+    assert list(iter_rows(str(path))) == [{"a": "1", "b": "Grüße"}]
@@ -0,0 +1,46 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("netCDF4")
+
+from hydroturtle.core.engine_nc import run_convert_nc  # noqa: E402
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "lamah_ce" / "mapping_lamah_ce_timeseries.json"
+
+
+def _mapping(tmp_path, id_column="cell"):
+    """The LamaH time series mapping for the grid fixture: prec only, id from id_column (None: the file name)."""
+    m = json.loads(EXAMPLE.read_text(encoding="utf-8"))
+    m["rules"] = {"prec": m["rules"]["prec"]}
+    ids = m["configuration"]["column_types"]["id"]
+    ids["column_name"] = id_column
+    if id_column:
+        ids.pop("id_from_filename", None)
+    path = tmp_path / "mapping.json"
+    path.write_text(json.dumps(m), encoding="utf-8")
+    return str(path)
+
+
+def _blocks(path):
+    head, _, body = Path(path).read_text(encoding="utf-8").partition("\n\n")
+    return head, sorted(re.split(r"(?<= \.\n)(?=\S)", body))
+
+
+def test_spilled_nc_output_has_the_same_blocks(grid, tmp_path):
+    mapping = _mapping(tmp_path)
+    plain = run_convert_nc(grid, mapping, str(tmp_path / "plain.ttl"))
+    spilled = run_convert_nc(grid, mapping, str(tmp_path / "spilled.ttl"), max_triples=50, space_chunk=5)
+    assert len(_blocks(plain)[1]) == 60  # one observation per cell and time step
+    assert _blocks(spilled) == _blocks(plain)
+
+
+def test_grid_without_id_column_uses_the_cell(grid, tmp_path):
+    grid_file = tmp_path / "ID_5.nc"  # the mapping's file id would be 5
+    Path(grid).rename(grid_file)
+    out = run_convert_nc(str(grid_file), _mapping(tmp_path, id_column=None), str(tmp_path / "out.ttl"))
+    _, blocks = _blocks(out)
+    assert len(blocks) == 60  # not 5 (time steps) observations shared by every cell
+    assert any(b.startswith("hyobs:observation_2_1_3_prec ") for b in blocks)
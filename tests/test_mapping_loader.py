@@ -0,0 +1,23 @@
+import json
+
+from hydroturtle.mapping.loader import load_mapping
+
+
+def test_engine_sections_of_the_configuration_are_kept(tmp_path):
+    path = tmp_path / "m.json"
+    path.write_text(json.dumps({
+        "prefixes": {"ex": "http://example.org/"},
+        "configuration": {
+            "csv": {"delimiter": ";"},
+            "column_types": {"id": {"column_name": "ID"}},
+            "shapefile": {"src_crs": "EPSG:3035", "hierarchy": {"direct_only": False}},
+            "netcdf": {"time_dim": "t"},
+        },
+        "rules": {},
+    }), encoding="utf-8")
+    mapping = load_mapping(str(path))
+    assert mapping["configuration"] == {
+        "shapefile": {"src_crs": "EPSG:3035", "hierarchy": {"direct_only": False}},
+        "netcdf": {"time_dim": "t"},
+    }
+    assert mapping["context"]["columns"]["id"] == "ID"
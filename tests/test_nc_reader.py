@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("netCDF4")
+
+from hydroturtle.io.nc_reader import _block_shape, iter_nc_rows  # noqa: E402
+
+
+def test_block_shape_bounds_positions():
+    assert _block_shape([1800, 3600], 64) == [1, 64]
+    assert _block_shape([500], 64) == [64]
+    assert _block_shape([10, 5], 64) == [10, 5]
+    assert _block_shape([3, 4], 6) == [1, 4]
+    assert _block_shape([], 64) == []
+
+
+@pytest.mark.parametrize("space_chunk", [1, 3, 5, 64])
+def test_every_cell_and_step_once(grid, space_chunk):
+    rows = list(iter_nc_rows(grid, ["prec"], time_chunk=2, space_chunk=space_chunk))
+    assert len(rows) == 60
+    seen = {(row["cell"], t): row for t, row in rows}
+    assert len(seen) == 60
+    row = seen[("2_1", 3)]
+    assert row["prec"] == str(3 * 12 + 2 * 4 + 1)
+    assert (row["lat"], row["lon"], row["time"]) == ("48", "10.5", "2000-01-04T00:00:00")
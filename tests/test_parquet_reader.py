@@ -0,0 +1,17 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from hydroturtle.io.parquet_reader import iter_table_rows  # noqa: E402
+
+
+@pytest.mark.parametrize("name", ["t.arrows", "t.arrow"])
+def test_arrow_ipc_stream_format(tmp_path, name):
+    table = pa.table({"id": [1, 2, 3], "prec": [0.5, None, 2.0], "note": ["a", "b", "c"]})
+    path = tmp_path / name
+    with pa.ipc.new_stream(str(path), table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=2):
+            writer.write_batch(batch)
+    expected = [{"id": "1", "prec": "0.5"}, {"id": "2", "prec": ""}, {"id": "3", "prec": "2"}]
+    assert list(iter_table_rows(str(path), columns=["id", "prec"])) == expected
+    assert list(iter_table_rows(name, columns=["id", "prec"], data=path.read_bytes())) == expected
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+fiona = pytest.importorskip("fiona")
+pytest.importorskip("shapely")
+pytest.importorskip("pyproj")
+
+from hydroturtle.geo.shp_reader import _id_where, iter_features  # noqa: E402
+
+
+@pytest.fixture(params=["shp", "parquet"])
+def points(request, tmp_path):
+    if request.param == "parquet":
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+        import shapely
+
+        path = str(tmp_path / "gauges.parquet")
+        geo = {"version": "1.0.0", "primary_column": "geometry",
+               "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["Point"]}}}
+        table = pa.table({"ID": list(range(1, 6)), "area": [i * 1.5 for i in range(1, 6)],
+                          "name": [f"g'{i}" for i in range(1, 6)],
+                          "geometry": shapely.to_wkb(shapely.points([10.0 + i for i in range(1, 6)], 47.0))})
+        pq.write_table(table.replace_schema_metadata({"geo": json.dumps(geo)}), path)
+        return path
+    path = str(tmp_path / "gauges.shp")
+    schema = {"geometry": "Point", "properties": {"ID": "int", "area": "float", "name": "str"}}
+    with fiona.open(path, "w", driver="ESRI Shapefile", crs="EPSG:4326", schema=schema) as dst:
+        for i in range(1, 6):
+            dst.write({"geometry": {"type": "Point", "coordinates": (10.0 + i, 47.0)},
+                       "properties": {"ID": i, "area": i * 1.5, "name": f"g'{i}"}})
+    return path
+
+
+def _ids(path, id_field, ids):
+    return [f["id"] for f in iter_features(path, id_field=id_field, ids=ids)]
+
+
+def test_numeric_ids_are_parsed(points):
+    assert _ids(points, "ID", ["2", " 4 "]) == [2, 4]
+    assert _ids(points, "area", ["3", "4.5"]) == [3.0, 4.5]
+
+
+def test_string_ids_are_quoted(points):
+    assert _ids(points, "name", ["g'3"]) == ["g'3"]
+    assert _ids(points, "name", ["x') OR ('1'='1"]) == []
+
+
+@pytest.mark.parametrize("bad", ["1) OR (1=1", "x", "", "1.5"])
+def test_invalid_numeric_id_is_a_value_error(points, bad):
+    with pytest.raises(ValueError, match="ID field 'ID'"):
+        _ids(points, "ID", [bad])
+
+
+def test_id_where_literals():
+    with pytest.raises(ValueError, match="'nan'"):
+        _id_where("area", ["nan"], "float64")
+    assert _id_where("ID", [1, "2"], "int64") == '"ID" IN (1, 2)'
+    assert _id_where('we"ird', [], "str") == '"we""ird" IN (NULL)'
+
+
+@pytest.mark.parametrize("reader", ["fiona", "arrow"])
+def test_hierarchy_only_relates_the_selected_features(tmp_path, reader):
+    from hydroturtle.core.engine_shp import convert_shp
+
+    if reader == "arrow":
+        pytest.importorskip("pyogrio")
+    path = str(tmp_path / "nested.shp")
+    schema = {"geometry": "Polygon", "properties": {"ID": "int"}}
+    with fiona.open(path, "w", driver="ESRI Shapefile", crs="EPSG:4326", schema=schema) as dst:
+        for i, half in enumerate([4.0, 2.0, 1.0], start=1):  # 1 contains 2 contains 3
+            ring = [(10 - half, 47 - half), (10 + half, 47 - half), (10 + half, 47 + half), (10 - half, 47 + half)]
+            dst.write({"geometry": {"type": "Polygon", "coordinates": [ring + ring[:1]]}, "properties": {"ID": i}})
+    mapping = {
+        "prefixes": {"ex": "http://example.org/"},
+        "configuration": {"column_types": {"id": {"column_name": "ID"},
+                                           "templates_for_subject_id": {"catchment": "ex:c{id}"}}},
+        "rules": {"@subject": {"@template": "@catchment"}, "ex:kind": "ex:Catchment"},
+    }
+    triples, _ = convert_shp(path, mapping, reader=reader, ids=["2", "3"], hierarchy={"direct_only": False})
+    assert sorted(triples) == ["ex:c2", "ex:c3"]
+    assert ("geo:sfWithin", "ex:c2") in triples["ex:c3"]
+    assert all(o != "ex:c1" for pos in triples.values() for _p, o in pos)
+
+
+@pytest.mark.parametrize("reader", ["fiona", "arrow"])
+@pytest.mark.parametrize("filters", [{"ids": ["2", "3", "5"]}, {"bbox": (11.5, 46.0, 14.5, 48.0)},
+                                     {"bbox": (11.5, 46.0, 20.0, 48.0), "ids": ["1", "3", "4", "5"]}])
+def test_filtered_layer_is_split_across_workers(points, reader, filters):
+    from hydroturtle.core.engine_shp import convert_shp
+
+    if reader == "arrow":
+        pytest.importorskip("pyogrio")
+    mapping = {
+        "prefixes": {"ex": "http://example.org/"},
+        "configuration": {"column_types": {"id": {"column_name": "ID"},
+                                           "templates_for_subject_id": {"sensor": "ex:g{id}", "geom": "ex:p{id}"}}},
+        "rules": {"@subject": {"@template": "@sensor"}, "ex:kind": "ex:Gauge", "ex:geometry": "@geom",
+                  "@geom": [["ex:wkt", {"@wkt": "geometry"}]], "name": [["ex:name", "^^xsd:string"]]},
+    }
+    expected, _ = convert_shp(points, mapping, reader=reader, **filters)
+    assert len(expected) >= 2
+    split, _ = convert_shp(points, mapping, reader=reader, workers=2, chunk_size=1, **filters)
+    assert list(split.items()) == list(expected.items())
+
+
+def test_feature_range_counts_the_filtered_features(points):
+    # 5 points at lon 11..15; the bbox keeps 12..15, of which the range takes the 2nd and 3rd
+    feats = iter_features(points, id_field="ID", start=1, stop=3, bbox=(11.5, 46.0, 20.0, 48.0))
+    assert [f["id"] for f in feats] == [3, 4]
+
+
+@pytest.mark.parametrize("chunk_size", [0, -2])
+def test_chunk_size_below_one_is_refused(points, chunk_size):
+    from hydroturtle.core.engine_shp import convert_shp
+
+    with pytest.raises(ValueError, match="chunk_size"):
+        convert_shp(points, {"prefixes": {}, "rules": {}}, workers=2, chunk_size=chunk_size)
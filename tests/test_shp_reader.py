@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("shapely")
+pytest.importorskip("pyproj")
+
+import shapely  # noqa: E402
+from pyproj import CRS  # noqa: E402
+
+from hydroturtle.geo.shp_reader import (  # noqa: E402
+    _make_transformer, _transform_geoms, _wkb_column, iter_feature_batches, iter_features,
+)
+
+
+def test_wkb_column_across_gdal_versions():
+    ext = {b"ARROW:extension:name": b"geoarrow.wkb"}
+    tagged = pa.schema([pa.field("ID", pa.int64()), pa.field("geom", pa.binary(), metadata=ext)])
+    assert _wkb_column(tagged, {"geometry_name": ""}) == "geom"
+    untagged = pa.schema([("ID", pa.int64()), ("wkb_geometry", pa.binary())])
+    assert _wkb_column(untagged, {"geometry_name": ""}) == "wkb_geometry"
+    assert _wkb_column(untagged, {}) == "wkb_geometry"
+    with pytest.raises(KeyError):
+        _wkb_column(pa.schema([("ID", pa.int64())]), {"geometry_name": "geom"})
+
+
+def test_mixed_z_layers_keep_2d_geometries_2d():
+    tfm = _make_transformer(CRS.from_epsg(3035), CRS.from_user_input("OGC:CRS84"))
+    geoms = shapely.from_wkt(["POINT Z (4500000 2700000 5)", "POINT (4500100 2700100)", None])
+    out = _transform_geoms(geoms, tfm)
+    assert list(shapely.has_z(out)) == [True, False, False]
+    assert out[1].x == pytest.approx(12.371, abs=1e-3) and out[2] is None
+    assert out[0].z == 5
+
+
+@pytest.fixture
+def triangle_and_square(tmp_path):
+    """The same two features as GeoPackage and GeoParquet; the triangle's envelope reaches (10, 10)."""
+    fiona = pytest.importorskip("fiona")
+    import pyarrow.parquet as pq
+
+    geoms = [shapely.Polygon([(0, 0), (10, 0), (0, 10)]), shapely.box(20, 20, 21, 21)]
+    gpkg = str(tmp_path / "f.gpkg")
+    schema = {"geometry": "Polygon", "properties": {"ID": "int"}}
+    with fiona.open(gpkg, "w", driver="GPKG", crs="OGC:CRS84", schema=schema) as dst:
+        for i, g in enumerate(geoms, start=1):
+            dst.write({"geometry": shapely.geometry.mapping(g), "properties": {"ID": i}})
+    geo = {"version": "1.0.0", "primary_column": "geometry",
+           "columns": {"geometry": {"encoding": "WKB", "geometry_types": []}}}
+    table = pa.table({"ID": [1, 2], "geometry": shapely.to_wkb(geoms)})
+    parquet = str(tmp_path / "f.parquet")
+    pq.write_table(table.replace_schema_metadata({"geo": json.dumps(geo)}), parquet)
+    return gpkg, parquet
+
+
+@pytest.mark.parametrize("bbox, expected", [((8, 8, 9, 9), []), ((1, 1, 2, 2), [1]), ((0, 0, 30, 30), [1, 2])])
+@pytest.mark.parametrize("with_geometry", [True, False])
+def test_bbox_selects_the_same_features_in_every_reader(triangle_and_square, bbox, expected, with_geometry):
+    pytest.importorskip("pyogrio")
+    for path in triangle_and_square:
+        batches = iter_feature_batches(path, [], id_field="ID", bbox=bbox, with_geometry=with_geometry)
+        assert [i for b in batches for i in b["ids"]] == expected
+        features = iter_features(path, id_field="ID", bbox=bbox, with_geometry=with_geometry)
+        assert [f["id"] for f in features] == expected
@@ -0,0 +1,25 @@
+import pytest
+
+shapely = pytest.importorskip("shapely")
+
+from hydroturtle.geo.wkt import GEOMETRY_KINDS, geometry_kind_index, wkt_literal_rows  # noqa: E402
+
+
+def test_no_kinds_gives_empty_rows():
+    geoms = shapely.points([1.0, 2.0], [3.0, 4.0])
+    assert list(wkt_literal_rows(geoms, [])) == [(None,) * len(GEOMETRY_KINDS)] * 2
+
+
+def test_only_the_listed_kinds_are_computed():
+    geoms = shapely.points([1.0], [3.0])
+    (row,) = wkt_literal_rows(geoms, {0})
+    assert row[0].startswith('"<http://www.opengis.net/def/crs/OGC/1.3/CRS84> POINT (1 3)"')
+    assert row[1:] == (None,) * (len(GEOMETRY_KINDS) - 1)
+
+
+def test_kind_names_and_aliases():
+    assert geometry_kind_index("geometry") == 0
+    assert geometry_kind_index("bbox") == GEOMETRY_KINDS.index("envelope")
+    assert geometry_kind_index(True) == 0
+    with pytest.raises(ValueError, match="centroid.*representative_point = point_on_surface"):
+        geometry_kind_index("centriod")